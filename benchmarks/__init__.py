@@ -0,0 +1,6 @@
+"""Benchmarks of craamvert over synthetic SST and POEMAS files
+
+Run with python -m benchmarks --size minute|hour|day, results are compared
+with benchmarks/baselines.json and regressions are flagged.
+Use --save to store the results of this machine as the new baselines.
+"""
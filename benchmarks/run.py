@@ -0,0 +1,246 @@
+import argparse
+import fnmatch
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import SIZES, get_format_epochs, create_rbd_file, create_trk_file
+from craamvert.instruments.poemas import POEMASDataType
+from craamvert.instruments.poemas.poemas import POEMAS
+from craamvert.instruments.poemas.utils.create_hdu import create_data_hdu as create_poemas_data_hdu
+from craamvert.instruments.sst.sst import SST
+from craamvert.instruments.sst.utils.create_hdu import create_data_hdu as create_sst_data_hdu
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+
+# Date of the synthetic RBD files used by every benchmark but parsing, on the current format epoch
+RBD_DATE = "2012-01-27"
+
+# Files concatenated by the SST concatenate benchmark, each one with a part of the observation, as hourly files
+CONCATENATED_RBD_FILES = 24
+
+# Allowed increase over the baseline before a benchmark is flagged as a regression
+# Time is noisier than memory, since it depends on the machine load, so only twice as slow is flagged
+TIME_TOLERANCE = 1.0
+MEMORY_TOLERANCE = 0.1
+
+# Smallest increase flagged, so timer noise on benchmarks of a few milliseconds is never a regression
+MINIMUM_TIME_INCREASE = 0.02
+MINIMUM_MEMORY_INCREASE = 64 * 1024
+
+BENCHMARK_RESULT = "{:<60} {:>10.4f} s {:>10.2f} MB{}"
+REGRESSION = "  REGRESSION from {:.4f} s, {:.2f} MB"
+BYTES_IN_A_MEGABYTE = 1024 * 1024
+
+
+class Benchmark:
+    """A function measured alone, setup creates its arguments again before each run"""
+
+    def __init__(self, name, function, setup=None):
+        # All attributes must be declared on __init__
+        self.name = name
+        self.function = function
+        self.setup = setup or tuple
+
+    def run(self, repeats):
+        """Returns best wall time of repeats runs, in seconds, and tracemalloc peak of another run, in bytes"""
+        elapsed_times = list()
+        for _ in range(repeats):
+            arguments = self.setup()
+
+            start = time.perf_counter()
+            self.function(*arguments)
+            elapsed_times.append(time.perf_counter() - start)
+
+        # Memory is measured apart, since tracing allocations slows the function down
+        arguments = self.setup()
+        tracemalloc.start()
+        try:
+            self.function(*arguments)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return min(elapsed_times), peak_memory
+
+
+def create_benchmarks(directory, seconds):
+    """Returns benchmarks of parse, level 1, level 2, HDU creation and fits writing over synthetic files
+
+    Parameters:
+        directory : pathlib.Path - Where synthetic files and fits files are written.
+        seconds : int - Observation length of the synthetic files.
+
+    Returns:
+        list of Benchmark
+    """
+    directory = Path(directory)
+    benchmarks = list()
+
+    # Every RBD format epoch is parsed, the other SST benchmarks use the current one
+    for sst_data_type, initial_date, description_file_name in get_format_epochs():
+        epoch_directory = directory / Path(description_file_name).stem
+        epoch_directory.mkdir()
+        rbd_path = create_rbd_file(epoch_directory, sst_data_type, initial_date, seconds)
+
+        benchmarks.append(Benchmark("sst_parse[{}]".format(Path(description_file_name).stem),
+                                    lambda rbd_path=rbd_path: SST.open_file(rbd_path)))
+
+    rbd_path = create_rbd_file(directory, "Data", RBD_DATE, seconds)
+
+    def open_sst():
+        return SST.open_file(rbd_path),
+
+    benchmarks.append(Benchmark("sst_create_hdu",
+                                lambda sst: create_sst_data_hdu(sst._sst_column_names, sst._sst_data), open_sst))
+    benchmarks.append(Benchmark("sst_write_fits",
+                                lambda sst, output_path: sst.write_fits(output_path=output_path),
+                                lambda: open_sst() + (tempfile.mkdtemp(dir=str(directory)),)))
+
+    # Every part has the same file name, so each one is kept on its own directory
+    part_seconds = max(seconds // CONCATENATED_RBD_FILES, 1)
+    part_rbd_paths = list()
+    for part in range(CONCATENATED_RBD_FILES):
+        part_directory = directory / "part{}".format(part)
+        part_directory.mkdir()
+        part_rbd_paths.append(create_rbd_file(part_directory, "Data", RBD_DATE, part_seconds, seed=part,
+                                              first_second=part * part_seconds))
+
+    benchmarks.append(Benchmark("sst_concatenate", SST.concatenate,
+                                lambda: ([SST.open_file(path, mmap=True) for path in part_rbd_paths],)))
+
+    # Level 2 groups two files with half of the observation each
+    trk_path = create_trk_file(directory, seconds)
+    half_directory = directory / "half"
+    half_directory.mkdir()
+    half_trk_paths = [create_trk_file(half_directory, seconds // 2),
+                      create_trk_file(half_directory, seconds - seconds // 2, first_second=seconds // 2, seed=1)]
+
+    def open_poemas():
+        return POEMAS.open_file(trk_path),
+
+    def open_level_1_poemas():
+        poemas_objects = [POEMAS.open_file(path) for path in half_trk_paths]
+        for poemas_object in poemas_objects:
+            poemas_object.level_1()
+        return poemas_objects[0], poemas_objects[1:]
+
+    benchmarks.append(Benchmark("poemas_parse", lambda: POEMAS.open_file(trk_path)))
+    benchmarks.append(Benchmark("poemas_level_1", lambda poemas: poemas.level_1(), open_poemas))
+    benchmarks.append(Benchmark("poemas_level_2",
+                                lambda poemas, poemas_objects_list: poemas.level_2(poemas_objects_list),
+                                open_level_1_poemas))
+    benchmarks.append(Benchmark("poemas_create_hdu",
+                                lambda poemas: create_poemas_data_hdu(poemas._poemas_body_column_names,
+                                                                      poemas._poemas_body_data, POEMASDataType.BODY),
+                                open_poemas))
+    benchmarks.append(Benchmark("poemas_write_fits",
+                                lambda poemas, output_path: poemas.write_fits(output_path=output_path),
+                                lambda: open_poemas() + (tempfile.mkdtemp(dir=str(directory)),)))
+
+    return benchmarks
+
+
+def run_benchmarks(size, repeats=5, pattern="*"):
+    """Runs benchmarks over synthetic files of a size
+
+    Parameters:
+        size : str - Key of SIZES, e.g. minute.
+        repeats : int, optional - Runs of each benchmark, the best time is kept.
+        pattern : str, optional - Runs only benchmarks whose name matches this shell pattern.
+
+    Returns:
+        dict - The key is the benchmark name and the value is a dict with time, in seconds, and peak memory, in bytes.
+    """
+    results = dict()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for benchmark in create_benchmarks(Path(directory), SIZES[size]):
+            if not fnmatch.fnmatch(benchmark.name, pattern):
+                continue
+
+            elapsed, peak_memory = benchmark.run(repeats)
+            results[benchmark.name] = {"time": elapsed, "peak_memory": peak_memory}
+
+    return results
+
+
+def find_regressions(results, baselines, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE):
+    """Returns names of benchmarks slower or using more memory than their baseline, beyond the tolerance
+
+    Benchmarks without a baseline are never flagged, neither are increases below
+    MINIMUM_TIME_INCREASE and MINIMUM_MEMORY_INCREASE.
+    """
+    regressions = list()
+
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+
+        time_limit = max(baseline["time"] * (1 + time_tolerance), baseline["time"] + MINIMUM_TIME_INCREASE)
+        memory_limit = max(baseline["peak_memory"] * (1 + memory_tolerance),
+                           baseline["peak_memory"] + MINIMUM_MEMORY_INCREASE)
+
+        if result["time"] > time_limit or result["peak_memory"] > memory_limit:
+            regressions.append(name)
+
+    return regressions
+
+
+def read_baselines(path=BASELINES_PATH):
+    """Returns stored baselines, the key is the size and the value is a result of run_benchmarks"""
+    path = Path(path)
+    if not path.exists():
+        return dict()
+
+    return json.loads(path.read_text())
+
+
+def write_baselines(baselines, path=BASELINES_PATH):
+    Path(path).write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+
+
+def main(argv=None):
+    """Runs benchmarks and compares them with the stored baselines, e.g. python -m benchmarks --size hour
+
+    Returns:
+        int - Exit status, 1 when any benchmark regressed
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Time and peak memory benchmarks over synthetic files")
+    parser.add_argument("--size", choices=list(SIZES), default="minute", help="observation length of the files")
+    parser.add_argument("--repeats", type=int, default=5, help="runs of each benchmark, the best time is kept")
+    parser.add_argument("--only", default="*", help="shell pattern of the benchmarks to run, e.g. 'poemas_*'")
+    parser.add_argument("--baselines", default=str(BASELINES_PATH), help="json file with the stored baselines")
+    parser.add_argument("--save", action="store_true", help="store results as the new baselines of this size")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    arguments = parser.parse_args(argv)
+
+    results = run_benchmarks(arguments.size, arguments.repeats, arguments.only)
+
+    all_baselines = read_baselines(arguments.baselines)
+    baselines = all_baselines.get(arguments.size, dict())
+    regressions = find_regressions(results, baselines, arguments.time_tolerance, arguments.memory_tolerance)
+
+    for name, result in results.items():
+        regression = ""
+        if name in regressions:
+            regression = REGRESSION.format(baselines[name]["time"],
+                                           baselines[name]["peak_memory"] / BYTES_IN_A_MEGABYTE)
+        print(BENCHMARK_RESULT.format(name, result["time"], result["peak_memory"] / BYTES_IN_A_MEGABYTE, regression))
+
+    if arguments.save:
+        all_baselines[arguments.size] = dict(baselines, **results)
+        write_baselines(all_baselines, arguments.baselines)
+        return 0
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
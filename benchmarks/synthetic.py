@@ -0,0 +1,178 @@
+import xml.etree.ElementTree as xmlet
+from pathlib import Path
+
+import numpy as np
+
+from craamvert.instruments.poemas import POEMASDataType
+from craamvert.instruments.poemas.trk.trk import PATH_TO_XML_TRK_COLUMN_NAME
+from craamvert.instruments.sst.rbd.rbd import MAP_RBD_TYPE
+from craamvert.instruments.sst.utils.format_epoch_index import get_format_epoch_index, SST_TIME_SPAN_TABLE
+from craamvert.instruments.utils.file_type_detector import get_path_to_xml
+from craamvert.instruments.utils.schema_registry import get_schema
+from craamvert.utils import SST_INSTRUMENT, POEMAS_INSTRUMENT, RBD_TYPE, TRK_TYPE, iso_time, julday
+
+# Observation length of each benchmark size, in seconds
+# A full observing day at CASLEO is about 12 hours of sun tracking
+SIZES = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 12 * 3600,
+}
+
+# Time between records of each RBD type, in Hus
+RBD_TYPE_TO_RECORD_INTERVAL = {
+    "Integration": 400,
+    "Subintegration": 50,
+    "Auxiliary": 10000,
+}
+
+# File name prefix used for each SST data type
+SST_DATA_TYPE_TO_RBD_PREFIX = {
+    "Data": "rs",
+    "Auxiliary": "bi",
+}
+
+# Observations start at 13:00 UT, in the morning at CASLEO
+OBSERVATION_START_HOUR = 13
+TRK_DATE = np.datetime64("2012-01-27")
+
+# POEMAS header values, as found on TRK files
+TRK_CODE = 12345
+TRK_FREQUENCIES = (45., 90.)
+
+# Brightness temperature of the quiet sun, in K, and its noise
+TB_MEAN = 800.
+TB_NOISE = 20.
+
+
+def get_format_epochs():
+    """Returns every RBD format epoch described on the SST time span table
+
+    Returns:
+        list of tuples containing SST data type, initial date and description file name
+    """
+    span_table = xmlet.parse(get_path_to_xml(SST_INSTRUMENT, RBD_TYPE) / SST_TIME_SPAN_TABLE).getroot()
+
+    return sorted((item[0].text, item[1].text, item[3].text) for item in span_table)
+
+
+def get_rbd_file_name(sst_data_type, date, rbd_prefix=None):
+    """Returns name of a RBD file of a SST data type, observed on a date given as YYYY-MM-DD"""
+    year, month, day = date.split("-")
+    prefix = rbd_prefix or SST_DATA_TYPE_TO_RBD_PREFIX[sst_data_type]
+
+    # Years after 1999 have 3 digits, as 112 for 2012
+    return "{}{:02d}{}{}.{:02d}00".format(prefix, int(year) - 1900, month, day, OBSERVATION_START_HOUR)
+
+
+def create_rbd_data(sst_data_type, date, seconds, rbd_prefix=None, seed=0, first_second=0):
+    """Returns RBD records of a format epoch, as written by the SST acquisition
+
+    Parameters:
+        sst_data_type : str - SST data type, Data or Auxiliary.
+        date : str - Date as YYYY-MM-DD, the format epoch is the one of this date.
+        seconds : int - Observation length.
+        rbd_prefix : str, optional - rs, rf or bi, by default rs for Data and bi for Auxiliary.
+        seed : int, optional - Seed of the random values.
+        first_second : int, optional - Seconds from the observation start to the first record.
+
+    Returns:
+        numpy structured array
+    """
+    rbd_type = MAP_RBD_TYPE[(rbd_prefix or SST_DATA_TYPE_TO_RBD_PREFIX[sst_data_type]).upper()]
+    record_interval = RBD_TYPE_TO_RECORD_INTERVAL[rbd_type]
+    rbd_data_type = get_format_epoch_index(get_path_to_xml(SST_INSTRUMENT, RBD_TYPE)).get_schema(sst_data_type,
+                                                                                                 date).data_type
+
+    records = seconds * iso_time.HUS_IN_A_SECOND // record_interval
+    rbd_data = _create_random_records(rbd_data_type, records, np.random.default_rng(seed))
+
+    first_record = first_second * iso_time.HUS_IN_A_SECOND // record_interval
+    rbd_data["time"] = (OBSERVATION_START_HOUR * iso_time.HUS_IN_AN_HOUR
+                        + (first_record + np.arange(records)) * record_interval)
+    if "recnum" in rbd_data_type.names:
+        rbd_data["recnum"] = first_record + np.arange(records)
+
+    return rbd_data
+
+
+def create_rbd_file(directory, sst_data_type, date, seconds, rbd_prefix=None, seed=0, first_second=0):
+    """Writes a RBD file of a format epoch inside directory, see create_rbd_data
+
+    Returns:
+        pathlib.Path
+    """
+    path = Path(directory) / get_rbd_file_name(sst_data_type, date, rbd_prefix)
+    create_rbd_data(sst_data_type, date, seconds, rbd_prefix, seed, first_second).tofile(str(path))
+
+    return path
+
+
+def create_trk_data(seconds, first_second=0, seed=0):
+    """Returns TRK header and body records, one record per second with 100 samples of each TB channel
+
+    Parameters:
+        seconds : int - Observation length, one record is written per second.
+        first_second : int, optional - Seconds after the observation start of the first record.
+        seed : int, optional - Seed of the random values.
+
+    Returns:
+        tuple containing header and body numpy structured arrays
+    """
+    path_to_xml = get_path_to_xml(POEMAS_INSTRUMENT, TRK_TYPE)
+    header_data_type = get_schema(path_to_xml / PATH_TO_XML_TRK_COLUMN_NAME[POEMASDataType.HEADER]).data_type
+    body_data_type = get_schema(path_to_xml / PATH_TO_XML_TRK_COLUMN_NAME[POEMASDataType.BODY]).data_type
+    random_generator = np.random.default_rng(seed)
+
+    # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
+    header_data = np.zeros(1, dtype=header_data_type)
+    header_data["Code"] = TRK_CODE
+    header_data["NRS"] = seconds
+    header_data["FreqNo"] = len(TRK_FREQUENCIES)
+    header_data["Freq1"], header_data["Freq2"] = TRK_FREQUENCIES
+
+    # sec, ele_ang, azi_ang, TB
+    observation_start = (TRK_DATE - julday.JULDAY_EPOCH).astype(np.int64) + \
+        OBSERVATION_START_HOUR * 3600 + first_second
+
+    body_data = np.zeros(seconds, dtype=body_data_type)
+    body_data["sec"] = observation_start + np.arange(seconds)
+    body_data[body_data_type.names[1]] = np.linspace(30., 80., seconds)
+    body_data[body_data_type.names[2]] = np.linspace(90., 270., seconds)
+    body_data["TB"] = random_generator.normal(TB_MEAN, TB_NOISE, body_data["TB"].shape)
+
+    header_data["BRTMin"] = body_data["TB"].min()
+    header_data["BRTMax"] = body_data["TB"].max()
+
+    return header_data, body_data
+
+
+def create_trk_file(directory, seconds, first_second=0, seed=0):
+    """Writes a TRK file inside directory, see create_trk_data
+
+    Returns:
+        pathlib.Path
+    """
+    header_data, body_data = create_trk_data(seconds, first_second, seed)
+
+    first_time = julday.time_array(body_data["sec"][0]).item().replace(":", "")
+    path = Path(directory) / "SunTrack_{}_{}.TRK".format(str(TRK_DATE).replace("-", "")[2:], first_time)
+    path.write_bytes(header_data.tobytes() + body_data.tobytes())
+
+    return path
+
+
+def _create_random_records(data_type, records, random_generator):
+    random_data = np.zeros(records, dtype=data_type)
+
+    for name in data_type.names:
+        field_type = data_type.fields[name][0]
+        shape = (records,) + field_type.shape
+
+        # Values are kept small, so sums and medians never overflow
+        if np.issubdtype(field_type.base, np.integer):
+            random_data[name] = random_generator.integers(0, min(np.iinfo(field_type.base).max, 1000), shape)
+        else:
+            random_data[name] = random_generator.normal(0., 1., shape)
+
+    return random_data
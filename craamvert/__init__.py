@@ -1,3 +1,54 @@
-from instruments.sst.sst import SST
-from instruments.poemas.poemas import POEMAS
+from importlib import import_module
 
+from craamvert.utils import SST_INSTRUMENT, POEMAS_INSTRUMENT
+
+# Instrument classes are only imported when used, so importing craamvert is cheap
+# for tasks which never convert a file, such as cataloging and file type detection
+INSTRUMENT_TO_CLASS_PATH = {
+    SST_INSTRUMENT: "craamvert.instruments.sst.sst:SST",
+    POEMAS_INSTRUMENT: "craamvert.instruments.poemas.poemas:POEMAS",
+}
+
+
+def get_instrument_class(instrument):
+    """Returns class of an instrument, e.g. SST, imported only now
+
+    Raises:
+        KeyError: If the instrument is not available.
+    """
+    module_name, _, class_name = INSTRUMENT_TO_CLASS_PATH[instrument].partition(":")
+
+    return getattr(import_module(module_name), class_name)
+
+
+def open(file_name, original_file_name=None, **options):
+    """Open any supported file and return the object of its instrument, e.g. SST or POEMAS
+
+    The file type is found from the file name and confirmed by the file size and header,
+    so the instrument doesn't need to be known.
+
+    Parameters:
+           file_name : str, pathlib.Path, buffer - File to be opened.
+           original_file_name : str, optional - Name of the file when it's given as a buffer.
+           options : Options of the instrument open_file, e.g. start and end.
+
+    Raises:
+        ValueError: If no instrument supports the file.
+    """
+    from craamvert.instruments.utils.file_type_detector import detect_file_type
+
+    instrument, _ = detect_file_type(file_name, original_file_name)
+
+    return get_instrument_class(instrument).open_file(file_name, original_file_name=original_file_name, **options)
+
+
+def __getattr__(name):
+    # craamvert.SST, craamvert.POEMAS and craamvert.INSTRUMENT_TO_CLASS_MAP are imported on first access
+    for instrument, class_path in INSTRUMENT_TO_CLASS_PATH.items():
+        if class_path.endswith(":" + name):
+            return get_instrument_class(instrument)
+
+    if name == "INSTRUMENT_TO_CLASS_MAP":
+        return {instrument: get_instrument_class(instrument) for instrument in INSTRUMENT_TO_CLASS_PATH}
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,5 @@
+import sys
+
+from craamvert.craamvert import main
+
+sys.exit(main())
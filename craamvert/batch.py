@@ -0,0 +1,284 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import craamvert
+from craamvert.catalog import describe_file
+from craamvert.instruments.utils.file_type_detector import detect_file_type
+from craamvert.instruments.utils.fits_handlers import get_fits_file_name_and_output_path
+from craamvert.instruments.utils.stage_profiler import StageProfiler
+from craamvert.utils import FITS_LEVEL_NOT_AVAILABLE, INVALID_STATS_FORMAT, JSON_LINES_FORMAT, PROMETHEUS_FORMAT, \
+    STATS_FORMATS
+
+# Each worker receives several files at once, this is the number of chunks per worker
+CHUNKS_PER_JOB = 4
+
+# Prometheus metrics written for each file and stage, with the stage stats key they are taken from
+# Stages run more than once for a file are summed, except peak memory, which is the highest one
+PROMETHEUS_METRICS = (
+    ("craamvert_stage_seconds", "elapsed", "Wall time of the conversion stage."),
+    ("craamvert_stage_read_bytes", "bytes_read", "Bytes read by the conversion stage."),
+    ("craamvert_stage_written_bytes", "bytes_written", "Bytes written by the conversion stage."),
+    ("craamvert_stage_records", "records", "Records processed by the conversion stage."),
+    ("craamvert_stage_peak_memory_bytes", "peak_memory", "Peak memory traced during the conversion stage."),
+)
+PROMETHEUS_SAMPLE = '{}{{file="{}",stage="{}"}} {}'
+
+
+class ConversionResult:
+    """Result of the conversion of a single file"""
+
+    def __init__(self, path, output=None, error=None, elapsed=0.0, size=0, records=0, skipped=False, stages=None):
+        # All attributes must be declared on __init__
+        self.path = path
+        self.output = output
+        self.error = error
+        self.elapsed = elapsed
+
+        # Size in bytes and number of records of the original file
+        self.size = size
+        self.records = records
+
+        # True when the fits file already existed, so the file wasn't converted again
+        self.skipped = skipped
+
+        # Stats of each stage run to convert the file, as dicts, only kept when requested
+        self.stages = stages
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+    def to_dict(self):
+        return {"path": str(self.path), "output": self.output and str(self.output), "error": self.error,
+                "elapsed": self.elapsed, "size": self.size, "records": self.records, "skipped": self.skipped,
+                "stages": self.stages}
+
+    def __repr__(self):
+        return "ConversionResult(path={!r}, output={!r}, error={!r}, elapsed={:.3f}, skipped={})".format(
+            str(self.path), self.output and str(self.output), self.error, self.elapsed, self.skipped)
+
+
+class BatchReport:
+    """Results of a batch conversion, in the same order as the input files"""
+
+    def __init__(self, results, elapsed):
+        # All attributes must be declared on __init__
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def succeeded(self):
+        return [result for result in self.results if result.succeeded]
+
+    @property
+    def failed(self):
+        return [result for result in self.results if not result.succeeded]
+
+    @property
+    def skipped(self):
+        return [result for result in self.results if result.skipped]
+
+    @property
+    def converted(self):
+        return [result for result in self.results if result.succeeded and not result.skipped]
+
+    def get_throughput(self):
+        """Returns files, bytes and records converted per second, skipped and failed files are not counted
+
+        Returns:
+            tuple containing files/s, bytes/s and records/s
+        """
+        elapsed = self.elapsed or float("inf")
+        converted = self.converted
+
+        return (len(converted) / elapsed,
+                sum(result.size for result in converted) / elapsed,
+                sum(result.records for result in converted) / elapsed)
+
+    def write_stats(self, path, stats_format=JSON_LINES_FORMAT):
+        """Writes stage stats of every file, converted with stats=True
+
+        JSON lines have one line per file, with its result and its stages.
+        Prometheus textfiles have one sample per file, stage and metric.
+        Stats are written to a temporary file first, so a textfile collector never reads half a file.
+
+        Parameters:
+            path : str, pathlib.Path - File to be written.
+            stats_format : str, optional - jsonl or prometheus.
+
+        Raises:
+            ValueError: If the format is not available.
+        """
+        if stats_format == JSON_LINES_FORMAT:
+            lines = [json.dumps(result.to_dict()) for result in self.results]
+        elif stats_format == PROMETHEUS_FORMAT:
+            lines = _get_prometheus_lines(self.results)
+        else:
+            raise ValueError(INVALID_STATS_FORMAT.format(stats_format, ", ".join(STATS_FORMATS)))
+
+        path = Path(path)
+        temporary_path = path.with_name(path.name + ".tmp")
+        temporary_path.write_text("".join(line + "\n" for line in lines))
+        os.replace(str(temporary_path), str(path))
+
+    def __repr__(self):
+        return "BatchReport(files={}, succeeded={}, failed={}, elapsed={:.3f})".format(
+            len(self.results), len(self.succeeded), len(self.failed), self.elapsed)
+
+
+def convert_many(paths, output_dir=None, jobs=None, level=0, skip_existing=False, stats=False,
+                 trace_memory=False):
+    """Convert several files to fits, spreading them across a process pool
+
+    Each file is converted exactly as done by open_file and write_fits, so the fits files
+    are the same as the ones created one by one. An error on a file doesn't stop the others,
+    it's kept on the result of that file.
+
+    Parameters:
+        paths : list - Files to be converted, str or pathlib.Path.
+        output_dir : str, pathlib.Path, optional - Where fits files are written.
+        jobs : int, optional - Number of processes, by default the number of CPUs.
+                               With 1 job files are converted on the current process.
+        level : int, optional - Fits level of the files written.
+        skip_existing : bool, optional - Files whose fits file already exists are skipped instead of failing,
+                        so an interrupted batch can be resumed.
+        stats : bool, optional - Keep stats of each stage on the result of each file, see BatchReport.write_stats.
+        trace_memory : bool, optional - Trace memory with tracemalloc, so stats have the peak memory of each stage.
+                       Tracing slows conversions down.
+
+    Returns:
+        BatchReport
+    """
+    paths = list(paths)
+    jobs = jobs or os.cpu_count() or 1
+
+    convert_file = partial(_convert_file, output_dir=output_dir, level=level, skip_existing=skip_existing)
+    if stats:
+        convert_file = partial(_profile_conversion, convert_file, trace_memory=trace_memory)
+
+    start = time.perf_counter()
+
+    if jobs == 1 or len(paths) <= 1:
+        results = [convert_file(path) for path in paths]
+    else:
+        chunk_size = max(1, len(paths) // (jobs * CHUNKS_PER_JOB))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(convert_file, paths, chunksize=chunk_size))
+
+    return BatchReport(results, time.perf_counter() - start)
+
+
+def get_instrument_class(path):
+    """Returns instrument class able to open a file, according to the file name
+
+    Raises:
+        ValueError: If no instrument supports the file.
+    """
+    # Only the file name is used, files are checked when opened
+    instrument, _ = detect_file_type(path, Path(path).name, sniff=False)
+
+    return craamvert.get_instrument_class(instrument)
+
+
+def _convert_file(path, output_dir, level, skip_existing=False):
+    start = time.perf_counter()
+    size = records = 0
+
+    try:
+        size = os.stat(str(path)).st_size
+        instrument_class = get_instrument_class(path)
+
+        # Fits file name is known from the file header and time span, so files already converted are never read
+        if skip_existing:
+            output, records = _get_fits_path_and_records(path, instrument_class, output_dir, level)
+            if output.exists():
+                return ConversionResult(path, output=output, elapsed=time.perf_counter() - start, size=size,
+                                        records=records, skipped=True)
+
+        instrument_object = instrument_class.open_file(str(path))
+        records = instrument_object.get_records()
+
+        _apply_fits_level(instrument_object, level)
+        output = instrument_object.write_fits(output_path=output_dir)
+    except Exception as error:
+        # Errors are returned instead of raised, so one file doesn't stop the whole batch
+        return ConversionResult(path, error="{}: {}".format(type(error).__name__, error),
+                                elapsed=time.perf_counter() - start, size=size, records=records)
+
+    return ConversionResult(path, output=output, elapsed=time.perf_counter() - start, size=size, records=records)
+
+
+def _get_fits_path_and_records(path, instrument_class, output_dir, level):
+    # Same name as Instrument.get_fits_path, from the catalog description of the file
+    catalog_entry = describe_file(path)
+    fits_file_name, fits_output_path = get_fits_file_name_and_output_path(None,
+                                                                          output_dir,
+                                                                          catalog_entry.date,
+                                                                          catalog_entry.start_time,
+                                                                          catalog_entry.end_time,
+                                                                          catalog_entry.file_type,
+                                                                          level,
+                                                                          instrument_class()._fits_file_name)
+
+    return fits_output_path / fits_file_name, catalog_entry.records
+
+
+def _profile_conversion(convert_file, path, trace_memory=False):
+    with StageProfiler(trace_memory) as profiler:
+        result = convert_file(path)
+
+    result.stages = profiler.to_dicts()
+
+    return result
+
+
+def _get_prometheus_lines(results):
+    # Stages run more than once for a file are gathered, e.g. deinterleave, which runs once per category
+    samples = dict()
+    for result in results:
+        for stage_stats in result.stages or list():
+            gathered_stats = samples.setdefault((str(result.path), stage_stats["stage"]), dict())
+
+            for _, stats_key, _ in PROMETHEUS_METRICS:
+                value = stage_stats[stats_key]
+                gathered_value = gathered_stats.get(stats_key)
+
+                # Peak memory is None when memory isn't traced
+                if value is None or gathered_value is None:
+                    gathered_stats[stats_key] = value if gathered_value is None else gathered_value
+                elif stats_key == "peak_memory":
+                    gathered_stats[stats_key] = max(gathered_value, value)
+                else:
+                    gathered_stats[stats_key] = gathered_value + value
+
+    lines = list()
+    for metric, stats_key, description in PROMETHEUS_METRICS:
+        lines.append("# HELP {} {}".format(metric, description))
+        lines.append("# TYPE {} gauge".format(metric))
+
+        for (file_name, stage_name), gathered_stats in samples.items():
+            if gathered_stats[stats_key] is not None:
+                lines.append(PROMETHEUS_SAMPLE.format(metric, _escape_label(file_name), _escape_label(stage_name),
+                                                      gathered_stats[stats_key]))
+
+    return lines
+
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _apply_fits_level(instrument_object, level):
+    if level == 0:
+        return
+
+    level_conversion = getattr(instrument_object, "level_{}".format(level), None)
+    if level_conversion is None or level > 1:
+        # Fits level 2 groups several files, so it's not available for single files
+        raise ValueError(FITS_LEVEL_NOT_AVAILABLE.format(level))
+
+    level_conversion()
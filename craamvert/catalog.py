@@ -0,0 +1,306 @@
+import os
+import sqlite3
+from pathlib import Path
+
+from craamvert.instruments.utils.converter_registry import get_converter, CONVERTER_DESCRIBE_METHOD
+from craamvert.instruments.utils.file_type_detector import match_file_name, get_path_to_xml
+from craamvert.instruments.utils.record_index import RECORD_INDEX_EXTENSION
+from craamvert.utils import INVALID_FILE_NAME, CATALOG_NOT_AVAILABLE_ERROR
+
+# Catalog database is kept inside the archive by default
+CATALOG_FILE_NAME = ".craamvert-catalog.sqlite"
+CATALOG_VERSION = 1
+
+# Files created by craamvert itself, which may be kept inside the archive
+SKIPPED_EXTENSIONS = (RECORD_INDEX_EXTENSION, ".fits")
+
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    instrument TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    subtype TEXT,
+    date TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    records INTEGER NOT NULL,
+    format_epoch TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_by_type_and_date ON files (instrument, file_type, subtype, date);
+CREATE INDEX IF NOT EXISTS files_by_time ON files (date, start_time, end_time);
+"""
+
+CATALOG_COLUMNS = ["path", "instrument", "file_type", "subtype", "date", "start_time", "end_time", "records",
+                   "format_epoch", "size", "mtime"]
+
+
+class CatalogEntry:
+    """Description of a single archive file, as kept on the catalog"""
+
+    def __init__(self, path, instrument, file_type, subtype, date, start_time, end_time, records, format_epoch,
+                 size, mtime):
+        # All attributes must be declared on __init__
+        self.path = path
+        self.instrument = instrument
+        self.file_type = file_type
+
+        # RBD type (Integration, Subintegration or Auxiliary), None for types without subtypes
+        self.subtype = subtype
+
+        # Date as YYYY-MM-DD and time span as HH:MM:SS
+        self.date = date
+        self.start_time = start_time
+        self.end_time = end_time
+
+        self.records = records
+        self.format_epoch = format_epoch
+
+        # Original file information, used to know if the entry is still valid
+        self.size = size
+        self.mtime = mtime
+
+    def as_row(self):
+        return tuple(getattr(self, column) for column in CATALOG_COLUMNS)
+
+    def __repr__(self):
+        return "CatalogEntry(path={!r}, instrument={!r}, file_type={!r}, subtype={!r}, date={!r}, " \
+               "start_time={!r}, end_time={!r}, records={!r})".format(self.path, self.instrument, self.file_type,
+                                                                      self.subtype, self.date, self.start_time,
+                                                                      self.end_time, self.records)
+
+
+class ScanReport:
+    """Changes done to the catalog by a scan, as lists of paths"""
+
+    def __init__(self):
+        # All attributes must be declared on __init__
+        self.added = list()
+        self.updated = list()
+        self.unchanged = list()
+        self.removed = list()
+
+        # Files with a supported name which couldn't be described, e.g. empty files
+        self.failed = list()
+
+    def __repr__(self):
+        return "ScanReport(added={}, updated={}, unchanged={}, removed={}, failed={})".format(
+            len(self.added), len(self.updated), len(self.unchanged), len(self.removed), len(self.failed))
+
+
+class Catalog:
+    """Local SQLite catalog of an archive of instrument files
+
+    Each file is described only from its name, its header and the time of its first and last records,
+    so scanning an archive never reads the data itself. Files are described again only when
+    their size or modification time change.
+
+    Example:
+        with Catalog("archive") as catalog:
+            catalog.scan()
+            paths = catalog.find_paths(SST_INSTRUMENT, RBD_TYPE, subtype="Integration", date="2012-01-27",
+                                       start="14:00:00", end="15:00:00")
+            convert_many(paths, level=1)
+    """
+
+    def __init__(self, archive_path, database_path=None):
+        # All attributes must be declared on __init__
+        self.archive_path = Path(archive_path).expanduser()
+
+        if database_path is None:
+            database_path = self.archive_path / CATALOG_FILE_NAME
+        self.database_path = Path(database_path).expanduser()
+
+        self.__connection = sqlite3.connect(str(self.database_path))
+        self.__create_tables()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.__connection.close()
+
+    def scan(self, paths=None):
+        """Adds new and changed files to the catalog and removes deleted ones
+
+        Parameters:
+            paths : list, optional - Files to be scanned, every file inside the archive by default.
+                    When given, only these files are added or updated, and nothing is removed.
+
+        Returns:
+            ScanReport
+        """
+        report = ScanReport()
+        remove_missing = paths is None
+
+        if paths is None:
+            paths = (path for path in self.archive_path.rglob("*") if path.is_file())
+
+        known_files = {path: (size, mtime) for path, size, mtime in
+                       self.__connection.execute("SELECT path, size, mtime FROM files")}
+
+        scanned_paths = set()
+        new_entries = list()
+
+        for path in paths:
+            path = Path(path)
+
+            # Sidecar indexes, fits files and the catalog itself may be kept next to the archive files
+            if path.suffix in SKIPPED_EXTENSIONS or path.name.startswith(CATALOG_FILE_NAME):
+                continue
+            if get_instrument_and_type(path.name) is None:
+                continue
+
+            key = str(path)
+            scanned_paths.add(key)
+            file_stat = os.stat(key)
+
+            # Only size and modification time are compared, the file is never opened when unchanged
+            if known_files.get(key) == (file_stat.st_size, file_stat.st_mtime_ns):
+                report.unchanged.append(key)
+                continue
+
+            try:
+                new_entries.append(describe_file(path))
+            except (ValueError, IndexError, OSError):
+                report.failed.append(key)
+                continue
+
+            if key in known_files:
+                report.updated.append(key)
+            else:
+                report.added.append(key)
+
+        if remove_missing:
+            report.removed = [key for key in known_files if key not in scanned_paths]
+
+        # Files which failed are also removed, since their previous description isn't valid anymore
+        removed_rows = [(key,) for key in report.removed + report.failed]
+
+        with self.__connection:
+            self.__connection.executemany("DELETE FROM files WHERE path = ?", removed_rows)
+            self.__connection.executemany("INSERT OR REPLACE INTO files VALUES ({})".format(
+                ", ".join("?" * len(CATALOG_COLUMNS))), [entry.as_row() for entry in new_entries])
+
+        return report
+
+    def find(self, instrument=None, file_type=None, subtype=None, date=None, start=None, end=None):
+        """Returns files matching every given filter, sorted by date and start time
+
+        Parameters:
+            instrument : str, optional - e.g. SST or POEMAS.
+            file_type : str, optional - e.g. RBD or TRK.
+            subtype : str, optional - RBD type, e.g. Integration for rs files.
+            date : str, optional - Date as YYYY-MM-DD.
+            start : str, optional - Keep only files with records from this HH:MM:SS time.
+            end : str, optional - Keep only files with records until this HH:MM:SS time.
+
+        Returns:
+            list of CatalogEntry
+        """
+        conditions = list()
+        parameters = list()
+
+        for column, value in (("instrument", instrument), ("file_type", file_type), ("subtype", subtype),
+                              ("date", date)):
+            if value is not None:
+                conditions.append("{} = ?".format(column))
+                parameters.append(value)
+
+        # Files overlapping the time window, not only the ones inside it
+        if start is not None:
+            conditions.append("end_time >= ?")
+            parameters.append(start)
+        if end is not None:
+            conditions.append("start_time <= ?")
+            parameters.append(end)
+
+        query = "SELECT {} FROM files".format(", ".join(CATALOG_COLUMNS))
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY date, start_time, path"
+
+        return [CatalogEntry(*row) for row in self.__connection.execute(query, parameters)]
+
+    def find_paths(self, *args, **kwargs):
+        """Same as find, but returns only the path of each file
+
+        Returns:
+            list of pathlib.Path
+        """
+        return [Path(entry.path) for entry in self.find(*args, **kwargs)]
+
+    def group_by_date(self, *args, **kwargs):
+        """Same as find, but returns paths grouped by observation date, e.g. to create level 2 files
+
+        Returns:
+            dict - The key is the date and the value is a list of paths sorted by start time.
+        """
+        groups = dict()
+
+        for entry in self.find(*args, **kwargs):
+            groups.setdefault(entry.date, []).append(Path(entry.path))
+
+        return groups
+
+    # -------------------------------------------------------------
+    #                      PRIVATE FUNCTIONS
+    #             always use __ before function name
+    # -------------------------------------------------------------
+
+    def __create_tables(self):
+        version = self.__connection.execute("PRAGMA user_version").fetchone()[0]
+
+        # Catalogs are only a cache of the archive, so older ones are built again
+        if version != CATALOG_VERSION:
+            with self.__connection:
+                self.__connection.execute("DROP TABLE IF EXISTS files")
+                self.__connection.execute("PRAGMA user_version = {}".format(CATALOG_VERSION))
+
+        self.__connection.executescript(CATALOG_SCHEMA)
+
+
+def get_instrument_and_type(file_name):
+    """Returns instrument and file type of a file, according to the file name
+
+    Returns:
+        tuple containing instrument and file type, or None when no instrument supports the file
+    """
+    candidates = match_file_name(file_name)
+
+    return candidates[0] if candidates else None
+
+
+def describe_file(path):
+    """Describes a file from its name, header and the time of its first and last records
+
+    The file is described by the describe method of the converter registered for its type,
+    so only that converter is imported.
+
+    Raises:
+        ValueError: If the file name is invalid, no instrument supports it or its converter can't describe files.
+        IndexError: If there's no record with nonzero time.
+    """
+    path = Path(path)
+    instrument_and_type = get_instrument_and_type(path.name)
+
+    if instrument_and_type is None:
+        raise ValueError(INVALID_FILE_NAME.format(path.name))
+
+    instrument, file_type = instrument_and_type
+    converter = get_converter(instrument, file_type)
+
+    if not hasattr(converter, CONVERTER_DESCRIBE_METHOD):
+        raise ValueError(CATALOG_NOT_AVAILABLE_ERROR.format(file_type, instrument))
+
+    file_stat = os.stat(str(path))
+
+    # Only the header and the time of the first and last records are read
+    description = converter().describe(path, path.name, get_path_to_xml(instrument, file_type))
+
+    return CatalogEntry(str(path), instrument, file_type, size=file_stat.st_size, mtime=file_stat.st_mtime_ns,
+                        **description)
@@ -0,0 +1,117 @@
+import argparse
+import sys
+from glob import glob
+from pathlib import Path
+
+from craamvert.instruments.utils.file_type_detector import match_file_name
+from craamvert.utils import STATS_FORMATS, JSON_LINES_FORMAT
+
+BYTES_IN_A_MEGABYTE = 1024 * 1024
+
+CONVERT_SUMMARY = "{} files: {} converted, {} skipped, {} failed in {:.2f} s " \
+                  "({:.2f} files/s, {:.2f} MB/s, {:.0f} records/s)"
+CONVERT_ERROR = "{}: {}"
+
+# Characters which make an input a glob pattern
+GLOB_CHARACTERS = "*?["
+
+
+def main(argv=None):
+    """craamvert command line, e.g. craamvert convert --jobs 4 --level 1 --out fits 'archive/**/rs*'
+
+    Returns:
+        int - Exit status, 1 when any file failed
+    """
+    parser = create_parser()
+    arguments = parser.parse_args(argv)
+
+    return arguments.command_function(arguments)
+
+
+def create_parser():
+    """Returns the parser of the craamvert command line"""
+    parser = argparse.ArgumentParser(prog="craamvert",
+                                     description="Convert data to fits type according to instruments available at CRAAM")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="convert files to fits")
+    convert_parser.add_argument("inputs", nargs="+",
+                                help="files, directories or glob patterns, e.g. 'archive/**/rs*'")
+    convert_parser.add_argument("--jobs", "-j", type=int, default=None,
+                                help="number of processes, by default the number of CPUs")
+    convert_parser.add_argument("--level", "-l", type=int, default=0, help="fits level of the files written")
+    convert_parser.add_argument("--out", "-o", default=None, help="directory where fits files are written")
+    convert_parser.add_argument("--stats", default=None,
+                                help="file where wall time, bytes, records and peak memory "
+                                     "of each conversion stage are written, for every file")
+    convert_parser.add_argument("--stats-format", choices=STATS_FORMATS, default=JSON_LINES_FORMAT,
+                                help="format of the stats file, JSON lines or a Prometheus textfile")
+    convert_parser.add_argument("--trace-memory", action="store_true",
+                                help="trace peak memory of each stage with tracemalloc, slows conversions down")
+    convert_parser.set_defaults(command_function=convert)
+
+    return parser
+
+
+def convert(arguments):
+    """Converts every input file, skipping files whose fits file already exists, and prints a throughput summary"""
+    # The batch runner imports the instruments, so it's only imported when something is converted
+    from craamvert.batch import convert_many
+
+    if arguments.out:
+        Path(arguments.out).expanduser().mkdir(parents=True, exist_ok=True)
+
+    paths = expand_inputs(arguments.inputs)
+    report = convert_many(paths, arguments.out, jobs=arguments.jobs, level=arguments.level, skip_existing=True,
+                          stats=arguments.stats is not None, trace_memory=arguments.trace_memory)
+
+    if arguments.stats:
+        report.write_stats(Path(arguments.stats).expanduser(), arguments.stats_format)
+
+    for result in report.failed:
+        print(CONVERT_ERROR.format(result.path, result.error), file=sys.stderr)
+
+    files_per_second, bytes_per_second, records_per_second = report.get_throughput()
+    print(CONVERT_SUMMARY.format(len(report.results), len(report.converted), len(report.skipped),
+                                 len(report.failed), report.elapsed, files_per_second,
+                                 bytes_per_second / BYTES_IN_A_MEGABYTE, records_per_second))
+
+    return 1 if report.failed else 0
+
+
+def expand_inputs(inputs):
+    """Returns files found on inputs, in order and without repetitions
+
+    Files given by name are always kept, so an unsupported file is reported as failed.
+    Files found on directories or glob patterns are kept only when an instrument supports their name,
+    so indexes, fits files and others found next to them are skipped.
+
+    Parameters:
+        inputs : list - Files, directories or glob patterns, ** matches any number of directories.
+
+    Returns:
+        list of pathlib.Path
+    """
+    # Dict keys keep the input order without repetitions
+    paths = dict()
+
+    for file_input in inputs:
+        is_pattern = any(character in file_input for character in GLOB_CHARACTERS)
+
+        if is_pattern:
+            found_paths = [Path(path) for path in sorted(glob(str(Path(file_input).expanduser()), recursive=True))]
+        else:
+            found_paths = [Path(file_input).expanduser()]
+
+        for path in found_paths:
+            if path.is_dir():
+                paths.update((file_path, None) for file_path in sorted(path.rglob("*"))
+                             if file_path.is_file() and match_file_name(file_path.name))
+            elif not is_pattern or match_file_name(path.name):
+                paths[path] = None
+
+    return list(paths)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
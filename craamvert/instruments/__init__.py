@@ -14,6 +14,22 @@ FREQUENCY = 'frequen'
 HISTORY = 'history'
 COMMENT = 'comment'
 
+# Fits Time Data
+TIME_SYSTEM = 'timesys'
+MJD_REFERENCE = 'mjdref'
+TIME_UNIT = 'timeunit'
+UTC = 'UTC'
+SECONDS = 's'
+
+# Time columns are stored as integer milliseconds, which TIMEUNIT doesn't allow,
+# so they are scaled to seconds when read
+MILLISECONDS_TO_SECONDS = 0.001
+
+# Fits Scaled Data
+TSCALE = 'TSCAL{}'
+TZERO = 'TZERO{}'
+QUANTIZATION_ERROR = 'TQERR{}'
+
 # Timezones
 TIMEZONE = 'tz'
 GMT_NEGATIVE_3 = 'GMT-3'
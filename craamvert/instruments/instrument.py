@@ -1,8 +1,13 @@
+import os
 from abc import ABC, abstractmethod
 from pathlib import Path
-from re import search
 
-from craamvert.utils import FILE_NOT_FOUND_ERROR, XML_TABLE_PATH, INVALID_FILE_TYPE_ERROR, INSTRUMENT_TO_TYPE_MAP
+from craamvert.instruments.utils.converter_registry import get_converter
+from craamvert.instruments.utils.file_type_detector import detect_file_type
+from craamvert.instruments.utils.fits_handlers import get_fits_file_name_and_output_path
+from craamvert.instruments.utils import stage_profiler
+from craamvert.instruments.utils.stage_profiler import stage, StageProfiler, OPEN_FILE_STAGE, PRIMARY_HDU_STAGE
+from craamvert.utils import FILE_NOT_FOUND_ERROR, XML_TABLE_PATH, INVALID_FILE_TYPE_ERROR
 
 
 # Please check python docs to further understand this class
@@ -29,7 +34,11 @@ class Instrument(ABC):
 
         # Fits information
         self._fits_level = 0
-        self._primary_hdu = None
+        self._fits_file_name = None
+        self.__primary_hdu = None
+
+        # Creates the primary HDU on its first use, so astropy is only imported when fits files are created
+        self._primary_hdu_factory = None
 
     # -------------------------------------------------------------
     # Abstract methods
@@ -53,6 +62,18 @@ class Instrument(ABC):
         Parameters:
             name: str, optional
             output_path: str, optional
+
+        Returns:
+            pathlib.Path - Path of the fits file created
+        """
+        pass
+
+    @abstractmethod
+    def get_records(self):
+        """Returns number of records of the instrument data
+
+        Returns:
+            int
         """
         pass
 
@@ -70,31 +91,112 @@ class Instrument(ABC):
     # Shared methods
     # -------------------------------------------------------------
 
-    def _verify_original_file_type(self, file_name):
+    @staticmethod
+    def add_stage_callback(callback):
+        """Registers a function called with the StageStats of every stage finished by any instrument
+
+        Stages are open_file, level_1, level_2 and write_fits, and the stages run inside them,
+        e.g. open_file.read or write_fits.writeto. Each one has its wall time, bytes read and written,
+        records processed and, when tracemalloc is tracing, its peak memory.
+
+        Parameters:
+            callback : function - Receives a StageStats.
+        """
+        stage_profiler.add_stage_callback(callback)
+
+    @staticmethod
+    def remove_stage_callback(callback):
+        """Removes a function registered by add_stage_callback
+
+        Raises:
+            ValueError: If the function is not registered.
+        """
+        stage_profiler.remove_stage_callback(callback)
+
+    @staticmethod
+    def profile_stages(trace_memory=True):
+        """Returns a context manager that keeps stats of every stage finished inside it, on its stages list
+
+        Parameters:
+            trace_memory : bool, optional - Start tracemalloc while profiling, so peak memory is known.
+
+        Returns:
+            StageProfiler
+        """
+        return StageProfiler(trace_memory)
+
+    def _stage(self, name):
+        """Returns a stage context manager for this object, see stage_profiler.stage"""
+        file_name = self._original_file_name
+        if isinstance(file_name, list):
+            file_name = ", ".join(file_name)
+
+        return stage(name, file_name)
+
+    @property
+    def _primary_hdu(self):
+        """Fits Primary Header Data Unit (HDU), created by the primary HDU factory on its first use"""
+        if self.__primary_hdu is None and self._primary_hdu_factory is not None:
+            with self._stage(PRIMARY_HDU_STAGE):
+                self.__primary_hdu = self._primary_hdu_factory()
+            self._primary_hdu_factory = None
+
+        return self.__primary_hdu
+
+    @_primary_hdu.setter
+    def _primary_hdu(self, primary_hdu):
+        self.__primary_hdu = primary_hdu
+        self._primary_hdu_factory = None
+
+    def _open_original_file(self, file_name, original_file_name=None):
+        """Function to verify and convert the original file, as the open_file stage
+
+        Parameters:
+               file_name : str, pathlib.Path, buffer - File to be opened.
+               original_file_name : str, optional - Name of the file, for buffers.
+        """
+        with stage(OPEN_FILE_STAGE) as open_file_stats:
+            self._verify_original_file_type(file_name, original_file_name)
+            self._verify_original_file_path()
+            open_file_stats.file_name = self._original_file_name
+
+            self._set_path_to_xml()
+            self._get_converted_data()
+
+            open_file_stats.bytes_read = self.__get_original_file_size()
+            open_file_stats.records = self.get_records()
+
+    def __get_original_file_size(self):
+        if isinstance(self._original_file_path, bytes):
+            return len(self._original_file_path)
+
+        return os.stat(str(self._original_file_path)).st_size
+
+    def _verify_original_file_type(self, file_name, original_file_name=None):
         """Function to verify if the file to be converted type is supported
 
+        Only the file name is matched, so directories never change the file type.
+        Bytes are matched by their original file name, or by their content when there's no name.
+
         Parameters:
                file_name : str, pathlib.Path, buffer - File to be opened.
+               original_file_name : str, optional - Name of the file, for buffers.
 
         Raises:
             ValueError: If instrument type is invalid or if file to be converted type is not supported
         """
         self._original_file_path = file_name
+        self._original_file_name = original_file_name
 
-        available_instrument_types = INSTRUMENT_TO_TYPE_MAP[self._instrument]
-
-        instrument_file_type = None
+        if self._original_file_name is None and not isinstance(file_name, bytes):
+            self._original_file_name = Path(file_name).name
 
-        # Check if file contains any of the necessary identifiers
-        for available_type in available_instrument_types:
-            for identifier in available_instrument_types[available_type]:
-                if (search(identifier, self._original_file_path)) or (search(identifier, self._original_file_path)):
-                    instrument_file_type = available_type
-
-        if not instrument_file_type:
-            raise ValueError(INVALID_FILE_TYPE_ERROR.format(self._original_file_path, self._instrument))
-        else:
-            self._original_file_type = instrument_file_type
+        try:
+            # Named files are trusted by name, their content is only checked by the converter
+            _, self._original_file_type = detect_file_type(file_name, self._original_file_name or "",
+                                                           self._instrument, sniff=False)
+        except ValueError:
+            raise ValueError(INVALID_FILE_TYPE_ERROR.format(self._original_file_name or "<bytes>", self._instrument))
 
     def _verify_original_file_path(self):
         """Function to verify if path of file to be converted exists
@@ -102,8 +204,12 @@ class Instrument(ABC):
             Raises:
                 FileNotFoundError: If the XML file for the instrument was not found.
         """
-        if not isinstance(self._original_file_path, bytes):
-            self._original_file_path = Path(self._original_file_path).expanduser()
+        # Buffers are already the file content
+        if isinstance(self._original_file_path, bytes):
+            self._original_file_name = self._original_file_name or ""
+            return
+
+        self._original_file_path = Path(self._original_file_path).expanduser()
         if not self._original_file_path.exists():
             raise FileNotFoundError(FILE_NOT_FOUND_ERROR.format(self._original_file_path))
 
@@ -116,12 +222,54 @@ class Instrument(ABC):
                 ValueError: If the path to the xml files is invalid.
         """
 
-        self._path_to_xml = Path(__file__).parent / Path(XML_TABLE_PATH.format(self._instrument,
+        self._path_to_xml = Path(__file__).parent / Path(XML_TABLE_PATH.format(self._instrument.lower(),
                                                                                self._original_file_type))
 
         if not self._path_to_xml.exists():
             raise ValueError(INVALID_FILE_TYPE_ERROR.format(self._original_file_type, self._instrument))
 
+    def _convert_original_file(self, **options):
+        """Function to run the converter registered for the original file type, and only this one
+
+            Parameters:
+                options : Options of the converter, e.g. start and end.
+
+            Returns:
+                Converter object with the converted data
+
+            Raises:
+                ValueError: If there's no converter for the original file type.
+        """
+        converter = get_converter(self._instrument, self._original_file_type)
+
+        return converter().convert_from_file(self._original_file_path, self._original_file_name, self._path_to_xml,
+                                             **options)
+
+    def get_fits_path(self, name=None, output_path=None, fits_level=None):
+        """Returns path of the fits file created by write_fits, the file may already exist
+
+        Parameters:
+            name: str, optional
+            output_path: str, optional
+            fits_level: int, optional - Fits level of the file, the current fits level by default.
+
+        Returns:
+            pathlib.Path
+        """
+        if fits_level is None:
+            fits_level = self._fits_level
+
+        fits_file_name, fits_output_path = get_fits_file_name_and_output_path(name,
+                                                                              output_path,
+                                                                              self._date,
+                                                                              self._start_time,
+                                                                              self._end_time,
+                                                                              self._original_file_type,
+                                                                              fits_level,
+                                                                              self._fits_file_name)
+
+        return fits_output_path / fits_file_name
+
     def get_fits_level(self):
         """Returns fits level
 
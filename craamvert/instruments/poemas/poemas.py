@@ -1,14 +1,24 @@
-from craamvert.instruments import HISTORY, CONVERTED_WITH_FITS_LEVEL
-from instruments.utils.fits_handlers import set_fits_file_name_and_output_path
+import os
+
+from craamvert.instruments import HISTORY, CONVERTED_WITH_FITS_LEVEL, START_TIME, END_TIME, OBSERVATION_DATE, \
+    MJD_REFERENCE
+from craamvert.instruments.utils.fits_handlers import set_fits_file_name_and_output_path
+from craamvert.instruments.utils.hdu_handlers import add_time_keywords
 from craamvert.instruments.poemas import POEMASDataType, POEMAS_FITS_FILE_NAME
-from craamvert.instruments.poemas.utils.create_hdu import create_data_hdu
-from craamvert.utils import CANT_CONVERT_FITS_LEVEL, POEMAS_INSTRUMENT, TRK_TYPE, \
-    COULDNT_MATCH_CONVERTED_DATA_TO_INSTRUMENT
+from craamvert.instruments.poemas.utils.create_hdu import create_data_hdu, get_scale_and_zero, quantize_data
+from craamvert.utils import CANT_CONVERT_FITS_LEVEL, POEMAS_INSTRUMENT, \
+    COULDNT_MATCH_CONVERTED_DATA_TO_INSTRUMENT, INVALID_QUANTIZATION_TYPE, julday
+from craamvert.utils.grouped_reduction import grouped_median
+from craamvert.utils.sorted_merge import merge_positions, merge_sorted, drop_duplicated_positions
+from craamvert.instruments.utils.stage_profiler import LEVEL_1_STAGE, LEVEL_2_STAGE, WRITE_FITS_STAGE, \
+    DATA_HDU_STAGE, WRITETO_STAGE, STREAM_STAGE
+from craamvert.utils.lazy_import import lazy_import
 import numpy as np
-from astropy.io import fits
 
-from instruments.instrument import Instrument
-from instruments.poemas.trk import trk
+from craamvert.instruments.instrument import Instrument
+
+# astropy is only imported when fits files are created
+fits = lazy_import("astropy.io.fits")
 
 # Please check python docs to further understand this class
 # https://docs.python.org/3/library/abc.html
@@ -26,42 +36,107 @@ class POEMAS(Instrument):
         # POEMAS information
         self._records = None
 
+        # 0 UT of the observation date, in seconds since 2001-01-01
+        # Body data time is given in milliseconds since this reference
+        self._time_reference = None
+
         # POEMAS Header data is equivalent to:
         # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
         self._poemas_header_column_names = None
         self._poemas_header_data = None
 
         # POEMAS Body data is equivalent to:
-        # sec, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+        # time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
         self._poemas_body_column_names = None
         self._poemas_body_data = None
 
+        # Number of samples used to calculate each second mark on fits level 1
+        self._samples_per_second = None
+
+        # HH:MM:SS time window of records kept from the original file, all records are kept when None
+        self._start = None
+        self._end = None
+
+        # When True, the sidecar index of the original file is used
+        self._index = False
+
         # Fits information
         self._primary_hdu_position = 0
+        self._fits_file_name = POEMAS_FITS_FILE_NAME
 
     @staticmethod
-    def open_file(file_name):
+    def open_file(file_name, start=None, end=None, index=False, original_file_name=None):
+        """Open POEMAS file and return a POEMAS object
+
+        Parameters:
+               file_name : str, pathlib.Path, buffer - File to be opened.
+               start : str, optional - Keep only records from this HH:MM:SS time.
+               end : str, optional - Keep only records until this HH:MM:SS time.
+                       Records are found by binary search on time, so the rest of the file is never read.
+               index : bool, optional - Use the sidecar index of the file (.cidx) to find time span and time window,
+                       the index is built and written next to the file when there's no valid one.
+               original_file_name : str, optional - Name of the file when it's given as a buffer,
+                                    e.g. SunTrack_120127_105135.TRK, otherwise the file type is found from the buffer content.
+        """
         poemas_object = POEMAS()
+        poemas_object._start = start
+        poemas_object._end = end
+        poemas_object._index = index
 
-        poemas_object._verify_original_file_type(file_name)
-        poemas_object._verify_original_file_path()
-        poemas_object._set_path_to_xml()
-        poemas_object._get_converted_data()
+        poemas_object._open_original_file(file_name, original_file_name)
 
         return poemas_object
 
-    def write_fits(self, name=None, output_path=None):
-        # Create fits Binary Header Data Unit (HDU) to keep POEMAS header data
-        # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
-        poemas_header_hdu = create_data_hdu(self._poemas_header_column_names,
-                                            self._poemas_header_data,
-                                            POEMASDataType.HEADER)
+    def write_fits(self, name=None, output_path=None, block_records=None, quantize=None):
+        """
+        Function to create a fits file with POEMAS information
+
+        Parameters:
+            name: str, optional
+            output_path: str, optional
+            block_records: int, optional - When set, level 0 data is written in blocks
+                           of this number of records, so memory is bounded by the block size.
+            quantize: numpy.int16 or numpy.int32, optional - When set, TB columns are stored as
+                      scaled integers of this type, with TSCAL and TZERO chosen from the range of each column.
+                      The maximum quantization error of each column is kept in its TQERR keyword.
+
+        Returns:
+            pathlib.Path - Path of the fits file created
+
+        Raises:
+            ValueError: If quantize is not numpy.int16 or numpy.int32.
+        """
+        with self._stage(WRITE_FITS_STAGE) as write_fits_stats:
+            fits_path = self.__write_fits(name, output_path, block_records, quantize)
+
+            write_fits_stats.bytes_written = os.path.getsize(fits_path)
+            write_fits_stats.records = self.get_records()
+
+        return fits_path
+
+    def __write_fits(self, name, output_path, block_records, quantize):
+        streamed = bool(block_records) and self._fits_level == 0
+        quantization = self.__get_quantization(quantize, block_records if streamed else None)
+
+        if streamed:
+            return self.__stream_fits(name, output_path, block_records, quantization)
 
-        # Create fits Binary Header Data Unit (HDU) to keep POEMAS data
-        # sec, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
-        poemas_data_hdu = create_data_hdu(self._poemas_body_column_names,
-                                          self._poemas_body_data,
-                                          POEMASDataType.BODY)
+        with self._stage(DATA_HDU_STAGE) as data_hdu_stats:
+            # Create fits Binary Header Data Unit (HDU) to keep POEMAS header data
+            # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
+            poemas_header_hdu = create_data_hdu(self._poemas_header_column_names,
+                                                self._poemas_header_data,
+                                                POEMASDataType.HEADER)
+
+            # Create fits Binary Header Data Unit (HDU) to keep POEMAS data
+            # time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+            poemas_data_hdu = create_data_hdu(self._poemas_body_column_names,
+                                              self._poemas_body_data,
+                                              POEMASDataType.BODY,
+                                              quantization)
+            add_time_keywords(poemas_data_hdu, julday.mjd_array(self._time_reference))
+
+            data_hdu_stats.records = self.get_records()
 
         # Create HDU list with all HDUs created until now
         hdu_list = fits.HDUList([self._primary_hdu, poemas_header_hdu, poemas_data_hdu])
@@ -69,24 +144,156 @@ class POEMAS(Instrument):
         hdu_list[self._primary_hdu_position].header.append((HISTORY, CONVERTED_WITH_FITS_LEVEL
                                                             .format(self._fits_level)))
 
-        fits_file_name, fits_output_path = set_fits_file_name_and_output_path(name,
-                                                                              output_path,
-                                                                              self._date,
-                                                                              self._start_time,
-                                                                              self._end_time,
-                                                                              self._original_file_type,
-                                                                              self._fits_level,
-                                                                              POEMAS_FITS_FILE_NAME)
-        hdu_list.writeto(fits_output_path / fits_file_name)
+        fits_file_name, fits_output_path = self.__set_fits_file_name_and_output_path(name, output_path)
+
+        with self._stage(WRITETO_STAGE) as writeto_stats:
+            hdu_list.writeto(fits_output_path / fits_file_name)
+
+            writeto_stats.bytes_written = os.path.getsize(fits_output_path / fits_file_name)
+
+        return fits_output_path / fits_file_name
+
+    def __set_fits_file_name_and_output_path(self, name, output_path):
+        return set_fits_file_name_and_output_path(name,
+                                                  output_path,
+                                                  self._date,
+                                                  self._start_time,
+                                                  self._end_time,
+                                                  self._original_file_type,
+                                                  self._fits_level,
+                                                  POEMAS_FITS_FILE_NAME)
+
+    def __get_quantization(self, quantize, block_records):
+        """Returns integer type, scale and zero of each TB column, chosen from the range of its data.
+        When block_records is set, the range is found block by block.
+        """
+        if quantize is None:
+            return None
+
+        if quantize not in (np.int16, np.int32):
+            raise ValueError(INVALID_QUANTIZATION_TYPE.format(quantize))
+
+        # Only TB data is quantized
+        # time, ele_ang, azi_ang, >>TBL_45, TBR_45, TBL_90, TBR_90<<
+        tb_column_names = list(self._poemas_body_column_names)[3:]
+
+        blocks = [self._poemas_body_data]
+        if block_records:
+            blocks = self._poemas_body_data.iter_blocks(block_records)
+
+        minimums = [np.inf] * len(tb_column_names)
+        maximums = [-np.inf] * len(tb_column_names)
+
+        for block in blocks:
+            for position, tb_data in enumerate(block[3:]):
+                if len(tb_data):
+                    minimums[position] = min(minimums[position], np.min(tb_data))
+                    maximums[position] = max(maximums[position], np.max(tb_data))
+
+        quantization = dict()
+        for column_name, minimum, maximum in zip(tb_column_names, minimums, maximums):
+            # Columns without data can keep any scale
+            if minimum > maximum:
+                minimum = maximum = 0
+
+            quantization[column_name] = (quantize,) + get_scale_and_zero(minimum, maximum, quantize)
+
+        return quantization
+
+    def __stream_fits(self, name, output_path, block_records, quantization=None):
+        """Write level 0 fits file block by block, body data is never fully kept in memory
+
+        NRS, BRTMin, BRTMax and t_end are filled with the values found in the data,
+        once the last block has been written.
+        """
+        fits_file_name, fits_output_path = self.__set_fits_file_name_and_output_path(name, output_path)
+        fits_path = fits_output_path / fits_file_name
+
+        # First we write the primary HDU and the HDU with POEMAS header data
+        # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
+        poemas_header_hdu = create_data_hdu(self._poemas_header_column_names,
+                                            self._poemas_header_data,
+                                            POEMASDataType.HEADER)
+
+        hdu_list = fits.HDUList([self._primary_hdu, poemas_header_hdu])
+        hdu_list[self._primary_hdu_position].header.append((HISTORY, CONVERTED_WITH_FITS_LEVEL
+                                                            .format(self._fits_level)))
+        with self._stage(WRITETO_STAGE):
+            hdu_list.writeto(fits_path)
+
+        # Then we create the header of the HDU with POEMAS data from an empty block,
+        # setting the number of rows that are going to be written
+        # time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+        empty_data_hdu = create_data_hdu(self._poemas_body_column_names,
+                                         self._poemas_body_data.get_block(0, 0),
+                                         POEMASDataType.BODY,
+                                         quantization)
+        empty_data_hdu.header["NAXIS2"] = self._poemas_body_data.get_number_of_samples()
+        add_time_keywords(empty_data_hdu, julday.mjd_array(self._time_reference))
+
+        # Rows are written as they are stored in fits files, with big-endian values
+        row_data_type = empty_data_hdu.columns.dtype.newbyteorder(">")
+
+        records_written = 0
+        brt_min = brt_max = end_second = None
+
+        with self._stage(STREAM_STAGE) as stream_stats, \
+                fits.StreamingHDU(str(fits_path), empty_data_hdu.header) as streaming_hdu:
+            for block in self._poemas_body_data.iter_blocks(block_records):
+                rows = np.empty(block.get_number_of_samples(), dtype=row_data_type)
+                for column_name, column_data in zip(row_data_type.names, block):
+                    if quantization and column_name in quantization:
+                        integer_type, scale, zero = quantization[column_name]
+                        column_data = quantize_data(column_data, scale, zero, integer_type)
+
+                    rows[column_name] = column_data
+
+                streaming_hdu.write(rows.view(np.uint8))
+
+                # Here we keep track of the values found in the data
+                # TBL_45, TBR_45, TBL_90, TBR_90
+                records_written += len(block.records)
+                stream_stats.records = records_written
+                stream_stats.bytes_written += rows.nbytes
+                block_brt_min = min(tb.min() for tb in block[3:])
+                block_brt_max = max(tb.max() for tb in block[3:])
+                brt_min = block_brt_min if brt_min is None else min(brt_min, block_brt_min)
+                brt_max = block_brt_max if brt_max is None else max(brt_max, block_brt_max)
+
+                nonzero = np.flatnonzero(block.seconds)
+                if nonzero.size:
+                    end_second = block.seconds[nonzero[-1]]
+
+        # Finally we update header information, now that all data has been written
+        self._poemas_header_data[0]["NRS"] = records_written
+        if brt_min is not None:
+            self._poemas_header_data[0]["BRTMin"] = brt_min
+            self._poemas_header_data[0]["BRTMax"] = brt_max
+        if end_second is not None:
+            self._end_time = str(julday.time_array(end_second))
+
+        with fits.open(fits_path, mode="update") as written_hdu_list:
+            written_hdu_list[self._primary_hdu_position].header[END_TIME] = self._date + 'T' + self._end_time
+
+            poemas_header_data = written_hdu_list[1].data
+            for column_name in ("NRS", "BRTMin", "BRTMax"):
+                poemas_header_data[0][column_name] = self._poemas_header_data[0][column_name]
+
+        return fits_path
+
+    def get_records(self):
+        """Returns number of records of POEMAS body data, as found on NRS
+
+            Returns:
+                int
+        """
+        # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
+        return int(self._poemas_header_data[0]["NRS"])
 
     def _get_converted_data(self):
 
-        poemas_available_converters = {
-            TRK_TYPE: trk.TRK().convert_from_file(self._original_file_path,
-                                                  self._original_file_name,
-                                                  self._path_to_xml)
-        }
-        converted_data = poemas_available_converters.get(self._original_file_type)
+        # Only the converter of the original file type is imported and run
+        converted_data = self._convert_original_file(start=self._start, end=self._end, index=self._index)
 
         self._match_type_object_attributes_to_instrument_attributes(converted_data)
 
@@ -98,18 +305,19 @@ class POEMAS(Instrument):
             self._start_time = converted_data.start_time
             self._end_time = converted_data.end_time
             self._records = converted_data.records
+            self._time_reference = converted_data.time_reference
 
             # Match data information
             # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
             self._poemas_header_column_names = converted_data.header_column_names
             self._poemas_header_data = converted_data.header_data
 
-            # sec, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+            # time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
             self._poemas_body_column_names = converted_data.body_column_names
             self._poemas_body_data = converted_data.body_data
 
             # Match Fits information
-            self._primary_hdu = converted_data.primary_hdu
+            self._primary_hdu_factory = converted_data.primary_hdu_factory
 
         except AttributeError:
             print(COULDNT_MATCH_CONVERTED_DATA_TO_INSTRUMENT.format(self._instrument, self._original_file_type))
@@ -118,117 +326,177 @@ class POEMAS(Instrument):
     # POEMAS specific methods
     # -------------------------------------------------------------
 
+    def get_samples_per_second(self):
+        """Returns number of samples used to calculate each second mark on fits level 1
+
+            Returns:
+                numpy array
+        """
+        return self._samples_per_second
+
     def level_1(self):
         if self._fits_level != 0:
             raise ValueError(CANT_CONVERT_FITS_LEVEL.format(1, self._fits_level, self._fits_level))
 
+        with self._stage(LEVEL_1_STAGE) as level_1_stats:
+            self.__convert_to_level_1()
+
+            level_1_stats.records = self.get_records()
+
+    def __convert_to_level_1(self):
         # Fits level 1 for POEMAS consists in reducing the data by calculating the median
         # from all data inside 1 second mark, meaning that the records will be reduced
         # we'll have only seconds registered, instead of milliseconds
 
-        # POEMAS body data category size
-        # sec, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
-        body_data_category_size = 7
-
-        # 7 arrays to represent each body data category
-        body_data = [[], [], [], [], [], [], []]
-
-        # Here we prepare variables that will be used inside our loop
-        # We'll keep track of chunks of data, these chunks represents all data inside a second mark
-        original_data_position = 0
-        is_inside_data_chunk = False
-
-        # Our loop limit will be the size of data
-        loop_limit = len(self._poemas_body_data[0])
-
-        for data_position in range(0, loop_limit):
-            # Here we check which second mark we're looking
-            time_data = self._poemas_body_data[0][data_position]
-            time_data = time_data[3:-3]
-
-            # When not inside the data chunk it means that we're looking inside a new second mark
-            if not is_inside_data_chunk:
-                initial_second_mark = current_second_mark = time_data
-                original_data_position = data_position
-                is_inside_data_chunk = True
-            else:
-                current_second_mark = time_data
-
-            # When we finish to look inside a second mark, we have to calculate the median
-            # and store the result inside our new array
-            if int(initial_second_mark) != int(current_second_mark) or data_position + 1 == loop_limit:
-                # First we store which second mark we're looking
-                body_data[0].append(self._poemas_body_data[0][original_data_position])
-
-                # Here we calculate the median of all other data
-                # ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
-                for field in range(1, body_data_category_size):
-                    slice_section = slice(original_data_position, data_position)
-                    data_chunk = self._poemas_body_data[field][slice_section]
-                    median = np.median(data_chunk)
-                    body_data[field].append(median)
-
-                # Then we update our chunk tracker
-                is_inside_data_chunk = False
+        # Here we check which second mark each sample belongs to
+        # Time is given in milliseconds, so no parsing is needed
+        time_data = np.asarray(self._poemas_body_data[0])
+        second_marks = time_data // 1000
+
+        # Then we group all samples inside the same second mark and calculate the median
+        # of all other data at once
+        # ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+        first_positions, samples_per_second, medians = grouped_median(second_marks, self._poemas_body_data[1:])
+
+        # For each second mark we keep the time of its first sample
+        # time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+        body_data = [time_data[first_positions]]
+        body_data.extend(medians)
 
         # Here we update our object attributes with the new data
         self._poemas_body_data = body_data
-        self._fits_level = 1
+        self._samples_per_second = samples_per_second
 
         # Here we update the header data
         # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
         # Update NRS
-        self._poemas_header_data[0][1] = len(self._poemas_body_data[0][1])
+        self._poemas_header_data[0]["NRS"] = len(self._poemas_body_data[0])
 
         # Finally que update our fits level
         self._fits_level = 1
 
-    def level_2(self, poemas_objects_list):
+    def level_2(self, poemas_objects_list, drop_duplicates=False):
+        """Groups data from all level 1 objects of a day into this object
+
+        Parameters:
+            poemas_objects_list: list - POEMAS objects on fits level 1 or paths to level 1 fits files.
+                                 Fits files are memory mapped, so their data is only read when merged.
+                                 The list itself is not changed.
+            drop_duplicates: bool, optional - When True, each second found in more than one object is kept
+                             only once, from the object that comes first (this object, then the list order).
+
+        Raises:
+            ValueError: If this object or any object from the list is not on fits level 1.
+        """
         if self._fits_level != 1:
             raise ValueError(CANT_CONVERT_FITS_LEVEL.format(2, self._fits_level, self._fits_level))
 
-        # Fits level 2 for POEMAS consists in group all data from a day into a single fits file
+        with self._stage(LEVEL_2_STAGE) as level_2_stats:
+            self.__convert_to_level_2(poemas_objects_list, drop_duplicates)
 
-        # Here we sort all poemas objects from a day, so they will be in ascending order
-        poemas_objects_list.append(self)
-        poemas_objects_list.sort(key=lambda poemas_object: poemas_object._start_time)
+            level_2_stats.records = self.get_records()
 
-        # 7 arrays to represent each body data category
-        # sec, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
-        body_data = [[], [], [], [], [], [], []]
-        body_data_category_size = 7
+    def __convert_to_level_2(self, poemas_objects_list, drop_duplicates):
+        # Fits level 2 for POEMAS consists in group all data from a day into a single fits file
 
-        # Here we group all data form poemas objects to a new array
+        # Here we gather all poemas objects from a day, files are opened without reading their data
+        poemas_objects = [self]
         for poemas_object in poemas_objects_list:
-            for body_data_category in range(0, body_data_category_size):
-                body_data[body_data_category].extend(poemas_object._poemas_body_data[body_data_category])
+            if not isinstance(poemas_object, POEMAS):
+                poemas_object = POEMAS.__open_level_1_fits(poemas_object)
+
+            if poemas_object._fits_level != 1:
+                raise ValueError(CANT_CONVERT_FITS_LEVEL.format(2, poemas_object._fits_level,
+                                                                poemas_object._fits_level))
+            poemas_objects.append(poemas_object)
+
+        # Each object keeps time since its own time reference, so time is moved to our time reference
+        # Level 1 time is already in ascending order
+        time_data = [np.asarray(poemas_object._poemas_body_data[0], dtype=np.int64)
+                     + (poemas_object._time_reference - self._time_reference) * 1000
+                     for poemas_object in poemas_objects]
+
+        # Here we find where each second mark goes inside the day, merging all objects by time
+        # instead of appending them one after another
+        positions = merge_positions(time_data)
+        kept = [slice(None)] * len(poemas_objects)
+        size = sum(len(position) for position in positions)
+
+        if drop_duplicates:
+            kept, positions, size = drop_duplicated_positions(time_data, positions)
+
+        # Each category is copied only once, into an array with the size of the whole day
+        # time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+        body_data = list()
+        for category in range(len(self._poemas_body_data)):
+            category_data = [np.asarray(poemas_object._poemas_body_data[category])[keep]
+                             for poemas_object, keep in zip(poemas_objects, kept)]
+
+            if category == 0:
+                category_data = [time[keep] for time, keep in zip(time_data, kept)]
+
+            data_type = np.asarray(self._poemas_body_data[category]).dtype.newbyteorder("=")
+            body_data.append(merge_sorted(category_data, positions, size, data_type))
+
+        # Number of samples of each second mark is only known for objects converted on this session
+        samples_per_second = None
+        if all(poemas_object._samples_per_second is not None for poemas_object in poemas_objects):
+            samples_per_second = merge_sorted([poemas_object._samples_per_second[keep]
+                                               for poemas_object, keep in zip(poemas_objects, kept)],
+                                              positions, size)
 
         # Here we update our object attributes with the new data
         self._poemas_body_data = body_data
+        self._samples_per_second = samples_per_second
 
         # Here we update the header data
         # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
-        total_nrs = 0
-        brt_min_list = []
-        brt_max_list = []
+        # BRTMin and BRTMax are kept from the headers of all objects, as they were written by the instrument
+        self._poemas_header_data[0]["NRS"] = size
+        self._poemas_header_data[0]["BRTMin"] = min(poemas_object._poemas_header_data[0]["BRTMin"]
+                                                    for poemas_object in poemas_objects)
+        self._poemas_header_data[0]["BRTMax"] = max(poemas_object._poemas_header_data[0]["BRTMax"]
+                                                    for poemas_object in poemas_objects)
+        if size:
+            # We also update some basic information
+            first_second, last_second = self._time_reference + body_data[0][[0, -1]] // 1000
+            self._start_time, self._end_time = (str(time) for time in julday.time_array([first_second,
+                                                                                         last_second]))
+            self._time = self._start_time
+
+            self._primary_hdu.header[START_TIME] = self._date + 'T' + self._start_time
+            self._primary_hdu.header[END_TIME] = self._date + 'T' + self._end_time
 
-        # Gather all information
-        for poemas_object in poemas_objects_list:
-            total_nrs += poemas_object._poemas_header_data[0]["NRS"]
-            brt_min_list.append(poemas_object._poemas_header_data[0]["BRTMin"])
-            brt_max_list.append(poemas_object._poemas_header_data[0]["BRTMax"])
+        # Finally we update our fits level
+        self._fits_level = 2
+
+    @staticmethod
+    def __open_level_1_fits(path):
+        """Returns POEMAS object from a level 1 fits file.
+        The file is memory mapped, so data is only read from disk when accessed.
+        """
+        poemas_object = POEMAS()
 
-        # Update header information
-        self._poemas_header_data[0]["NRS"] = total_nrs
-        self._poemas_header_data[0]["BRTMin"] = min(brt_min_list)
-        self._poemas_header_data[0]["BRTMax"] = max(brt_max_list)
+        with fits.open(path, memmap=True) as hdu_list:
+            primary_header = hdu_list[poemas_object._primary_hdu_position].header
+            poemas_object._date = primary_header[OBSERVATION_DATE]
+            poemas_object._start_time = primary_header[START_TIME].split('T')[1]
+            poemas_object._end_time = primary_header[END_TIME].split('T')[1]
+            poemas_object._time = poemas_object._start_time
 
-        # We also update some basic information
-        self._time = poemas_objects_list[0]._time
-        self._start_time = poemas_objects_list[0]._start_time
+            # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
+            poemas_object._poemas_header_data = np.array(hdu_list[1].data)
 
-        last_object_position = len(poemas_objects_list) - 1
-        self._end_time = poemas_objects_list[last_object_position]._end_time
+            # time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+            body_hdu = hdu_list[2]
+            poemas_object._poemas_body_data = [body_hdu.data.field(category)
+                                               for category in range(len(body_hdu.columns))]
 
-        # Finally we update our fits level
-        self._fits_level = 2
+            # Time is scaled to seconds when read, so its stored milliseconds are taken from the records instead
+            poemas_object._poemas_body_data[0] = body_hdu.data.view(np.ndarray)[body_hdu.columns[0].name]
+            poemas_object._time_reference = int(round((body_hdu.header[MJD_REFERENCE] - julday.JULDAY_EPOCH_MJD)
+                                                      * julday.SECONDS_IN_A_DAY))
+
+        poemas_object._fits_level = 1
+
+        return poemas_object
@@ -1,11 +1,15 @@
-import xml.etree.ElementTree as xmlet
+from functools import partial
 from pathlib import Path
-import collections
-import numpy as np
 
-from craamvert.utils import julday, TRK_TYPE, INVALID_XML_FILE
-from craamvert.instruments import XML_TYPE_TO_NUMPY_TYPE, CASLEO, GMT_NEGATIVE_3
-from instruments.utils.hdu_handlers import create_primary_hdu
+from craamvert.utils import julday, iso_time, TRK_TYPE, INVALID_XML_FILE, NO_RECORDS_IN_TIME_WINDOW_ERROR
+from craamvert.instruments import CASLEO, GMT_NEGATIVE_3
+from craamvert.instruments.utils.hdu_handlers import create_primary_hdu
+from craamvert.instruments.utils.schema_registry import get_schema
+from craamvert.instruments.utils.memmap_handlers import map_file, create_structured_view, first_and_last_nonzero, \
+    find_time_window
+from craamvert.instruments.utils.record_index import get_record_index
+from craamvert.instruments.utils.stage_profiler import stage, SCHEMA_STAGE, READ_STAGE
+from craamvert.instruments.poemas.trk.trk_body_data import TRKBodyData
 from craamvert.instruments.poemas import POEMASDataType, POEMAS_TRK, POEMAS_FULL_NAME, POEMAS_LATITUDE_LONGITUDE_HEIGHT, \
     POEMAS_FREQUENCY
 
@@ -28,220 +32,244 @@ class TRK:
         self.end_time = None
         self.records = None
 
+        # 0 UT of the observation date, in seconds since 2001-01-01
+        self.time_reference = None
+
         # TRK Header data is equivalent to:
         # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
         self.header_column_names = None
         self.header_data = None
 
         # TRK Body data is equivalent to:
-        # sec, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+        # time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
         self.body_column_names = None
         self.body_data = None
 
         self.__treated_body_column_names = None
         self.__treated_body_data = None
 
+        # Sidecar index of the original file, only used when requested
+        self.__record_index = None
+
         # Fits information
-        self.primary_hdu = None
+        # The primary HDU is only created when used, so opening a file never imports astropy
+        self.primary_hdu_factory = None
 
-    def convert_from_file(self, path, file_name, path_to_xml):
+    def convert_from_file(self, path, file_name, path_to_xml, start=None, end=None, index=False, header_only=False):
         """Loads data from a file and returns an `TRK` object.
 
         Parameters:
                 path : pathlib.Path - Location of the TRK file in the file system.
                 file_name : str - Name of the TRK file.
                 path_to_xml : Path, optional - Location of the TRK xml description files in the file system.
+                start : str, optional - Keep only records from this HH:MM:SS time.
+                end : str, optional - Keep only records until this HH:MM:SS time.
+                index : bool, optional - Use the sidecar index of the file (.cidx) to find time span and time window,
+                        the index is built and written next to the file when there's no valid one.
+                header_only : bool, optional - Only describe the file, its date, records and time span,
+                              only the header and the time of the first and last records are read.
 
         Raises:
-                ValueError: If the filename is invalid.
+                ValueError: If the filename is invalid, or there's no record between start and end.
         """
 
-        # Extract values equivalent to TRK header
-        # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
-        self.header_column_names = self.__get_column_names(path_to_xml, POEMASDataType.HEADER)
-        trk_header_column_names_list = list()
-        for key, value in self.header_column_names.items():
-            trk_header_column_names_list.append((key, value[1], value[0]))
-
-        # Extract values equivalent to TRK body
-        # sec, ele_ang, azi_ang, TB
-        self.body_column_names = self.__get_column_names(path_to_xml, POEMASDataType.BODY)
-        trk_data_column_names_list = list()
-        for key, value in self.body_column_names.items():
-            trk_data_column_names_list.append((key, value[1], value[0]))
+        with stage(SCHEMA_STAGE):
+            # Extract values equivalent to TRK header
+            # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
+            header_schema = self.__get_schema(path_to_xml, POEMASDataType.HEADER)
+            self.header_column_names = header_schema.get_column_names()
+
+            # Extract values equivalent to TRK body
+            # sec, ele_ang, azi_ang, TB
+            body_schema = self.__get_schema(path_to_xml, POEMASDataType.BODY)
+            self.body_column_names = body_schema.get_column_names()
+
+            # Extract values equivalent to treated TRK body, with TB separated by case
+            # time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+            self.__treated_body_column_names = self.__get_schema(path_to_xml,
+                                                                 POEMASDataType.FULL_BODY).get_column_names()
 
         # Extract values from file that is going to be converted
         # Values will match values from respective lists
-
-        # First, the header is extracted
-        # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
-        # That's why we set count=1, otherwise all data will from file will be classified as header
-
-        # Then, data is extracted
-        # sec, ele_ang, azi_ang, TB
-        # This data is interspersed, since we want to keep reading it, we don't set count
-        # We set count=1 at first to read only the header, then we set offset=28 because we already read the header
-        if isinstance(path, bytes):
-            self.header_data = np.frombuffer(path, trk_header_column_names_list, count=1)
-            self.body_data = np.frombuffer(path, trk_data_column_names_list, offset=28)
-        else:
-            self.header_data = np.fromfile(str(path), trk_header_column_names_list, count=1)
-            self.body_data = np.fromfile(str(path), trk_data_column_names_list, offset=28)
+        with stage(READ_STAGE) as read_stats:
+            # The file is mapped into memory only once, nothing is read or copied here
+            raw_data = map_file(path)
+
+            # First, the header is extracted
+            # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
+            # That's why we set count=1, otherwise all data will from file will be classified as header
+            # The header is copied, since NRS is updated by level 1 and buffers are mapped read-only
+            self.header_data = create_structured_view(raw_data, header_schema.data_type, count=1).copy()
+
+            # Then, data is extracted
+            # sec, ele_ang, azi_ang, TB
+            # This data is interspersed, since we want to keep reading it, we don't set count
+            # We set offset to the header size, because the header comes first
+            self.body_data = create_structured_view(raw_data, body_schema.data_type,
+                                                    offset=self.header_data.dtype.itemsize)
+
+            # Get number of records present on file (NRS)
+            self.records = self.header_data[0][1]
+
+            # Only the header is read here, records are read when treated
+            read_stats.bytes_read = self.header_data.dtype.itemsize
+            read_stats.records = int(self.records)
+
+        if header_only:
+            # NRS is trusted only up to the records really found on the file
+            self.records = min(max(int(self.records), 0), len(self.body_data))
+            self.body_data = self.body_data[:self.records]
+
+            self.date, self.time = self.__get_date().split(" ")
+            self.start_time, self.end_time = self.__get_time_span()
+            return self
+
+        # Buffers have no file to keep an index next to
+        if index and not isinstance(path, bytes):
+            self.__record_index = get_record_index(path, self.body_data["sec"][:self.records],
+                                                   PATH_TO_XML_TRK_COLUMN_NAME[POEMASDataType.BODY])
 
         # Get date according to julian day pattern
         self.date, self.time = self.__get_date().split(" ")
+        self.time_reference = self.__get_time_reference()
 
-        # Get number of records present on file (NRS)
-        self.records = self.header_data[0][1]
+        # Keep only records inside the time window
+        if start is not None or end is not None:
+            self.__select_time_window(start, end)
 
         # Treat TRK data
         # Keep in mind that the TB field comes in chunks of 400 items,
-        # That way we need to create a new header to separate TB cases
-        # sec, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
-        self.__treated_body_column_names = self.__get_column_names(path_to_xml, POEMASDataType.FULL_BODY)
-
+        # That way we use the full body description, which separates TB cases
         # Here we'll treat body data position, to fix interspersed
         self.__treat_trk_body_data()
 
         # Get time span of records
         self.start_time, self.end_time = self.__get_time_span()
 
-        # Create fits Primary Header Data Unit (HDU)
-        self.primary_hdu = create_primary_hdu(self.date,
-                                              self.start_time,
-                                              self.end_time,
-                                              POEMAS_FULL_NAME,
-                                              POEMAS_LATITUDE_LONGITUDE_HEIGHT,
-                                              CASLEO,
-                                              GMT_NEGATIVE_3,
-                                              TRK_TYPE,
-                                              file_name,
-                                              POEMAS_TRK,
-                                              POEMAS_FREQUENCY)
+        # Create fits Primary Header Data Unit (HDU) factory, with the information found up to now
+        self.primary_hdu_factory = partial(create_primary_hdu,
+                                           self.date,
+                                           self.start_time,
+                                           self.end_time,
+                                           POEMAS_FULL_NAME,
+                                           POEMAS_LATITUDE_LONGITUDE_HEIGHT,
+                                           CASLEO,
+                                           GMT_NEGATIVE_3,
+                                           TRK_TYPE,
+                                           file_name,
+                                           POEMAS_TRK,
+                                           POEMAS_FREQUENCY)
 
         self.body_column_names = self.__treated_body_column_names
         self.body_data = self.__treated_body_data
 
         return self
 
-    def __get_column_names(self, path_to_xml, xml_type):
+    def describe(self, path, file_name, path_to_xml):
+        """Describes a file from its header and the time of its first and last records, as done by header_only.
+
+        Parameters:
+                path : pathlib.Path - Location of the TRK file in the file system.
+                file_name : str - Name of the TRK file.
+                path_to_xml : Path - Location of the TRK xml description files in the file system.
+
+        Returns:
+                dict containing subtype (None, TRK has no subtypes), date, start_time, end_time, records
+                and format_epoch
+        """
+        self.convert_from_file(path, file_name, path_to_xml, header_only=True)
+
+        return dict(subtype=None, date=self.date, start_time=self.start_time, end_time=self.end_time,
+                    records=self.records, format_epoch=PATH_TO_XML_TRK_COLUMN_NAME[POEMASDataType.BODY])
+
+    def __get_schema(self, path_to_xml, xml_type):
         """ Method for finding the correct description file.
-        Returns a dict representing the description found,
-        the key is the variable name and the value is a list
-        containing the var dimension, type and unit respectively.
+        Returns the compiled schema of the description found,
+        its column names are a dict where the key is the variable name
+        and the value is a list containing the var dimension, type and unit respectively.
         """
         try:
             xml_path = PATH_TO_XML_TRK_COLUMN_NAME[xml_type]
         except KeyError:
             raise ValueError(INVALID_XML_FILE.format(xml_type))
 
-        xml = xmlet.parse(path_to_xml / Path(xml_path)).getroot()
+        # Each description file is only parsed once, then the compiled schema is reused
+        return get_schema(path_to_xml / Path(xml_path))
 
-        header = collections.OrderedDict()
+    def __select_time_window(self, start, end):
+        """Keeps only records from start to end, found by binary search on sec.
+        Records are kept as a view of the mapped file.
+        """
+        start_sec = end_sec = None
+        if start is not None:
+            start_sec = self.time_reference + int(iso_time.parse_time_array(start))
+        if end is not None:
+            end_sec = self.time_reference + int(iso_time.parse_time_array(end))
+
+        if self.__record_index is not None:
+            first, stop = self.__record_index.find_time_window(self.body_data["sec"][:self.records], start_sec, end_sec)
+        else:
+            first, stop = find_time_window(self.body_data["sec"][:self.records], start_sec, end_sec)
 
-        for child in xml:
-            var_name = child[0].text
-            var_dim = int(child[1].text)
-            var_type = child[2].text
-            var_unit = child[3].text
+        # Index positions refer to the whole file
+        self.__record_index = None
 
-            np_type = XML_TYPE_TO_NUMPY_TYPE[var_type]
+        if first == stop:
+            raise ValueError(NO_RECORDS_IN_TIME_WINDOW_ERROR.format(start, end))
 
-            header.update({var_name: [var_dim, np_type, var_unit]})
+        self.body_data = self.body_data[first:stop]
+        self.records = stop - first
 
-        return header
+        # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
+        self.header_data[0]["NRS"] = self.records
+
+        # Date and time are taken from the first record kept
+        self.date, self.time = self.__get_date().split(" ")
 
     def __get_time_span(self):
         """Returns a tuple containing the ISO time of the
         first and last record found in the data.
         """
+        if self.__record_index is not None:
+            start_time, end_time = julday.time_array([self.__record_index.start_time, self.__record_index.end_time])
+            return str(start_time), str(end_time)
 
-        nonzero = self.body_data["sec"].nonzero()
+        first, last = first_and_last_nonzero(self.body_data["sec"])
+        start_time, end_time = julday.time_array(self.body_data["sec"][[first, last]])
 
-        return (julday.time(int(self.body_data["sec"][nonzero[0][0]])),
-                julday.time(int(self.body_data["sec"][nonzero[0][-1]])))
+        return str(start_time), str(end_time)
 
     def __get_date(self):
         """Returns a string containing the ISO date and time of the
         first record found in the data.
         """
-        nonzero = self.body_data["sec"].nonzero()
+        first_sec = self.__get_first_second()
 
-        date = str(julday.date(int(self.body_data["sec"][nonzero[0][0]])) + " " +
-                   julday.time(int(self.body_data["sec"][nonzero[0][0]])))
+        date = str(julday.date_array(first_sec)) + " " + str(julday.time_array(first_sec))
 
         return date
 
+    def __get_time_reference(self):
+        """Returns 0 UT of the date of the first record found in the data,
+        in seconds since 2001-01-01.
+        """
+        return int(julday.day_start_array(self.__get_first_second()))
+
+    def __get_first_second(self):
+        """Returns time of the first record found in the data, in seconds since 2001-01-01"""
+        if self.__record_index is not None:
+            return self.__record_index.start_time
+
+        first, _ = first_and_last_nonzero(self.body_data["sec"])
+
+        return self.body_data["sec"][first]
+
     def __treat_trk_body_data(self):
-        # We currently have our body data inside self.trk_body_data stored like this:
-        # [  [sec, ele_ang, azi_ang, [TBL_45, TBR_45, TBL_90, TBR_90, TBL_45, TBR_45, ...],
-        #    [sec, ele_ang, azi_ang, [TBL_45, TBR_45, TBL_90, TBR_90, TBL_45, TBR_45, ...],
-        #                       .........................
-        #    [sec, ele_ang, azi_ang, [TBL_45, TBR_45, TBL_90, TBR_90, TBL_45, TBR_45, ...]  ]
-        # The number of arrays like this in self.trk_body_data is equivalent to self.records
-
-        # To make things easier, we need to create 7 arrays to keep data from the same "family" together
-        # [[sec, sec, ..., sec], [ele_ang, ele_ang, ..., ele_ang], ... [TBR_90, TBR_90, ..., TBR_90]]
-        # That way we'll have 7 arrays, each one with size equivalent to self.records
-
-        # TRK original data fields
-        # sec, ele_ang, azi_ang, TB
-        # We'll use names as iterators to better understand the procedure
-        original_data_fields = ['sec', 'ele_ang', 'azi_ang', 'TB']
-
-        # 7 arrays to represent each body data category
-        # sec, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
-        self.__treated_body_data = [[], [], [], [], [], [], []]
-
-        # This loop pass through self.trk_body_data arrays
-        for record in range(0, self.records):
-            field_position = 0
-
-            # In this loop we look inside the self.trk_body_data arrays and check
-            # sec, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
-            for field in original_data_fields:
-
-                if field == 'sec':
-                    sec = julday.sec(int(self.body_data[record][field_position]))
-                    time = julday.time(sec)
-                    final_sec_field = np.repeat(time, 100)
-                    self.__treated_body_data[field_position].extend(final_sec_field)
-
-                elif field == 'ele_ang' or field == 'azi_ang':
-                    ang = np.repeat(self.body_data[record][field_position], 100)
-                    self.__treated_body_data[field_position].extend(ang)
-
-                elif field == 'TB':
-                    # Here we apply transposition, to better understand this operation, check the following content:
-                    # https://en.wikipedia.org/wiki/Transpose
-                    # https://www.geeksforgeeks.org/transpose-matrix-single-line-python/
-                    # Basically, we switch columns to rows
-                    # We do this because the data inside TB is interspersed
-                    # [TBL_45, TBR_45, TBL_90, TBR_90, TBL_45, TBR_45, TBL_90, TBR_90, TBL_45, ...]
-
-                    # So first, we reshape the array size, to obtain this:
-                    # [TBL_45, TBR_45, TBL_90, TBR_90,
-                    #  TBL_45, TBR_45, TBL_90, TBR_90,
-                    #       .....
-                    #  TBL_45, TBR_45, TBL_90, TBR_90]
-
-                    # Then we transpose it, to obtain this:
-                    # [TBL_45, TBL_45, TBL_45, ..., TBL_45,
-                    #  TBR_45, TBR_45, TBR_45, ..., TBR_45,
-                    #           ......
-                    #  TBR_90, TBR_90, TBR_90, ..., TBR_90]
-
-                    tb_array = self.body_data[record][field_position].reshape(100, 4)
-                    tb_array = tb_array.transpose()
-
-                    # We know that TBs start at 3
-                    # sec, ele_ang, azi_ang, >>TB<<
-                    # But we have 4 different categories
-                    # TBL_45, TBR_45, TBL_90, TBR_90
-                    tb_category = 3
-
-                    for tb in tb_array:
-                        self.__treated_body_data[tb_category].extend(tb)
-                        tb_category += 1
-
-                field_position += 1
+        # Keep in mind that the TB field comes interspersed in chunks of 400 items
+        # TB categories are the treated body columns after sec, ele_ang and azi_ang
+        # time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+        tb_categories = len(self.__treated_body_column_names) - 3
+
+        # Each category will only be treated when accessed
+        # That way opening a file costs almost no memory
+        self.__treated_body_data = TRKBodyData(self.body_data[:self.records], tb_categories, self.time_reference)
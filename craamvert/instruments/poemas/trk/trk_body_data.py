@@ -0,0 +1,134 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from craamvert.instruments.utils.stage_profiler import stage, DEINTERLEAVE_STAGE
+from craamvert.utils import julday
+
+
+class TRKBodyData(Sequence):
+    """TRK body data separated by category, each category is only treated when accessed
+
+    Behaves as a list of 7 arrays:
+    time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+
+    Time is given in milliseconds since time_reference, in seconds since 2001-01-01.
+    """
+
+    def __init__(self, records, tb_categories, time_reference):
+        # All attributes must be declared on __init__
+
+        # We currently have our records stored like this:
+        # [  [sec, ele_ang, azi_ang, [TBL_45, TBR_45, TBL_90, TBR_90, TBL_45, TBR_45, ...],
+        #    [sec, ele_ang, azi_ang, [TBL_45, TBR_45, TBL_90, TBR_90, TBL_45, TBR_45, ...],
+        #                       .........................
+        #    [sec, ele_ang, azi_ang, [TBL_45, TBR_45, TBL_90, TBR_90, TBL_45, TBR_45, ...]  ]
+        # Records may be a memory mapped file, so nothing is read until a category is accessed
+        self.__records = records
+
+        # Fields are accessed by position, since their names may differ between descriptions
+        # sec, ele_ang, azi_ang, TB
+        self.__sec_field, self.__ele_ang_field, self.__azi_ang_field, self.__tb_field = records.dtype.names
+
+        # Every record holds several samples of each TB, so sec, ele_ang and azi_ang
+        # are repeated to match the number of samples
+        self.__tb_categories = tb_categories
+        self.__samples_per_record = records.dtype[self.__tb_field].shape[0] // tb_categories
+
+        # Treated categories are kept, so each one is treated only once
+        # time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+        self.__treated_categories = [None] * (3 + tb_categories)
+
+        # Time is kept as an offset from 0 UT of the observation date, instead of strings
+        self.__time_reference = time_reference
+
+    @property
+    def records(self):
+        """Returns original records, without any treatment"""
+        return self.__records
+
+    @property
+    def seconds(self):
+        """Returns original time of each record, in seconds since 2001-01-01"""
+        return self.__records[self.__sec_field]
+
+    @property
+    def time_reference(self):
+        """Returns time reference, in seconds since 2001-01-01"""
+        return self.__time_reference
+
+    def get_block(self, start, stop):
+        """Returns body data of records from start to stop, no data is read or copied"""
+        return TRKBodyData(self.__records[start:stop], self.__tb_categories, self.__time_reference)
+
+    def iter_blocks(self, block_records):
+        """Iterates over body data in blocks of block_records records, so a file can be treated
+        without keeping all of it in memory
+        """
+        for start in range(0, len(self.__records), block_records):
+            yield self.get_block(start, start + block_records)
+
+    def get_number_of_samples(self):
+        """Returns number of samples of each category, which is the size of each treated array"""
+        return len(self.__records) * self.__samples_per_record
+
+    def __len__(self):
+        return len(self.__treated_categories)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[category] for category in range(len(self))[position]]
+
+        category = range(len(self))[position]
+
+        if self.__treated_categories[category] is None:
+            # Categories are treated when first accessed, so this stage runs inside the stage accessing them
+            with stage(DEINTERLEAVE_STAGE) as deinterleave_stats:
+                self.__treated_categories[category] = self.__treat_category(category)
+
+                deinterleave_stats.bytes_read = self.__get_category_bytes(category)
+                deinterleave_stats.records = len(self.__records)
+
+        return self.__treated_categories[category]
+
+    def __get_category_bytes(self, category):
+        """Returns size of the original field of a category, read from the records when it's treated"""
+        if category == 0:
+            field = self.__sec_field
+        elif category == 1:
+            field = self.__ele_ang_field
+        elif category == 2:
+            field = self.__azi_ang_field
+        else:
+            # Each TB category is one of every tb_categories values of the TB field
+            return len(self.__records) * self.__records.dtype[self.__tb_field].itemsize // self.__tb_categories
+
+        return len(self.__records) * self.__records.dtype[field].itemsize
+
+    def __treat_category(self, category):
+        # To make things easier, we need to create 7 arrays to keep data from the same "family" together
+        # [[time, time, ..., time], [ele_ang, ele_ang, ..., ele_ang], ... [TBR_90, TBR_90, ..., TBR_90]]
+
+        if category == 0:
+            # Time is the same for all samples inside a record
+            time = julday.milliseconds_array(self.__records[self.__sec_field], self.__time_reference)
+            return np.repeat(time, self.__samples_per_record)
+
+        if category == 1:
+            return np.repeat(self.__records[self.__ele_ang_field], self.__samples_per_record)
+
+        if category == 2:
+            return np.repeat(self.__records[self.__azi_ang_field], self.__samples_per_record)
+
+        # TB data is interspersed inside each record
+        # [TBL_45, TBR_45, TBL_90, TBR_90, TBL_45, TBR_45, TBL_90, TBR_90, TBL_45, ...]
+
+        # So we take one of every tb_categories values, starting at the category position
+        # which is the same as reshaping and transposing the TB field, then taking one row
+        # TBL_45 starts at 3
+        # sec, ele_ang, azi_ang, >>TB<<
+        tb_position = category - 3
+        tb_data = self.__records[self.__tb_field][:, tb_position::self.__tb_categories]
+
+        # Only this category is copied into a new contiguous array
+        return tb_data.ravel()
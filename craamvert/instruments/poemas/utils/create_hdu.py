@@ -1,16 +1,23 @@
-from astropy.io import fits
+import numpy as np
 
-from craamvert.instruments import NUMPY_TYPE_TO_T_FORM_TYPE
+from craamvert.instruments import NUMPY_TYPE_TO_T_FORM_TYPE, TSCALE, TZERO, QUANTIZATION_ERROR
 from craamvert.instruments.poemas import POEMASDataType
 
+from craamvert.utils.lazy_import import lazy_import
 
-def create_data_hdu(column_names, data_array, data_type):
+# astropy is only imported when fits files are created
+fits = lazy_import("astropy.io.fits")
+
+
+def create_data_hdu(column_names, data_array, data_type, quantization=None):
     """Create fits Binary Header Data Unit (HDU)
 
     Param:
         column_names
         data_array
         data_type
+        quantization - optional dict where the key is the column name and the value is a tuple
+                       containing the integer type, scale and zero used to store that column
 
     Return:
         BinTableHDU
@@ -28,26 +35,95 @@ def create_data_hdu(column_names, data_array, data_type):
     # Here we create a data_position to be used as a counter, when creating column for TRK body data
     # TRK body data is composed of 11 arrays with data,
     # each array contains data from a different category:
-    # sec, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90 respectively
+    # time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90 respectively
     # we use data_position to know which array to access according to the category (TRK body column names items)
     data_position = 0
 
+    if quantization is None:
+        quantization = dict()
+
     for column, values in column_names.items():
         numpy_type = values[1]
-        t_format = NUMPY_TYPE_TO_T_FORM_TYPE[numpy_type]
-
         position = column if data_type == POEMASDataType.HEADER else data_position
+        array = data_array[position]
+
+        # Quantized columns are stored as integers, and scaled back when read
+        if column in quantization:
+            numpy_type, scale, zero = quantization[column]
+            array = quantize_data(array, scale, zero, numpy_type)
+
+        t_format = NUMPY_TYPE_TO_T_FORM_TYPE[numpy_type]
 
         fits_columns.append(fits.Column(
             name=column,
             format=t_format,
             unit=values[2],
-            array=data_array[position]
+            array=array
         ))
 
         data_position += 1
 
     poemas_hdu = fits.BinTableHDU.from_columns(fits.ColDefs(fits_columns))
 
+    add_quantization_keywords(poemas_hdu, column_names, quantization)
+
     return poemas_hdu
 
+
+def get_scale_and_zero(minimum, maximum, integer_type):
+    """Returns scale and zero that map values from minimum to maximum
+    onto the whole range of integer_type.
+
+    Values are read back as stored * scale + zero,
+    so the quantization error is at most half of the scale.
+
+    Param:
+        minimum
+        maximum
+        integer_type - numpy.int16 or numpy.int32
+
+    Return:
+        tuple containing scale and zero
+    """
+    integer_info = np.iinfo(integer_type)
+
+    scale = (float(maximum) - float(minimum)) / (int(integer_info.max) - int(integer_info.min))
+
+    # When all values are the same, any scale keeps them exactly
+    if scale == 0:
+        scale = 1.0
+
+    zero = float(minimum) - integer_info.min * scale
+
+    return scale, zero
+
+
+def quantize_data(data, scale, zero, integer_type):
+    """Returns data stored as integer_type, rounded to the nearest value of scale"""
+    integer_info = np.iinfo(integer_type)
+
+    stored = np.round((np.asarray(data, dtype=np.float64) - zero) / scale)
+
+    return np.clip(stored, integer_info.min, integer_info.max).astype(integer_type)
+
+
+def add_quantization_keywords(hdu, column_names, quantization):
+    """Add TSCAL and TZERO of each quantized column, and its maximum quantization error
+
+    astropy can't scale integer columns given as physical values,
+    so data is quantized beforehand and only the keywords are added here.
+    To better understand this procedure please check fits standard
+    https://fits.gsfc.nasa.gov/standard40/fits_standard40aa-le.pdf#subsection.7.3
+    """
+    for column_number, column in enumerate(column_names, start=1):
+        if column not in quantization:
+            continue
+
+        _, scale, zero = quantization[column]
+
+        hdu.header.insert("TFORM{}".format(column_number), (TSCALE.format(column_number), scale), after=True)
+        hdu.header.insert(TSCALE.format(column_number), (TZERO.format(column_number), zero), after=True)
+        hdu.header.insert(TZERO.format(column_number),
+                          (QUANTIZATION_ERROR.format(column_number), scale / 2, 'maximum quantization error'),
+                          after=True)
+
@@ -5,3 +5,14 @@ SST_FULL_NAME = 'Solar Submillimeter Telescope'
 SST_LATITUDE_LONGITUDE_HEIGHT = 'Lat = -31.79897222, Lon = -69.29669444, Height = 2.491 km'
 SST_RBD = 'SST Raw Binary Data file'
 SST_FREQUENCY = '212 GHz ch=1,2,3,4; 405 GHz ch=5,6'
+
+# Columns of reduced SST data
+# time    : time in Hus
+# adcval  : receiver's output, named adc on older data formats
+# elepos  : encoder's elevation
+# azipos  : encoder's azimuth
+# opmode  : observing mode
+# target  : target observed
+# x_off   : scan offset in azimuth
+# y_off   : scan offset in elevation
+SST_REDUCED_COLUMNS = ['time', 'adcval', 'elepos', 'azipos', 'opmode', 'target', 'x_off', 'y_off']
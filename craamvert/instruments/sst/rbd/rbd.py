@@ -1,11 +1,19 @@
-import xml.etree.ElementTree as xmlet
-from pathlib import Path
-import numpy as np
+from collections import OrderedDict
+from functools import partial
 
-from craamvert.instruments import XML_TYPE_TO_NUMPY_TYPE, CASLEO, GMT_NEGATIVE_3
-from instruments.utils.hdu_handlers import create_primary_hdu
+import numpy as np
+from numpy.lib.recfunctions import repack_fields
+
+from craamvert.instruments import CASLEO, GMT_NEGATIVE_3
+from craamvert.instruments.utils.hdu_handlers import create_primary_hdu
+from craamvert.instruments.sst.utils.format_epoch_index import get_format_epoch_index
+from craamvert.instruments.utils.memmap_handlers import map_file, create_structured_view, first_and_last_nonzero, \
+    find_time_window
+from craamvert.instruments.utils.record_index import get_record_index
+from craamvert.instruments.utils.stage_profiler import stage, SCHEMA_STAGE, READ_STAGE
 from craamvert.instruments.sst import SST_FULL_NAME, SST_LATITUDE_LONGITUDE_HEIGHT, SST_RBD, SST_FREQUENCY
-from craamvert.utils import INVALID_FILE_NAME, iso_time, RBD_TYPE
+from craamvert.utils import INVALID_FILE_NAME, INVALID_COLUMNS_ERROR, NO_RECORDS_IN_TIME_WINDOW_ERROR, iso_time, \
+    RBD_TYPE
 
 MAP_RBD_TYPE = {
     "RS": "Integration",
@@ -18,6 +26,99 @@ MAP_RBD_TYPE_TO_FILE_TYPE = {
     "Auxiliary": "Auxiliary"
 }
 
+# Receiver's output is named adc on older data formats and adcval on newer ones
+COLUMN_ALIASES = {
+    "adc": "adcval",
+    "adcval": "adc"
+}
+
+
+def get_rbd_type(file_name):
+    """Returns RBD type (Integration, Subintegration or Auxiliary) according to the file name prefix
+
+    Raises:
+            ValueError: If the filename is invalid.
+    """
+    type_prefix = file_name[:2].upper()
+
+    if type_prefix not in MAP_RBD_TYPE:
+        raise ValueError(INVALID_FILE_NAME.format(file_name))
+
+    return MAP_RBD_TYPE[type_prefix]
+
+
+def get_date_and_time(file_name):
+    """Returns ISO date and HH:MM time of a RBD file, according to the file name
+
+    Raises:
+            ValueError: If the filename is invalid.
+    """
+    file_name_date = file_name[2:].split(".")
+
+    if len(file_name_date[0]) == 6:
+        date = str(int(file_name_date[0][:2]) + 1900) + '-' + file_name_date[0][2:4] + '-' + file_name_date[0][4:6]
+    elif len(file_name_date[0]) == 7:
+        date = str(int(file_name_date[0][:3]) + 1900) + '-' + file_name_date[0][3:5] + '-' + file_name_date[0][5:7]
+    else:
+        raise ValueError(INVALID_FILE_NAME.format(file_name))
+
+    time = "00:00"
+    if len(file_name_date) > 1:
+        time = file_name_date[1][:2] + ":" + file_name_date[1][2:4]
+
+    return date, time
+
+
+def get_format_epoch(file_name, path_to_xml):
+    """Returns name of the xml file describing a RBD file, according to the file name
+
+    Raises:
+            ValueError: If the filename is invalid or there's no description for its date.
+    """
+    filetype = MAP_RBD_TYPE_TO_FILE_TYPE[get_rbd_type(file_name)]
+    date, _ = get_date_and_time(file_name)
+
+    return get_format_epoch_index(path_to_xml).get_format_epoch(filetype, date)
+
+
+def get_projected_columns(data_type, columns):
+    """Returns the fields of a RBD data type matching the requested columns, in the order they are stored.
+    Time is always kept, since time span and file names depend on it.
+
+    Raises:
+            ValueError: If any column is not found on the data type.
+    """
+    projected_columns = {"time"}
+
+    for column in columns:
+        if column not in data_type.names and COLUMN_ALIASES.get(column) in data_type.names:
+            column = COLUMN_ALIASES[column]
+
+        if column not in data_type.names:
+            raise ValueError(INVALID_COLUMNS_ERROR.format(column, ", ".join(data_type.names)))
+
+        projected_columns.add(column)
+
+    return [column for column in data_type.names if column in projected_columns]
+
+
+def group_by_format_epoch(file_names, path_to_xml):
+    """Groups RBD files by format epoch, so each data type is built once per epoch
+
+    Parameters:
+            file_names : list - Names of RBD files.
+            path_to_xml : Path - Location of the SST xml description files in the file system.
+
+    Returns:
+            dict - The key is the xml file describing the files and the value is a list of file names.
+    """
+    groups = dict()
+
+    for file_name in file_names:
+        groups.setdefault(get_format_epoch(file_name, path_to_xml), []).append(file_name)
+
+    return groups
+
 
 class RBD:
 
@@ -36,115 +137,189 @@ class RBD:
 
         self.__rbd_type = None
 
+        # Sidecar index of the original file, only used when requested
+        self.__record_index = None
+
         # Fits information
-        self.primary_hdu = None
+        # The primary HDU is only created when used, so opening a file never imports astropy
+        self.primary_hdu_factory = None
 
-    def convert_from_file(self, path, file_name, path_to_xml):
+    def convert_from_file(self, path, file_name, path_to_xml, mmap=False, columns=None, start=None, end=None,
+                          index=False, header_only=False):
         """Loads data from a file and returns an `SST` object.
 
         Parameters:
                 path : pathlib.Path - Location of the SST file in the file system.
                 file_name : str - Name of the SST file.
                 path_to_xml : Path, optional - Location of the SST xml description files in the file system.
+                mmap : bool, optional - Map the file into memory instead of reading it,
+                       columns are only read from disk when accessed.
+                columns : list, optional - Keep only these columns, time is always kept.
+                start : str, optional - Keep only records from this HH:MM:SS time.
+                end : str, optional - Keep only records until this HH:MM:SS time, its whole second is included.
+                index : bool, optional - Use the sidecar index of the file (.cidx) to find time span and time window,
+                        the index is built and written next to the file when there's no valid one.
+                header_only : bool, optional - Only describe the file, its date, records and time span,
+                              the file is mapped and only the time of the first and last records is read.
 
         Raises:
-                ValueError: If the filename is invalid.
+                ValueError: If the filename or any column is invalid, or there's no record between start and end.
         """
 
         # Match prefix to RBD type
-        type_prefix = file_name[:2].upper()
-        self.__rbd_type = MAP_RBD_TYPE[type_prefix]
-
-        # Get date from file name
-        file_name_date = file_name[2:].split(".")
-
-        if len(file_name_date[0]) == 6:
-            self.date = str(int(file_name_date[0][:2]) + 1900) + '-' + file_name_date[0][2:4] + '-' + file_name_date[
-                                                                                                            0][4:6]
-        elif len(file_name_date[0]) == 7:
-            self.date = str(int(file_name_date[0][:3]) + 1900) + '-' + file_name_date[0][3:5] + '-' + file_name_date[
-                                                                                                            0][5:7]
-        else:
-            raise ValueError(INVALID_FILE_NAME.format(file_name))
-
-        # Get time from file name
-        self.time = "00:00"
-        if len(file_name_date) > 1:
-            self.time = file_name_date[1][:2] + ":" + file_name_date[1][2:4]
+        self.__rbd_type = get_rbd_type(file_name)
 
-        # Extract values equivalent to RBD column names
-        self.column_names = self.__get_column_names(path_to_xml)
+        # Get date and time from file name
+        self.date, self.time = get_date_and_time(file_name)
 
-        rbd_column_names_list = list()
-        for key, value in self.column_names.items():
-            rbd_column_names_list.append((key, value[1], value[0]))
+        # Extract values equivalent to RBD column names
+        with stage(SCHEMA_STAGE):
+            schema = self.__get_schema(path_to_xml)
+            self.column_names = schema.get_column_names()
+            rbd_data_type = schema.data_type
 
         # Extract values equivalent to RBD data
-        if isinstance(path, bytes):
-            self.data = np.frombuffer(path, dtype=rbd_column_names_list)
-        else:
-            self.data = np.fromfile(str(path), dtype=rbd_column_names_list)
+        # When only some columns or records are kept, the file is also mapped, so only those are read
+        time_window = start is not None or end is not None
+        # Mapped files are only read when accessed and buffers are already in memory,
+        # so only files read at once count as bytes read
+        with stage(READ_STAGE) as read_stats:
+            if mmap or columns or time_window or header_only:
+                self.data = create_structured_view(map_file(path), rbd_data_type)
+            elif isinstance(path, bytes):
+                self.data = np.frombuffer(path, dtype=rbd_data_type)
+            else:
+                self.data = np.fromfile(str(path), dtype=rbd_data_type)
+                read_stats.bytes_read = self.data.nbytes
+
+            read_stats.records = len(self.data)
+
+        if header_only:
+            self.start_time, self.end_time = self.__get_time_span()
+            self.start_time = self.start_time[:8]
+            self.end_time = self.end_time[:8]
+            return self
+
+        # Buffers have no file to keep an index next to
+        if index and not isinstance(path, bytes):
+            self.__record_index = get_record_index(path, self.data["time"], get_format_epoch(file_name, path_to_xml))
+
+        # Keep only records inside the time window
+        if time_window:
+            self.__select_time_window(start, end, mmap)
 
         # Get time span of data
         self.start_time, self.end_time = self.__get_time_span()
 
-        # Create fits Primary Header Data Unit (HDU)
-        self.primary_hdu = create_primary_hdu(self.date,
-                                         self.start_time,
-                                         self.end_time,
-                                         SST_FULL_NAME,
-                                         SST_LATITUDE_LONGITUDE_HEIGHT,
-                                         CASLEO,
-                                         GMT_NEGATIVE_3,
-                                         RBD_TYPE,
-                                         file_name,
-                                         SST_RBD,
-                                         SST_FREQUENCY)
+        # Keep only the selected columns
+        if columns:
+            self.__project_columns(columns, mmap)
+
+        # Create fits Primary Header Data Unit (HDU) factory, with the information found up to now
+        self.primary_hdu_factory = partial(create_primary_hdu,
+                                           self.date,
+                                           self.start_time,
+                                           self.end_time,
+                                           SST_FULL_NAME,
+                                           SST_LATITUDE_LONGITUDE_HEIGHT,
+                                           CASLEO,
+                                           GMT_NEGATIVE_3,
+                                           RBD_TYPE,
+                                           file_name,
+                                           SST_RBD,
+                                           SST_FREQUENCY)
 
         self.start_time = self.start_time[:8]
         self.end_time = self.end_time[:8]
 
         return self
 
+    def describe(self, path, file_name, path_to_xml):
+        """Describes a file from its name and the time of its first and last records, as done by header_only.
+
+        Parameters:
+                path : pathlib.Path - Location of the SST file in the file system.
+                file_name : str - Name of the SST file.
+                path_to_xml : Path - Location of the SST xml description files in the file system.
+
+        Returns:
+                dict containing subtype (RBD type), date, start_time, end_time, records and format_epoch
+        """
+        self.convert_from_file(path, file_name, path_to_xml, header_only=True)
+
+        return dict(subtype=self.__rbd_type, date=self.date, start_time=self.start_time, end_time=self.end_time,
+                    records=len(self.data), format_epoch=get_format_epoch(file_name, path_to_xml))
+
         # -------------------------------------------------------------
         #                      PRIVATE FUNCTIONS
         #             always use __ before function name
         # -------------------------------------------------------------
 
-    def __get_column_names(self, path_to_xml):
+    def __get_schema(self, path_to_xml):
         """
         Method for finding the correct description file.
-        Returns a dict representing the description found,
-        the key is the variable name and the value is a list
-        containing the var dimension, type and unit respectively.
+        Returns the compiled schema of the description found,
+        its column names are a dict where the key is the variable name
+        and the value is a list containing the var dimension, type and unit respectively.
         """
-        span_table = xmlet.parse(path_to_xml / Path("SSTDataFormatTimeSpanTable.xml")).getroot()
+        # The time span table is indexed only once, then searched by bisection
         filetype = MAP_RBD_TYPE_TO_FILE_TYPE[self.__rbd_type]
+        return get_format_epoch_index(path_to_xml).get_schema(filetype, self.date)
+
+    def __select_time_window(self, start, end, mmap):
+        """
+        Keeps only records from start to end, found by binary search on time.
+        Memory mapped data keeps a view of these records, otherwise only they are copied from the file.
+        """
+        start_hus = end_hus = None
+        if start is not None:
+            start_hus = int(iso_time.parse_time_array(start)) * iso_time.HUS_IN_A_SECOND
+        if end is not None:
+            end_hus = (int(iso_time.parse_time_array(end)) + 1) * iso_time.HUS_IN_A_SECOND - 1
+
+        try:
+            if self.__record_index is not None:
+                first, stop = self.__record_index.find_time_window(self.data["time"], start_hus, end_hus)
+            else:
+                first, stop = find_time_window(self.data["time"], start_hus, end_hus)
+        except IndexError:
+            first = stop = 0
+
+        # Index positions refer to the whole file
+        self.__record_index = None
 
-        for item in span_table:
-            if item[0].text == filetype and item[1].text <= self.date <= item[2].text:
-                data_description_file_name = item[3].text
+        if first == stop:
+            raise ValueError(NO_RECORDS_IN_TIME_WINDOW_ERROR.format(start, end))
 
-        xml = xmlet.parse(path_to_xml / Path(data_description_file_name)).getroot()
+        self.data = self.data[first:stop]
 
-        header = dict()
-        for child in xml:
-            var_name = child[0].text
-            var_dim = int(child[1].text)
-            var_type = child[2].text
-            var_unit = child[3].text
+        if not mmap:
+            self.data = self.data.copy()
 
-            np_type = XML_TYPE_TO_NUMPY_TYPE[var_type]
+    def __project_columns(self, columns, mmap):
+        """
+        Keeps only the selected columns of data and column names.
+        Memory mapped data keeps a view of the selected fields inside each record, so other fields are never read,
+        otherwise only the selected fields are copied from the file.
+        """
+        projected_columns = get_projected_columns(self.data.dtype, columns)
 
-            header.update({var_name: [var_dim, np_type, var_unit]})
+        self.column_names = OrderedDict((column, self.column_names[column]) for column in projected_columns)
+        self.data = self.data[projected_columns]
 
-        return header
+        if not mmap:
+            self.data = repack_fields(self.data)
 
     def __get_time_span(self):
         """
         Returns ISO time of the first and last record found in the data.
         """
+        if self.__record_index is not None:
+            start_time, end_time = iso_time.time_array([self.__record_index.start_time,
+                                                        self.__record_index.end_time])
+            return str(start_time), str(end_time)
+
+        first, last = first_and_last_nonzero(self.data["time"])
+        start_time, end_time = iso_time.time_array(self.data["time"][[first, last]])
 
-        nonzero = self.data["time"].nonzero()
-        return iso_time.time(self.data["time"][nonzero[0][0]]), iso_time.time(
-            self.data["time"][nonzero[0][-1]])
+        return str(start_time), str(end_time)
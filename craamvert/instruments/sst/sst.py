@@ -1,15 +1,27 @@
-from craamvert.instruments import HISTORY, CONVERTED_WITH_FITS_LEVEL
-from craamvert.instruments.sst import SST_FITS_FILE_NAME
-from instruments.utils.fits_handlers import set_fits_file_name_and_output_path
-from instruments.utils.hdu_handlers import add_sst_comments
-from craamvert.instruments.sst.utils.create_hdu import create_data_hdu
-from craamvert.utils import RBD_TYPE, COULDNT_MATCH_CONVERTED_DATA_TO_INSTRUMENT
+import os
 
-from astropy.io import fits
+import numpy as np
+from numpy.lib.recfunctions import repack_fields
 
-from instruments.instrument import Instrument
-from instruments.sst.rbd import rbd
-from utils import SST_INSTRUMENT
+from craamvert.instruments import HISTORY, CONVERTED_WITH_FITS_LEVEL, CASLEO, GMT_NEGATIVE_3
+from craamvert.instruments.sst import SST_FITS_FILE_NAME, SST_FULL_NAME, SST_LATITUDE_LONGITUDE_HEIGHT, SST_RBD, \
+    SST_FREQUENCY
+from craamvert.instruments.utils.fits_handlers import set_fits_file_name_and_output_path
+from craamvert.instruments.utils.hdu_handlers import add_sst_comments, create_primary_hdu
+from craamvert.instruments.sst.utils.create_hdu import create_data_hdu, create_data_hdu_header, stream_data_hdu
+from craamvert.instruments.utils.memmap_handlers import first_and_last_nonzero
+from craamvert.instruments.utils.stage_profiler import WRITE_FITS_STAGE, DATA_HDU_STAGE, WRITETO_STAGE, \
+    STREAM_STAGE
+from craamvert.utils import RBD_TYPE, COULDNT_MATCH_CONVERTED_DATA_TO_INSTRUMENT, OBJECTS_NOT_FROM_SAME_INSTRUMENT, \
+    CONCATENATE_NOT_AVAILABLE_ERROR, INCOMPATIBLE_DATA_TYPES_ERROR, DIFFERENT_DATES_ERROR, CONCATENATED_DATA, iso_time
+from craamvert.utils.sorted_merge import merge_positions, merge_sorted, drop_duplicated_positions
+from craamvert.utils.lazy_import import lazy_import
+
+from craamvert.instruments.instrument import Instrument
+from craamvert.utils import SST_INSTRUMENT
+
+# astropy is only imported when fits files are created
+fits = lazy_import("astropy.io.fits")
 
 
 # Please check python docs to further understand this class
@@ -28,31 +40,169 @@ class SST(Instrument):
         self.__sst_column_names = None
         self.__sst_data = None
 
+        # When True, the original file is mapped into memory instead of being read
+        self._memory_map = False
+
+        # Columns kept from the original file, all columns are kept when None
+        self._columns = None
+
+        # HH:MM:SS time window of records kept from the original file, all records are kept when None
+        self._start = None
+        self._end = None
+
+        # When True, the sidecar index of the original file is used
+        self._index = False
+
         # Fits information
         self._primary_hdu_position = 0
+        self._fits_file_name = SST_FITS_FILE_NAME
 
     @staticmethod
-    def open_file(file_name):
+    def open_file(file_name, mmap=False, columns=None, start=None, end=None, index=False, original_file_name=None):
+        """Open SST file and return a SST object
+
+        Parameters:
+               file_name : str, pathlib.Path, buffer - File to be opened.
+               mmap : bool, optional - Map the file into memory instead of reading it,
+                      columns are only read from disk when accessed.
+               columns : list, optional - Columns to be kept, e.g. SST_REDUCED_COLUMNS.
+                         Time is always kept and only these columns are written to fits files.
+               start : str, optional - Keep only records from this HH:MM:SS time.
+               end : str, optional - Keep only records until this HH:MM:SS time, its whole second is included.
+                       Records are found by binary search on time, so the rest of the file is never read.
+               index : bool, optional - Use the sidecar index of the file (.cidx) to find time span and time window,
+                       the index is built and written next to the file when there's no valid one.
+               original_file_name : str, optional - Name of the file when it's given as a buffer,
+                                    e.g. rs1120127.1300, otherwise the file type is found from the buffer content.
+        """
         sst_object = SST()
+        sst_object._memory_map = mmap
+        sst_object._columns = columns
+        sst_object._start = start
+        sst_object._end = end
+        sst_object._index = index
 
-        sst_object._verify_original_file_type(file_name)
-        sst_object._verify_original_file_path()
-        sst_object._set_path_to_xml()
-        sst_object._get_converted_data()
+        sst_object._open_original_file(file_name, original_file_name)
 
         return sst_object
 
-    def write_fits(self, name=None, output_path=None):
-        # Create fits Binary Header Data Unit (HDU) to keep SST data
-        sst_hdu = create_data_hdu(self._sst_column_names, self._sst_data)
+    @staticmethod
+    def concatenate(sst_objects, drop_duplicates=False):
+        """Concatenate SST objects from the same day into a new SST object, with records ordered by time
 
-        add_sst_comments(sst_hdu)
+        Records of each object are already ordered by time, so objects are merged
+        instead of being sorted again.
 
-        hdu_list = fits.HDUList([self._primary_hdu, sst_hdu])
+        Parameters:
+               sst_objects : list - SST objects or SST files to be concatenated, files are memory mapped.
+               drop_duplicates : bool, optional - When True, records with the same time and recnum
+                                 are kept only once, from the object that starts first.
 
-        hdu_list[self._primary_hdu_position].header.append((HISTORY, CONVERTED_WITH_FITS_LEVEL
-                                                            .format(self._fits_level)))
+        Returns:
+               SST - New SST object, with the name of all files on its primary header.
+
+        Raises:
+            TypeError: If objects are not SST objects or have different data types.
+            ValueError: If objects have different RBD types or dates.
+        """
+        # The RBD converter is only imported when it's used, as done by the converter registry
+        from craamvert.instruments.sst.rbd.rbd import get_rbd_type
+
+        sst_objects = [SST.open_file(sst_object, mmap=True) if not isinstance(sst_object, Instrument) else sst_object
+                       for sst_object in sst_objects]
+
+        for sst_object in sst_objects:
+            if not isinstance(sst_object, SST):
+                raise TypeError(OBJECTS_NOT_FROM_SAME_INSTRUMENT.format(SST_INSTRUMENT))
+
+        sst_objects = sorted(sst_objects, key=lambda sst_object: (sst_object._time, sst_object._start_time))
+        first_sst_object = sst_objects[0]
+
+        # Integration, Subintegration and Auxiliary data can't be mixed,
+        # neither data described by different format epochs
+        rbd_types = {get_rbd_type(file_name) for sst_object in sst_objects
+                     for file_name in sst_object.__get_original_file_names()}
+        if len(rbd_types) > 1:
+            raise ValueError(CONCATENATE_NOT_AVAILABLE_ERROR.format(", ".join(sorted(rbd_types)), SST_INSTRUMENT))
 
+        # Objects opened with the same columns may keep them with or without the other fields offsets
+        data_types = {repack_fields(sst_object._sst_data.dtype) for sst_object in sst_objects}
+        if len(data_types) > 1:
+            raise TypeError(INCOMPATIBLE_DATA_TYPES_ERROR.format(", ".join(str(data_type) for data_type in data_types)))
+
+        dates = {sst_object._date for sst_object in sst_objects}
+        if len(dates) > 1:
+            raise ValueError(DIFFERENT_DATES_ERROR.format(", ".join(sorted(dates))))
+
+        # Records are merged by time, then recnum
+        sst_data = [SST.__sort_by_time(sst_object._sst_data) for sst_object in sst_objects]
+        merge_keys = [SST.__get_merge_keys(data) for data in sst_data]
+
+        positions = merge_positions(merge_keys)
+        size = sum(len(position) for position in positions)
+
+        if drop_duplicates:
+            kept, positions, size = drop_duplicated_positions(merge_keys, positions)
+            sst_data = [data[keep] for data, keep in zip(sst_data, kept)]
+
+        concatenated_sst_object = SST()
+
+        # Match general information
+        concatenated_sst_object._original_file_type = first_sst_object._original_file_type
+        concatenated_sst_object._original_file_name = [file_name for sst_object in sst_objects
+                                                       for file_name in sst_object.__get_original_file_names()]
+        concatenated_sst_object._path_to_xml = first_sst_object._path_to_xml
+        concatenated_sst_object._fits_level = first_sst_object._fits_level
+        concatenated_sst_object._date = first_sst_object._date
+        concatenated_sst_object._time = first_sst_object._time
+
+        # Match data information
+        concatenated_sst_object._sst_column_names = first_sst_object._sst_column_names
+        concatenated_sst_object._sst_data = merge_sorted(sst_data, positions, size, data_types.pop())
+
+        # Get time span of data
+        first, last = first_and_last_nonzero(concatenated_sst_object._sst_data["time"])
+        start_time, end_time = iso_time.time_array(concatenated_sst_object._sst_data["time"][[first, last]])
+        concatenated_sst_object._start_time = str(start_time)[:8]
+        concatenated_sst_object._end_time = str(end_time)[:8]
+
+        # Create fits Primary Header Data Unit (HDU) with all file names
+        concatenated_sst_object._primary_hdu = create_primary_hdu(concatenated_sst_object._date,
+                                                                  str(start_time),
+                                                                  str(end_time),
+                                                                  SST_FULL_NAME,
+                                                                  SST_LATITUDE_LONGITUDE_HEIGHT,
+                                                                  CASLEO,
+                                                                  GMT_NEGATIVE_3,
+                                                                  RBD_TYPE,
+                                                                  concatenated_sst_object._original_file_name,
+                                                                  SST_RBD,
+                                                                  SST_FREQUENCY)
+        concatenated_sst_object._primary_hdu.header.append((HISTORY, CONCATENATED_DATA))
+
+        return concatenated_sst_object
+
+    def write_fits(self, name=None, output_path=None, block_records=None):
+        """Write SST data to a fits file
+
+        Parameters:
+               name : str, optional - Fits file name.
+               output_path : str, pathlib.Path, optional - Directory where the fits file is written.
+               block_records : int, optional - When given, records are streamed to the fits file
+                               this many at a time, instead of building the whole table in memory.
+
+        Returns:
+               pathlib.Path - Path to the written fits file.
+        """
+        with self._stage(WRITE_FITS_STAGE) as write_fits_stats:
+            fits_path = self.__write_fits(name, output_path, block_records)
+
+            write_fits_stats.bytes_written = os.path.getsize(fits_path)
+            write_fits_stats.records = self.get_records()
+
+        return fits_path
+
+    def __write_fits(self, name, output_path, block_records):
         fits_file_name, fits_output_path = set_fits_file_name_and_output_path(name,
                                                                               output_path,
                                                                               self._date,
@@ -61,15 +211,93 @@ class SST(Instrument):
                                                                               self._original_file_type,
                                                                               self._fits_level,
                                                                               SST_FITS_FILE_NAME)
-        hdu_list.writeto(fits_output_path / fits_file_name)
+        fits_path = fits_output_path / fits_file_name
+
+        if block_records is not None:
+            self.__stream_fits(fits_path, block_records)
+            return fits_path
+
+        # Create fits Binary Header Data Unit (HDU) to keep SST data
+        with self._stage(DATA_HDU_STAGE) as data_hdu_stats:
+            sst_hdu = create_data_hdu(self._sst_column_names, self._sst_data)
+
+            add_sst_comments(sst_hdu)
+
+            data_hdu_stats.records = len(self._sst_data)
+
+        hdu_list = fits.HDUList([self._primary_hdu, sst_hdu])
+
+        hdu_list[self._primary_hdu_position].header.append((HISTORY, CONVERTED_WITH_FITS_LEVEL
+                                                            .format(self._fits_level)))
+
+        with self._stage(WRITETO_STAGE) as writeto_stats:
+            hdu_list.writeto(fits_path)
+
+            writeto_stats.bytes_written = os.path.getsize(fits_path)
+
+        return fits_path
+
+    def __stream_fits(self, fits_path, block_records):
+        # The table header only depends on the RBD data type and number of records,
+        # so it is written first and records are appended block by block
+        sst_hdu = create_data_hdu_header(self._sst_column_names, self._sst_data.dtype, len(self._sst_data))
+
+        add_sst_comments(sst_hdu)
+
+        hdu_list = fits.HDUList([self._primary_hdu])
+
+        hdu_list[self._primary_hdu_position].header.append((HISTORY, CONVERTED_WITH_FITS_LEVEL
+                                                            .format(self._fits_level)))
+
+        with self._stage(WRITETO_STAGE) as writeto_stats:
+            hdu_list.writeto(fits_path)
+
+            writeto_stats.bytes_written = os.path.getsize(fits_path)
+
+        with self._stage(STREAM_STAGE) as stream_stats:
+            stream_data_hdu(fits_path, sst_hdu, self._sst_column_names, self._sst_data, block_records)
+
+            stream_stats.bytes_written = os.path.getsize(fits_path) - writeto_stats.bytes_written
+            stream_stats.records = len(self._sst_data)
+
+    def __get_original_file_names(self):
+        """Returns list of original file names, concatenated objects have more than one"""
+        if isinstance(self._original_file_name, list):
+            return self._original_file_name
+
+        return [self._original_file_name]
+
+    @staticmethod
+    def __sort_by_time(sst_data):
+        """Returns records ordered by time, records already in order are not copied"""
+        if np.any(sst_data["time"][1:] < sst_data["time"][:-1]):
+            return sst_data[np.argsort(sst_data["time"], kind="stable")]
+
+        return sst_data
+
+    @staticmethod
+    def __get_merge_keys(sst_data):
+        """Returns time and recnum of each record as a single integer, time comes first"""
+        merge_keys = sst_data["time"].astype(np.int64) << 32
+
+        if "recnum" in sst_data.dtype.names:
+            merge_keys |= sst_data["recnum"].astype(np.int64) & 0xFFFFFFFF
+
+        return merge_keys
+
+    def get_records(self):
+        """Returns number of records of SST data
+
+            Returns:
+                int
+        """
+        return len(self._sst_data)
 
     def _get_converted_data(self):
 
-        sst_available_converters = {
-            RBD_TYPE: rbd.RBD().convert_from_file(self._original_file_path, self._original_file_name,
-                                                  self._path_to_xml)
-        }
-        converted_data = sst_available_converters.get(self._original_file_type)
+        # Only the converter of the original file type is imported and run
+        converted_data = self._convert_original_file(mmap=self._memory_map, columns=self._columns, start=self._start,
+                                                     end=self._end, index=self._index)
 
         self._match_type_object_attributes_to_instrument_attributes(converted_data)
 
@@ -86,7 +314,7 @@ class SST(Instrument):
             self._sst_data = converted_data.data
 
             # Match Fits information
-            self._primary_hdu = converted_data.primary_hdu
+            self._primary_hdu_factory = converted_data.primary_hdu_factory
 
         except AttributeError:
             print(COULDNT_MATCH_CONVERTED_DATA_TO_INSTRUMENT.format(self._instrument, self._original_file_type))
@@ -1,44 +1,172 @@
-from astropy.io import fits
+import numpy as np
+from numpy.lib.recfunctions import repack_fields
 
-from craamvert.instruments import NUMPY_TYPE_TO_T_FORM_TYPE
+from craamvert.utils.lazy_import import lazy_import
+
+# astropy is only imported when fits files are created
+fits = lazy_import("astropy.io.fits")
+
+
+# Fits files are written in blocks of 2880 bytes
+FITS_BLOCK_SIZE = 2880
+
+# Fits binary table format of each numpy type, and the zero offset (TZERO)
+# needed to keep values that fits can only store with a different sign
+# To better understand this procedure please check astropy docs
+# https://docs.astropy.org/en/stable/io/fits/usage/unfamiliar.html#unsigned-integers
+NUMPY_TYPE_TO_FITS_FORMAT_AND_ZERO = {
+    np.dtype(np.uint8): ("B", None),
+    np.dtype(np.int8): ("B", -128),
+    np.dtype(np.int16): ("I", None),
+    np.dtype(np.uint16): ("I", 32768),
+    np.dtype(np.int32): ("J", None),
+    np.dtype(np.uint32): ("J", 2147483648),
+    np.dtype(np.int64): ("K", None),
+    np.dtype(np.float32): ("E", None),
+    np.dtype(np.float64): ("D", None),
+}
 
 
 def create_data_hdu(column_names, data_array):
     """Create fits Binary Header Data Unit (HDU)
 
+    The RBD structured data type is mapped straight onto the fits table layout,
+    so records are byte-swapped once into the HDU buffer instead of being
+    copied column by column.
+
     Param:
-         column_names
-         data_array
-         data_type
+         column_names - dict where the key is the variable name and the value is a list
+                        containing the var dimension, type and unit respectively
+         data_array - RBD records
 
     Return:
          BinTableHDU
     """
+    sst_hdu = create_data_hdu_header(column_names, data_array.dtype, len(data_array))
 
-    # Prepare fits column
-    fits_columns = list()
-
-    # Here, the column name is matched to the data array
+    # Here, a single buffer keeps the HDU header followed by the table data
     # To better understand this procedure please check astropy docs
-    # https://docs.astropy.org/en/stable/io/fits/#working-with-table-data
+    # https://docs.astropy.org/en/stable/io/fits/api/hdus.html#astropy.io.fits.hdu.base._BaseHDU.fromstring
+    header_bytes = sst_hdu.header.tostring().encode("ascii")
+    fits_data_type = get_fits_data_type(data_array.dtype)
+    data_size = len(data_array) * fits_data_type.itemsize
+    padding = -data_size % FITS_BLOCK_SIZE
+
+    hdu_buffer = bytearray(len(header_bytes) + data_size + padding)
+    hdu_buffer[:len(header_bytes)] = header_bytes
+
+    fits_records = np.ndarray(len(data_array), dtype=fits_data_type,
+                              buffer=hdu_buffer, offset=len(header_bytes))
+    to_fits_records(column_names, data_array, fits_records)
+
+    # astropy only parses headers from immutable bytes
+    return fits.BinTableHDU.fromstring(bytes(hdu_buffer))
+
+
+def get_fits_data_type(data_type):
+    """Returns data type of records inside a fits binary table, big-endian and without gaps between fields
+
+    Records with only some of the RBD fields keep the original field offsets,
+    these are removed so only the selected fields are written.
+    """
+    return repack_fields(data_type).newbyteorder(">")
+
+
+def get_fits_layout(column_names, data_type):
+    """Map a RBD structured data type onto a fits binary table layout
+
+    Array fields, e.g. adcval[6], become vector columns, e.g. 6I.
+
+    Param:
+         column_names - dict where the key is the variable name and the value is a list
+                        containing the var dimension, type and unit respectively
+         data_type - numpy structured data type of RBD records
+
+    Return:
+         list of (name, t_format, unit, zero) for each column
+    """
+    fits_layout = list()
+
+    for column in data_type.names:
+        field_type = data_type[column]
+        t_format, zero = NUMPY_TYPE_TO_FITS_FORMAT_AND_ZERO[field_type.base.newbyteorder("=")]
+        dimension = int(np.prod(field_type.shape))
+
+        fits_layout.append((column, str(dimension) + t_format, column_names[column][2], zero))
+
+    return fits_layout
 
-    for column, values in column_names.items():
-        numpy_type = values[1]
-        t_format = NUMPY_TYPE_TO_T_FORM_TYPE[numpy_type]
 
-        offset = 0
-        if t_format != "I":
-            offset = 32768
+def create_data_hdu_header(column_names, data_type, rows):
+    """Create fits Binary Header Data Unit (HDU) header for RBD records, without any data
 
+    Param:
+         column_names
+         data_type - numpy structured data type of RBD records
+         rows - number of records that will be written
+
+    Return:
+         BinTableHDU with no data and header prepared for the number of rows
+    """
+    fits_columns = list()
+
+    for column, t_format, unit, zero in get_fits_layout(column_names, data_type):
         fits_columns.append(fits.Column(
             name=column,
             format=t_format,
-            unit=values[2],
-            bscale=1.0,
-            bzero=offset,
-            array=data_array[column]
+            unit=unit,
+            bzero=zero,
+            array=np.zeros((0,) + data_type[column].shape, dtype=data_type[column].base)
         ))
 
-        sst_hdu = fits.BinTableHDU.from_columns(fits.ColDefs(fits_columns))
+    sst_hdu = fits.BinTableHDU.from_columns(fits.ColDefs(fits_columns))
+    sst_hdu.header["NAXIS2"] = rows
+
+    return sst_hdu
+
+
+def to_fits_records(column_names, data_array, fits_records=None):
+    """Convert RBD records to the values stored inside a fits binary table
+
+    Values are byte-swapped to big-endian and shifted by the column zero offset,
+    all at once on a single copy of the records.
+
+    Param:
+         column_names
+         data_array - RBD records
+         fits_records - optional big-endian array where records are written
+
+    Return:
+         numpy structured array with big-endian values
+    """
+    if fits_records is None:
+        fits_records = np.empty(len(data_array), dtype=get_fits_data_type(data_array.dtype))
+
+    fits_records[...] = data_array
+
+    for column, t_format, unit, zero in get_fits_layout(column_names, data_array.dtype):
+        if zero:
+            # Shifting by the zero offset is the same as flipping the sign bit
+            field = fits_records[column]
+            sign_bit = np.array(1 << (8 * field.dtype.itemsize - 1), dtype=np.uint64).astype(field.dtype)
+            field ^= sign_bit
+
+    return fits_records
 
-        return sst_hdu
+
+def stream_data_hdu(path, sst_hdu, column_names, data_array, block_records):
+    """Append fits Binary Header Data Unit (HDU) to a fits file, writing records block by block
+
+    Only one block is kept in memory at a time.
+
+    Param:
+         path - fits file where the HDU is appended
+         sst_hdu - BinTableHDU created by create_data_hdu_header
+         column_names
+         data_array - RBD records, may be a memory mapped file
+         block_records - number of records written at once
+    """
+    with fits.StreamingHDU(str(path), sst_hdu.header) as streaming_hdu:
+        for start in range(0, len(data_array), block_records):
+            fits_records = to_fits_records(column_names, data_array[start:start + block_records])
+            streaming_hdu.write(fits_records.view(np.uint8))
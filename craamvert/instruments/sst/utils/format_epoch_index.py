@@ -0,0 +1,81 @@
+import bisect
+import xml.etree.ElementTree as xmlet
+from pathlib import Path
+
+from craamvert.instruments.utils.schema_registry import get_schema
+from craamvert.utils import FORMAT_EPOCH_NOT_FOUND
+
+SST_TIME_SPAN_TABLE = "SSTDataFormatTimeSpanTable.xml"
+
+# Indexes already built by this process, the key is the resolved xml path
+_format_epoch_indexes = dict()
+
+
+class FormatEpochIndex:
+    """Sorted interval index of the SST data format time span table
+
+    Each SST data type (Data, Auxiliary) has a list of non overlapping date intervals,
+    each one described by a different xml file, called here a format epoch.
+    """
+
+    def __init__(self, path_to_xml):
+        # All attributes must be declared on __init__
+        self.__path_to_xml = Path(path_to_xml)
+
+        # For each SST data type, intervals are kept sorted by initial date
+        # so they can be searched by bisection
+        self.__initial_dates = dict()
+        self.__final_dates = dict()
+        self.__description_file_names = dict()
+
+        span_table = xmlet.parse(self.__path_to_xml / Path(SST_TIME_SPAN_TABLE)).getroot()
+
+        intervals = sorted((item[0].text, item[1].text, item[2].text, item[3].text) for item in span_table)
+        for data_type, initial_date, final_date, description_file_name in intervals:
+            self.__initial_dates.setdefault(data_type, []).append(initial_date)
+            self.__final_dates.setdefault(data_type, []).append(final_date)
+            self.__description_file_names.setdefault(data_type, []).append(description_file_name)
+
+    def get_format_epoch(self, data_type, date):
+        """Returns name of the xml file describing data of a type on a date
+
+        Parameters:
+            data_type : str - SST data type, e.g. Data or Auxiliary.
+            date : str - Date as YYYY-MM-DD.
+
+        Raises:
+            ValueError: If there's no description for the data type on this date.
+        """
+        initial_dates = self.__initial_dates.get(data_type, [])
+        position = bisect.bisect_right(initial_dates, date) - 1
+
+        if position < 0 or date > self.__final_dates[data_type][position]:
+            raise ValueError(FORMAT_EPOCH_NOT_FOUND.format(data_type, date))
+
+        return self.__description_file_names[data_type][position]
+
+    def get_schema(self, data_type, date):
+        """Returns compiled schema describing data of a type on a date
+
+        Raises:
+            ValueError: If there's no description for the data type on this date.
+        """
+        return get_schema(self.__path_to_xml / Path(self.get_format_epoch(data_type, date)))
+
+    def get_schemas(self):
+        """Returns compiled schemas of every format epoch, of all data types"""
+        return [get_schema(self.__path_to_xml / Path(description_file_name))
+                for description_file_names in self.__description_file_names.values()
+                for description_file_name in description_file_names]
+
+
+def get_format_epoch_index(path_to_xml):
+    """Returns format epoch index of the time span table inside path_to_xml, built only once per process"""
+    key = str(Path(path_to_xml).resolve())
+
+    format_epoch_index = _format_epoch_indexes.get(key)
+    if format_epoch_index is None:
+        format_epoch_index = FormatEpochIndex(path_to_xml)
+        _format_epoch_indexes[key] = format_epoch_index
+
+    return format_epoch_index
@@ -0,0 +1,105 @@
+from importlib import import_module
+from importlib.metadata import entry_points
+
+from craamvert.utils import INSTRUMENT_TO_TYPE_MAP, INVALID_FILE_TYPE_ERROR, SST_INSTRUMENT, POEMAS_INSTRUMENT, \
+    RBD_TYPE, TRK_TYPE
+
+# Converters from other packages are registered on this entry point group, the entry point name is
+# "<instrument>.<file type>" and its value the converter class, e.g.
+# [project.entry-points."craamvert.converters"]
+# "POEMAS.Integration" = "package.module:IntegrationConverter"
+CONVERTER_ENTRY_POINT_GROUP = "craamvert.converters"
+CONVERTER_ENTRY_POINT_SEPARATOR = "."
+
+# Converters of new file types declare their file name identifiers on this class attribute,
+# e.g. identifiers = ["INT$"], as given to register_converter
+CONVERTER_IDENTIFIERS_ATTRIBUTE = "identifiers"
+
+# Converters which can describe files without reading their data have this method, used by the catalog,
+# e.g. describe(path, file_name, path_to_xml) as RBD and TRK do
+CONVERTER_DESCRIBE_METHOD = "describe"
+
+# Converters are kept as "module:class" until used, so opening a file imports only its own converter
+# The key is a tuple containing instrument and file type
+_converters = {
+    (SST_INSTRUMENT, RBD_TYPE): "craamvert.instruments.sst.rbd.rbd:RBD",
+    (POEMAS_INSTRUMENT, TRK_TYPE): "craamvert.instruments.poemas.trk.trk:TRK",
+}
+_entry_points_loaded = False
+
+
+def register_converter(instrument, file_type, converter, identifiers=None):
+    """Register converter of a file type, replacing any converter already registered for it
+
+    A converter is a class created without arguments, whose convert_from_file(path, file_name, path_to_xml, **options)
+    loads a file and returns itself, as RBD and TRK do.
+    Files are only added to the catalog when the converter also has describe(path, file_name, path_to_xml),
+    returning the subtype, date, start_time, end_time, records and format_epoch of the file.
+
+    Parameters:
+        instrument : str - e.g. SST or POEMAS.
+        file_type : str - e.g. RBD or TRK.
+        converter : class or str - Converter class, or "module:class" to import it only when used.
+        identifiers : list, optional - File name identifiers of a new file type.
+    """
+    # Entry points are found first, so a converter registered here is never replaced by them
+    load_entry_points()
+
+    _converters[(instrument, file_type)] = converter
+
+    _add_identifiers(instrument, file_type, identifiers)
+
+
+def get_converter(instrument, file_type):
+    """Returns converter class of a file type, imported only now
+
+    Raises:
+        ValueError: If there's no converter for the file type.
+    """
+    load_entry_points()
+
+    converter = _converters.get((instrument, file_type))
+    if converter is None:
+        raise ValueError(INVALID_FILE_TYPE_ERROR.format(file_type, instrument))
+
+    if isinstance(converter, str):
+        module_name, _, class_name = converter.partition(":")
+        converter = getattr(import_module(module_name), class_name)
+        _converters[(instrument, file_type)] = converter
+
+    return converter
+
+
+def load_entry_points():
+    """Registers converters found on the entry point group, only the first time it's called
+
+    Converters of file types which already have identifiers are imported when first used.
+    Converters of new file types are imported now, so their identifiers are known before any file name is matched.
+    """
+    global _entry_points_loaded
+
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+
+    for entry_point in entry_points(group=CONVERTER_ENTRY_POINT_GROUP):
+        instrument, _, file_type = entry_point.name.partition(CONVERTER_ENTRY_POINT_SEPARATOR)
+
+        if INSTRUMENT_TO_TYPE_MAP.get(instrument, dict()).get(file_type):
+            _converters[(instrument, file_type)] = entry_point.value
+            continue
+
+        converter = entry_point.load()
+        _converters[(instrument, file_type)] = converter
+
+        _add_identifiers(instrument, file_type, getattr(converter, CONVERTER_IDENTIFIERS_ATTRIBUTE, None))
+
+
+def _add_identifiers(instrument, file_type, identifiers):
+    if not identifiers:
+        return
+
+    available_types = INSTRUMENT_TO_TYPE_MAP.setdefault(instrument, dict())
+    available_types.setdefault(file_type, [])
+    available_types[file_type].extend(identifier for identifier in identifiers
+                                      if identifier not in available_types[file_type])
@@ -0,0 +1,21 @@
+def create_numpy_data_type(column_names):
+    """Create numpy structured data type from column names description
+
+    Param:
+        column_names: dict - key is the variable name and the value is a list
+                      containing the var dimension, type and unit respectively.
+
+    Return:
+        list of (name, type) or (name, type, dimension) tuples
+    """
+    numpy_data_type = list()
+
+    for key, value in column_names.items():
+        # Fields with dimension 1 must be declared as scalars,
+        # otherwise numpy creates a sub-array with shape (1,)
+        if value[0] == 1:
+            numpy_data_type.append((key, value[1]))
+        else:
+            numpy_data_type.append((key, value[1], value[0]))
+
+    return numpy_data_type
@@ -0,0 +1,189 @@
+import os
+import re
+from pathlib import Path
+
+from craamvert.instruments.utils.converter_registry import load_entry_points
+from craamvert.utils import INSTRUMENT_TO_TYPE_MAP, SST_INSTRUMENT, POEMAS_INSTRUMENT, RBD_TYPE, TRK_TYPE, \
+    XML_TABLE_PATH, INVALID_FILE_NAME, RBD_FILE_NAME_REQUIRED_ERROR
+
+PATH_TO_INSTRUMENTS = Path(__file__).parent.parent
+
+# Compiled file name pattern of each file type, the key is a tuple containing the type identifiers
+_file_name_patterns = dict()
+
+
+def get_path_to_xml(instrument, file_type):
+    """Returns location of the xml description files of a file type"""
+    return PATH_TO_INSTRUMENTS / Path(XML_TABLE_PATH.format(instrument.lower(), file_type))
+
+
+def match_file_name(file_name, instrument=None):
+    """Returns file types whose identifiers match a file name, only the name is used, never its directories
+
+    Parameters:
+        file_name : str - Name of the file.
+        instrument : str, optional - Search only the types of this instrument.
+
+    Returns:
+        list of tuples containing instrument and file type
+    """
+    # File types of converters from other packages are only known once their entry points are loaded
+    load_entry_points()
+
+    instruments = [instrument] if instrument is not None else list(INSTRUMENT_TO_TYPE_MAP)
+
+    candidates = list()
+    for candidate_instrument in instruments:
+        for file_type, identifiers in INSTRUMENT_TO_TYPE_MAP.get(candidate_instrument, dict()).items():
+            if _get_file_name_pattern(identifiers).search(file_name):
+                candidates.append((candidate_instrument, file_type))
+
+    return candidates
+
+
+def sniff_file(file, file_name, instrument, file_type):
+    """Confirms a file type from the file size and at most its header, the data itself is never read
+
+    Types without a sniffer are confirmed by the file name only.
+
+    Parameters:
+        file : str, pathlib.Path or bytes - File, bytes are used as the file content.
+        file_name : str - Name of the file, may be empty for bytes.
+        instrument : str - e.g. SST or POEMAS.
+        file_type : str - e.g. RBD or TRK.
+
+    Returns:
+        bool
+    """
+    sniffer = FILE_TYPE_SNIFFERS.get((instrument, file_type))
+    if sniffer is None:
+        return True
+
+    try:
+        return sniffer(file, file_name)
+    except (ValueError, OSError):
+        return False
+
+
+def detect_file_type(file, file_name=None, instrument=None, sniff=True):
+    """Returns instrument and file type of a file, from its name and a sniff of its content
+
+    Parameters:
+        file : str, pathlib.Path or bytes - File, bytes are used as the file content.
+        file_name : str, optional - Name of the file, by default the name of the path.
+                    Bytes without a name are detected by their content only.
+        instrument : str, optional - Search only the types of this instrument.
+        sniff : bool, optional - Confirm the type found on the file name by the file content.
+
+    Returns:
+        tuple containing instrument and file type
+
+    Raises:
+        ValueError: If no file type matches the file, or bytes made of RBD records are given without a name.
+    """
+    load_entry_points()
+
+    if file_name is None:
+        file_name = "" if isinstance(file, bytes) else Path(file).name
+
+    if file_name:
+        candidates = match_file_name(file_name, instrument)
+    else:
+        candidates = [(candidate_instrument, file_type)
+                      for candidate_instrument in ([instrument] if instrument else INSTRUMENT_TO_TYPE_MAP)
+                      for file_type in INSTRUMENT_TO_TYPE_MAP.get(candidate_instrument, dict())]
+
+    for candidate_instrument, file_type in candidates:
+        # Bytes without a name can't be confirmed by the file name, so they are always sniffed
+        if (not sniff and file_name) or sniff_file(file, file_name, candidate_instrument, file_type):
+            return candidate_instrument, file_type
+
+    # RBD files have no header, so bytes without a name can only be told apart by their size
+    if not file_name and (SST_INSTRUMENT, RBD_TYPE) in candidates and _has_rbd_record_size(file):
+        raise ValueError(RBD_FILE_NAME_REQUIRED_ERROR)
+
+    raise ValueError(INVALID_FILE_NAME.format(file_name or "<bytes>"))
+
+
+def _get_file_name_pattern(identifiers):
+    key = tuple(identifiers)
+
+    pattern = _file_name_patterns.get(key)
+    if pattern is None:
+        pattern = re.compile("|".join("(?:{})".format(identifier) for identifier in identifiers))
+        _file_name_patterns[key] = pattern
+
+    return pattern
+
+
+def _get_file_size(file):
+    if isinstance(file, bytes):
+        return len(file)
+
+    return os.stat(str(file)).st_size
+
+
+def _read_file_start(file, size):
+    if isinstance(file, bytes):
+        return file[:size]
+
+    with open(str(file), "rb") as opened_file:
+        return opened_file.read(size)
+
+
+def _sniff_rbd(file, file_name):
+    # Imported here, so detecting other types never loads the SST converter
+    from craamvert.instruments.sst.rbd.rbd import get_rbd_type, get_date_and_time, MAP_RBD_TYPE_TO_FILE_TYPE
+    from craamvert.instruments.sst.utils.format_epoch_index import get_format_epoch_index
+
+    # RBD files are only records, described by the format epoch of the date found on the file name
+    rbd_type = get_rbd_type(file_name)
+    date, _ = get_date_and_time(file_name)
+    data_type = get_format_epoch_index(get_path_to_xml(SST_INSTRUMENT, RBD_TYPE)).get_schema(
+        MAP_RBD_TYPE_TO_FILE_TYPE[rbd_type], date).data_type
+
+    file_size = _get_file_size(file)
+
+    return file_size > 0 and file_size % data_type.itemsize == 0
+
+
+def _has_rbd_record_size(file):
+    """Returns True when the file is made of whole records of any RBD format epoch"""
+    from craamvert.instruments.sst.utils.format_epoch_index import get_format_epoch_index
+
+    file_size = _get_file_size(file)
+    record_sizes = {schema.data_type.itemsize for schema in
+                    get_format_epoch_index(get_path_to_xml(SST_INSTRUMENT, RBD_TYPE)).get_schemas()}
+
+    return file_size > 0 and any(file_size % record_size == 0 for record_size in record_sizes)
+
+
+def _sniff_trk(file, file_name):
+    # Imported here, so detecting other types never loads the POEMAS converter
+    import numpy as np
+
+    from craamvert.instruments.poemas import POEMASDataType
+    from craamvert.instruments.poemas.trk.trk import PATH_TO_XML_TRK_COLUMN_NAME
+    from craamvert.instruments.utils.schema_registry import get_schema
+
+    path_to_xml = get_path_to_xml(POEMAS_INSTRUMENT, TRK_TYPE)
+    header_data_type = get_schema(path_to_xml / PATH_TO_XML_TRK_COLUMN_NAME[POEMASDataType.HEADER]).data_type
+    body_data_type = get_schema(path_to_xml / PATH_TO_XML_TRK_COLUMN_NAME[POEMASDataType.BODY]).data_type
+
+    header = _read_file_start(file, header_data_type.itemsize)
+    if len(header) < header_data_type.itemsize:
+        return False
+
+    # Code, NRS, FreqNo, Freq1, Freq2, BRTMin, BRTMax
+    header_data = np.frombuffer(header, dtype=header_data_type)[0]
+    records = int(header_data["NRS"])
+
+    # Every record announced by NRS must be found on the file
+    return records > 0 and header_data_type.itemsize + records * body_data_type.itemsize <= _get_file_size(file)
+
+
+# Content sniffer of each file type, the key is a tuple containing instrument and file type
+FILE_TYPE_SNIFFERS = {
+    (SST_INSTRUMENT, RBD_TYPE): _sniff_rbd,
+    (POEMAS_INSTRUMENT, TRK_TYPE): _sniff_trk,
+}
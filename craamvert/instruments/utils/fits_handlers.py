@@ -7,6 +7,23 @@ from craamvert.utils import FILE_ALREADY_EXISTS
 def set_fits_file_name_and_output_path(name, output_path, date, start_time, end_time, original_file_type, fits_level,
                                        instrument_fits_file_name):
     """Define final fits file name and output path
+
+    Raises:
+        FileExistsError: If the fits file already exists.
+    """
+    fits_file_name, fits_output_path = get_fits_file_name_and_output_path(name, output_path, date, start_time,
+                                                                          end_time, original_file_type, fits_level,
+                                                                          instrument_fits_file_name)
+
+    if (fits_output_path / fits_file_name).exists():
+        raise FileExistsError(FILE_ALREADY_EXISTS.format(str(fits_file_name)))
+
+    return fits_file_name, fits_output_path
+
+
+def get_fits_file_name_and_output_path(name, output_path, date, start_time, end_time, original_file_type, fits_level,
+                                       instrument_fits_file_name):
+    """Same as set_fits_file_name_and_output_path, but the fits file may already exist
     """
 
     new_separator = "_"
@@ -33,7 +50,4 @@ def set_fits_file_name_and_output_path(name, output_path, date, start_time, end_
 
     fits_output_path = Path(output_path).expanduser()
 
-    if (fits_output_path / fits_file_name).exists():
-        raise FileExistsError(FILE_ALREADY_EXISTS.format(str(fits_file_name)))
-
     return fits_file_name, fits_output_path
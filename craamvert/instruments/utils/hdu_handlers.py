@@ -1,6 +1,11 @@
 from craamvert.instruments import COMMENT, ORIGIN, ORIGIN_CRAAM, TELESCOPE, OBSERVATORY, STATION, TIMEZONE, OBSERVATION_DATE, \
-    START_TIME, END_TIME, DATA_TYPE, FILE_ORIGIN, FREQUENCY
-from astropy.io import fits
+    START_TIME, END_TIME, DATA_TYPE, FILE_ORIGIN, FREQUENCY, TIME_SYSTEM, MJD_REFERENCE, TIME_UNIT, UTC, SECONDS, \
+    MILLISECONDS_TO_SECONDS, TSCALE
+
+from craamvert.utils.lazy_import import lazy_import
+
+# astropy is only imported when fits files are created
+fits = lazy_import("astropy.io.fits")
 
 
 def add_sst_comments(hdu):
@@ -11,6 +16,32 @@ def add_sst_comments(hdu):
     hdu.header.append((COMMENT, 'Temperatures are in Celsius', ''))
 
 
+def add_time_keywords(hdu, mjd_reference, time_column=1):
+    """Add fits time keywords, so time columns can be read as an offset from mjd_reference
+
+    Time is stored as integer milliseconds, and TIMEUNIT has no milliseconds,
+    so the time column is scaled by TSCAL to be read in seconds.
+
+    To better understand these keywords please check fits time representation paper
+    https://www.aanda.org/articles/aa/full_html/2015/02/aa24653-14/aa24653-14.html
+
+    Param:
+        hdu
+        mjd_reference
+        time_column - optional number of the time column, starting at 1
+    """
+    # The unit is changed on the column, otherwise its TUNIT keyword is written back from the column when saved
+    hdu.columns[time_column - 1].unit = SECONDS
+
+    # astropy writes scaling keywords after every column keyword, so it's appended there,
+    # and headers written by astropy and streamed headers are the same
+    hdu.header.append((TSCALE.format(time_column), MILLISECONDS_TO_SECONDS, 'time is stored in milliseconds'))
+
+    hdu.header.append((TIME_SYSTEM, UTC, 'time scale'))
+    hdu.header.append((MJD_REFERENCE, float(mjd_reference), 'MJD of time reference, 0 UT of observation date'))
+    hdu.header.append((TIME_UNIT, SECONDS, 'time unit'))
+
+
 def create_primary_hdu(date, start_time, end_time, data_type,
                        instrument_full_name, instrument_latitude_longitude_height, observatory_name,
                        timezone_info, file_name, file_type, instrument_frequency):
@@ -0,0 +1,104 @@
+import numpy as np
+
+
+def map_file(path):
+    """Map file into memory without reading it
+
+    Files are mapped as copy-on-write, so changes to the data are
+    kept in memory and never written back to the original file.
+    Bytes are used as they are, so their array is read-only and must be copied before changes.
+
+    Param:
+        path: pathlib.Path, str or bytes - File to be mapped, bytes are used as the file content
+
+    Return:
+        numpy array of bytes (numpy.memmap when path is a file, read-only when path is bytes)
+    """
+    if isinstance(path, bytes):
+        return np.frombuffer(path, dtype=np.uint8)
+
+    return np.memmap(str(path), dtype=np.uint8, mode="c")
+
+
+def create_structured_view(raw_data, data_type, offset=0, count=None):
+    """Create structured array over mapped bytes, no data is copied
+
+    Trailing bytes which don't complete a record are ignored, as done by numpy.fromfile
+
+    Param:
+        raw_data: numpy array of bytes - Mapped file
+        data_type: numpy data type of each record
+        offset: int, optional - Position of the first record, in bytes
+        count: int, optional - Maximum number of records
+
+    Return:
+        numpy structured array
+    """
+    data_type = np.dtype(data_type)
+
+    available_records = max(raw_data.size - offset, 0) // data_type.itemsize
+    if count is None or count > available_records:
+        count = available_records
+
+    return raw_data[offset:offset + count * data_type.itemsize].view(data_type)
+
+
+def first_and_last_nonzero(array, chunk_size=4096):
+    """Returns positions of the first and last nonzero values of an array
+
+    The array is read in chunks from its start and from its end,
+    so only a small part of a mapped file needs to be read.
+
+    Raises:
+        IndexError: If there's no nonzero value in the array
+    """
+    first = last = None
+
+    for chunk_start in range(0, len(array), chunk_size):
+        nonzero = np.flatnonzero(array[chunk_start:chunk_start + chunk_size])
+        if nonzero.size:
+            first = chunk_start + nonzero[0]
+            break
+
+    if first is None:
+        raise IndexError("No nonzero values found")
+
+    for chunk_end in range(len(array), first, -chunk_size):
+        chunk_start = max(chunk_end - chunk_size, first)
+        nonzero = np.flatnonzero(array[chunk_start:chunk_end])
+        if nonzero.size:
+            last = chunk_start + nonzero[-1]
+            break
+
+    return first, last
+
+
+def find_time_window(times, start=None, end=None):
+    """Returns positions of the first record with time from start and of the record after the last one until end
+
+    Times must be in ascending order, apart from zero time records at the beginning
+    or at the end of the data, which are skipped as when finding the time span.
+    Records are found by binary search, so only a few of them are read from a mapped file.
+
+    Param:
+        times: numpy array - Time of each record
+        start: int, optional - First time included, from the first record by default
+        end: int, optional - Last time included, until the last record by default
+
+    Return:
+        tuple containing first and stop positions, records inside the window are times[first:stop]
+
+    Raises:
+        IndexError: If there's no nonzero time in the array
+    """
+    first, last = first_and_last_nonzero(times)
+    nonzero_times = times[first:last + 1]
+
+    stop = last + 1
+    if end is not None:
+        stop = first + int(np.searchsorted(nonzero_times, end, side="right"))
+
+    if start is not None:
+        first = first + int(np.searchsorted(nonzero_times, start, side="left"))
+
+    return first, max(first, stop)
@@ -0,0 +1,206 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+from craamvert.instruments.utils.memmap_handlers import first_and_last_nonzero
+
+# Index files are kept next to the original file, e.g. rs1120127.1300.cidx
+RECORD_INDEX_EXTENSION = ".cidx"
+RECORD_INDEX_VERSION = 1
+
+# Number of records between time samples kept on the index
+RECORD_INDEX_STEP = 1024
+
+
+class RecordIndex:
+    """Sparse index of a raw file, with the time of one of every RECORD_INDEX_STEP records
+
+    Time span, number of records and format epoch are answered without reading the file,
+    and a time is found by reading only the records between two samples.
+    """
+
+    def __init__(self):
+        # All attributes must be declared on __init__
+
+        # Original file information, used to know if the index is still valid
+        self.file_size = None
+        self.file_mtime = None
+
+        # Records information
+        self.records = None
+        self.format_epoch = None
+
+        # Positions of the first and last records with nonzero time, and their time
+        self.first = None
+        self.last = None
+        self.start_time = None
+        self.end_time = None
+
+        # Sampled records, from first to last, and their time
+        self.sample_positions = None
+        self.sample_times = None
+
+    def matches(self, path, format_epoch=None):
+        """Returns True when the index was built from the file as it is now, with the same format epoch"""
+        file_stat = os.stat(str(path))
+
+        if format_epoch is not None and format_epoch != self.format_epoch:
+            return False
+
+        return self.file_size == file_stat.st_size and self.file_mtime == file_stat.st_mtime_ns
+
+    def find_time_window(self, times, start=None, end=None):
+        """Same as memmap_handlers.find_time_window, but only records between two samples are read
+
+        Param:
+            times: numpy array - Time of each record, usually a view of a mapped file
+            start: int, optional - First time included, from the first record by default
+            end: int, optional - Last time included, until the last record by default
+
+        Return:
+            tuple containing first and stop positions, records inside the window are times[first:stop]
+        """
+        first = self.first
+        stop = self.last + 1
+
+        if end is not None:
+            stop = self.__search(times, end, "right")
+
+        if start is not None:
+            first = self.__search(times, start, "left")
+
+        return first, max(first, stop)
+
+    def __search(self, times, time, side):
+        # Samples around the time are found on the index, so the time is between these records
+        sample = int(np.searchsorted(self.sample_times, time, side=side))
+
+        low = self.first
+        if sample > 0:
+            low = int(self.sample_positions[sample - 1]) + 1
+
+        high = self.last + 1
+        if sample < len(self.sample_positions):
+            high = int(self.sample_positions[sample]) + 1
+
+        return low + int(np.searchsorted(times[low:high], time, side=side))
+
+
+def get_index_path(path):
+    """Returns path of the index of a file"""
+    path = Path(path)
+    return path.with_name(path.name + RECORD_INDEX_EXTENSION)
+
+
+def build_record_index(path, times, format_epoch, step=RECORD_INDEX_STEP):
+    """Build index of a file from the time of its records
+
+    Param:
+        path: pathlib.Path or str - Original file
+        times: numpy array - Time of each record, zero time records are skipped as when finding the time span
+        format_epoch: str - Name of the description of the file records
+        step: int, optional - Number of records between samples
+
+    Return:
+        RecordIndex
+
+    Raises:
+        IndexError: If there's no nonzero time in the file
+    """
+    file_stat = os.stat(str(path))
+    first, last = first_and_last_nonzero(times)
+
+    record_index = RecordIndex()
+    record_index.file_size = file_stat.st_size
+    record_index.file_mtime = file_stat.st_mtime_ns
+    record_index.records = len(times)
+    record_index.format_epoch = format_epoch
+    record_index.first = int(first)
+    record_index.last = int(last)
+    record_index.start_time = int(times[first])
+    record_index.end_time = int(times[last])
+
+    # The last record is always sampled, so every time inside the span is between two samples
+    record_index.sample_positions = np.unique(np.append(np.arange(first, last + 1, step), last)).astype(np.int64)
+    record_index.sample_times = np.asarray(times[record_index.sample_positions]).astype(np.int64)
+
+    return record_index
+
+
+def write_record_index(path, record_index):
+    """Write index next to its original file"""
+    with open(get_index_path(path), "wb") as index_file:
+        np.savez(index_file,
+                 version=RECORD_INDEX_VERSION,
+                 file_size=record_index.file_size,
+                 file_mtime=record_index.file_mtime,
+                 records=record_index.records,
+                 format_epoch=record_index.format_epoch,
+                 first=record_index.first,
+                 last=record_index.last,
+                 start_time=record_index.start_time,
+                 end_time=record_index.end_time,
+                 sample_positions=record_index.sample_positions,
+                 sample_times=record_index.sample_times)
+
+
+def read_record_index(path, format_epoch=None):
+    """Read index of a file
+
+    Param:
+        path: pathlib.Path or str - Original file
+        format_epoch: str, optional - When given, the index must have been built with this format epoch
+
+    Return:
+        RecordIndex, or None when there's no index or it doesn't match the file anymore
+    """
+    try:
+        with np.load(get_index_path(path), allow_pickle=False) as index_file:
+            if int(index_file["version"]) != RECORD_INDEX_VERSION:
+                return None
+
+            record_index = RecordIndex()
+            record_index.file_size = int(index_file["file_size"])
+            record_index.file_mtime = int(index_file["file_mtime"])
+            record_index.records = int(index_file["records"])
+            record_index.format_epoch = str(index_file["format_epoch"])
+            record_index.first = int(index_file["first"])
+            record_index.last = int(index_file["last"])
+            record_index.start_time = int(index_file["start_time"])
+            record_index.end_time = int(index_file["end_time"])
+            record_index.sample_positions = index_file["sample_positions"]
+            record_index.sample_times = index_file["sample_times"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if not record_index.matches(path, format_epoch):
+        return None
+
+    return record_index
+
+
+def get_record_index(path, times, format_epoch):
+    """Returns index of a file, the index is built and written only when there's no valid one
+
+    Indexes are optional, so when the index can't be written the built one is still returned.
+
+    Param:
+        path: pathlib.Path or str - Original file
+        times: numpy array - Time of each record, only read when the index is built
+        format_epoch: str - Name of the description of the file records
+
+    Return:
+        RecordIndex
+    """
+    record_index = read_record_index(path, format_epoch)
+
+    if record_index is None:
+        record_index = build_record_index(path, times, format_epoch)
+
+        try:
+            write_record_index(path, record_index)
+        except OSError:
+            pass
+
+    return record_index
@@ -0,0 +1,146 @@
+import collections
+import hashlib
+import json
+import os
+import xml.etree.ElementTree as xmlet
+from pathlib import Path
+
+import numpy as np
+
+from craamvert.instruments import XML_TYPE_TO_NUMPY_TYPE, NUMPY_TYPE_TO_T_FORM_TYPE
+from craamvert.instruments.utils.data_type_handlers import create_numpy_data_type
+
+# On-disk cache of compiled schemas, disabled unless a directory is set
+SCHEMA_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE = "CRAAMVERT_SCHEMA_CACHE"
+SCHEMA_CACHE_FILE_NAME = "{}.json"
+
+# Schemas already compiled by this process, the key is the resolved xml path
+_compiled_schemas = dict()
+_schema_cache_directory = os.environ.get(SCHEMA_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE)
+
+
+class Schema:
+    """Compiled xml data description
+
+    Keeps everything needed to read and write a file described by a xml:
+    column names, numpy data type, units and fits column formats.
+    """
+
+    def __init__(self, description):
+        # All attributes must be declared on __init__
+
+        # Description as found in the xml file
+        # [(var name, var dimension, var xml type, var unit), ...]
+        self.description = description
+
+        # The key is the variable name and the value is a list
+        # containing the var dimension, numpy type and unit respectively
+        self.column_names = collections.OrderedDict()
+        for var_name, var_dim, var_type, var_unit in description:
+            self.column_names.update({var_name: [var_dim, XML_TYPE_TO_NUMPY_TYPE[var_type], var_unit]})
+
+        # Numpy structured data type, ready to read files
+        self.data_type = np.dtype(create_numpy_data_type(self.column_names))
+
+        # Fits column format (TFORM) and unit of each variable
+        self.t_forms = collections.OrderedDict()
+        self.units = collections.OrderedDict()
+        for var_name, (var_dim, np_type, var_unit) in self.column_names.items():
+            self.t_forms[var_name] = _get_t_form(var_dim, np_type)
+            self.units[var_name] = var_unit
+
+    def get_column_names(self):
+        """Returns a copy of the column names, so the compiled schema is never changed
+
+            Returns:
+                OrderedDict
+        """
+        return collections.OrderedDict((key, list(value)) for key, value in self.column_names.items())
+
+
+def set_schema_cache_directory(directory):
+    """Set directory used to keep compiled schemas on disk, None disables the on-disk cache
+
+    Param:
+        directory: str, pathlib.Path or None
+    """
+    global _schema_cache_directory
+    _schema_cache_directory = directory
+
+
+def get_schema(xml_path):
+    """Returns compiled schema of a xml data description
+
+    Each xml is compiled only once per process. When a cache directory is set,
+    compiled schemas are also kept on disk, keyed on the hash of the xml file.
+
+    Param:
+        xml_path: pathlib.Path or str - Location of the xml data description file
+
+    Return:
+        Schema
+    """
+    xml_path = Path(xml_path)
+    key = str(xml_path.resolve())
+
+    schema = _compiled_schemas.get(key)
+    if schema is None:
+        schema = _compile_schema(xml_path)
+        _compiled_schemas[key] = schema
+
+    return schema
+
+
+def clear_compiled_schemas():
+    """Forget all schemas compiled by this process"""
+    _compiled_schemas.clear()
+
+
+def _compile_schema(xml_path):
+    xml_content = xml_path.read_bytes()
+
+    if not _schema_cache_directory:
+        return Schema(_parse_description(xml_content))
+
+    xml_hash = hashlib.sha256(xml_content).hexdigest()
+    cache_file = Path(_schema_cache_directory).expanduser() / SCHEMA_CACHE_FILE_NAME.format(xml_hash)
+
+    try:
+        description = [tuple(variable) for variable in json.loads(cache_file.read_text())]
+    except (OSError, ValueError):
+        description = _parse_description(xml_content)
+
+        # The cache is only an optimization, so failing to write it is not an error
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(json.dumps(description))
+        except OSError:
+            pass
+
+    return Schema(description)
+
+
+def _parse_description(xml_content):
+    """Returns list of (var name, var dimension, var xml type, var unit) found in the xml"""
+    xml = xmlet.fromstring(xml_content)
+
+    description = list()
+    for child in xml:
+        var_name = child[0].text
+        var_dim = int(child[1].text)
+        var_type = child[2].text
+        var_unit = child[3].text
+
+        description.append((var_name, var_dim, var_type, var_unit))
+
+    return description
+
+
+def _get_t_form(var_dim, np_type):
+    t_form = NUMPY_TYPE_TO_T_FORM_TYPE[np_type]
+
+    # Strings already have their size on the format
+    if np_type is str:
+        return t_form
+
+    return str(var_dim) + t_form.lstrip("0123456789")
@@ -0,0 +1,166 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Stages of the conversion pipeline, a stage started inside another one is named after it, e.g. write_fits.writeto
+OPEN_FILE_STAGE = "open_file"
+LEVEL_1_STAGE = "level_1"
+LEVEL_2_STAGE = "level_2"
+WRITE_FITS_STAGE = "write_fits"
+SCHEMA_STAGE = "schema"
+READ_STAGE = "read"
+DEINTERLEAVE_STAGE = "deinterleave"
+PRIMARY_HDU_STAGE = "primary_hdu"
+DATA_HDU_STAGE = "data_hdu"
+WRITETO_STAGE = "writeto"
+STREAM_STAGE = "stream"
+
+STAGE_NAME_SEPARATOR = "."
+
+# Functions called with the StageStats of every finished stage
+_stage_callbacks = list()
+
+# Stages running now, the innermost comes last
+_running_stages = list()
+
+
+class StageStats:
+    """Measures of a single run of a stage"""
+
+    def __init__(self, name, file_name=None):
+        # All attributes must be declared on __init__
+        self.name = name
+        self.file_name = file_name
+
+        # Wall time, in seconds
+        self.elapsed = 0.0
+
+        # Set by the stage itself, they stay 0 when the stage doesn't read, write or process records
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.records = 0
+
+        # Highest memory allocated by the stage, over the memory in use when it started, in bytes
+        # None when tracemalloc is not tracing
+        self.peak_memory = None
+
+        # Memory traced when the stage started and highest memory traced since then, in bytes
+        self._start_memory = None
+        self._traced_peak = None
+
+    def to_dict(self):
+        return {"stage": self.name, "file": self.file_name, "elapsed": self.elapsed, "bytes_read": self.bytes_read,
+                "bytes_written": self.bytes_written, "records": self.records, "peak_memory": self.peak_memory}
+
+    def __repr__(self):
+        return "StageStats(name={!r}, file_name={!r}, elapsed={:.6f}, records={})".format(
+            self.name, self.file_name, self.elapsed, self.records)
+
+
+class StageProfiler:
+    """Context manager that keeps stats of every stage finished inside it
+
+    Example:
+        with Instrument.profile_stages() as profiler:
+            SST.open_file("rs1120127.1300").write_fits()
+
+        for stage_stats in profiler.stages:
+            print(stage_stats.name, stage_stats.elapsed, stage_stats.peak_memory)
+    """
+
+    def __init__(self, trace_memory=True):
+        # All attributes must be declared on __init__
+        self.stages = list()
+
+        # When True, tracemalloc is started, if it isn't yet, so peak memory of each stage is known
+        self.trace_memory = trace_memory
+        self.__started_tracing = False
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracing = True
+
+        add_stage_callback(self.stages.append)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        remove_stage_callback(self.stages.append)
+
+        if self.__started_tracing:
+            tracemalloc.stop()
+            self.__started_tracing = False
+
+    def to_dicts(self):
+        return [stage_stats.to_dict() for stage_stats in self.stages]
+
+
+def add_stage_callback(callback):
+    """Registers a function called with the StageStats of every stage finished from now on"""
+    _stage_callbacks.append(callback)
+
+
+def remove_stage_callback(callback):
+    """Removes a function registered by add_stage_callback
+
+    Raises:
+        ValueError: If the function is not registered.
+    """
+    _stage_callbacks.remove(callback)
+
+
+@contextmanager
+def stage(name, file_name=None):
+    """Measures wall time and peak memory of the code run inside, and reports it to the stage callbacks
+
+    Bytes and records are set on the StageStats given by the context manager.
+    When no callback is registered nothing is measured, so stages cost almost nothing.
+
+    Parameters:
+        name : str - Stage name, stages started inside another stage are named after it, e.g. write_fits.writeto.
+        file_name : str, optional - File being converted, the one of the enclosing stage by default.
+
+    Returns:
+        StageStats
+    """
+    parent_stats = _running_stages[-1] if _running_stages else None
+
+    stage_stats = StageStats(name, file_name)
+    if parent_stats is not None:
+        stage_stats.name = parent_stats.name + STAGE_NAME_SEPARATOR + name
+        stage_stats.file_name = file_name or parent_stats.file_name
+
+    if not _stage_callbacks:
+        yield stage_stats
+        return
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        # tracemalloc keeps a single peak, so the enclosing stage keeps its peak before it's reset
+        _update_traced_peak(parent_stats)
+        tracemalloc.reset_peak()
+        stage_stats._start_memory = stage_stats._traced_peak = tracemalloc.get_traced_memory()[0]
+
+    _running_stages.append(stage_stats)
+    start = time.perf_counter()
+    try:
+        yield stage_stats
+    finally:
+        stage_stats.elapsed = time.perf_counter() - start
+        _running_stages.pop()
+
+        if tracing and tracemalloc.is_tracing():
+            _update_traced_peak(stage_stats)
+            stage_stats.peak_memory = stage_stats._traced_peak - stage_stats._start_memory
+
+            if parent_stats is not None and parent_stats._traced_peak is not None:
+                parent_stats._traced_peak = max(parent_stats._traced_peak, stage_stats._traced_peak)
+
+    for callback in list(_stage_callbacks):
+        callback(stage_stats)
+
+
+def _update_traced_peak(stage_stats):
+    if stage_stats is not None and stage_stats._traced_peak is not None:
+        stage_stats._traced_peak = max(stage_stats._traced_peak, tracemalloc.get_traced_memory()[1])
@@ -7,31 +7,48 @@ TRK_TYPE = 'TRK'
 RBD_TYPE = 'RBD'
 
 # Instrument Types
+# Identifiers are regular expressions matched against the file name only
 AVAILABLE_SST_TYPES = {
-    RBD_TYPE: ["bi", "rs", "rf"]
+    RBD_TYPE: ["^bi", "^rs", "^rf"]
 }
 AVAILABLE_POEMAS_TYPES = {
-    TRK_TYPE: ["TRK"]
+    TRK_TYPE: ["TRK$"]
 }
 INSTRUMENT_TO_TYPE_MAP = {
     SST_INSTRUMENT: AVAILABLE_SST_TYPES,
     POEMAS_INSTRUMENT: AVAILABLE_POEMAS_TYPES
 }
 
+# Stage stats formats
+JSON_LINES_FORMAT = "jsonl"
+PROMETHEUS_FORMAT = "prometheus"
+STATS_FORMATS = (JSON_LINES_FORMAT, PROMETHEUS_FORMAT)
+
 # Errors
 OBJECTS_NOT_FROM_SAME_INSTRUMENT = "Objects are not from the same instrument: {}"
 CONCATENATE_NOT_AVAILABLE_ERROR = "Concatenate operation not available for file with type {} from instrument {}"
+CATALOG_NOT_AVAILABLE_ERROR = "Catalog not available for file with type {} from instrument {}"
+INCOMPATIBLE_DATA_TYPES_ERROR = "Can't concatenate files with different data types: {}"
+DIFFERENT_DATES_ERROR = "Can't concatenate files from different dates: {}"
+INVALID_COLUMNS_ERROR = "Invalid columns {}, available columns are: {}"
+NO_RECORDS_IN_TIME_WINDOW_ERROR = "No records found from {} to {}"
+TIME_TOO_FAR_FROM_OBSERVATION_DAY_ERROR = "Time {} is too far from the observation day {} to be kept in milliseconds"
 FILE_NOT_FOUND_ERROR = "File not found: {}"
 INVALID_PATH_TO_XML_ERROR = "Invalid path to XML: {}"
 INVALID_INSTRUMENT_ERROR = "Invalid instrument: {}"
 INVALID_FILE_TYPE_ERROR = "Invalid file type {} for instrument {}."
 INVALID_FILE_NAME = "Invalid filename {}"
+RBD_FILE_NAME_REQUIRED_ERROR = "Bytes look like RBD records, whose type and date are only found on the file name, " \
+                               "please give original_file_name"
 INVALID_XML_FILE = "Invalid xml type: {}"
 FILE_ALREADY_EXISTS = "File {} already exists."
 INVALID_LEVEL_TYPE = "This level type is not valid: {}. It must be a integer"
 FITS_LEVEL_NOT_AVAILABLE = "Fits level {} is not available for conversion"
 CANT_CONVERT_FITS_LEVEL = "Can't get fits level {} for object with level {}, please try a level higher than {}"
 COULDNT_MATCH_CONVERTED_DATA_TO_INSTRUMENT = "Couldn't match converted data fom file type {} to instrument {}"
+FORMAT_EPOCH_NOT_FOUND = "No data description found for {} data on {}"
+INVALID_QUANTIZATION_TYPE = "Can't quantize data as {}, it must be numpy.int16 or numpy.int32"
+INVALID_STATS_FORMAT = "Invalid stats format {}, it must be one of: {}"
 
 # Others
 XML_TABLE_PATH = "xml-tables/{}/{}"
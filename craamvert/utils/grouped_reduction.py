@@ -0,0 +1,80 @@
+import numpy as np
+
+
+def group_by_key(keys):
+    """Groups positions of an array by equal keys
+
+    Keys already in ascending order (e.g. time) are only segmented,
+    otherwise they are sorted once with a stable sort.
+
+    Param:
+        keys: numpy array - Integer key of each position, e.g. second mark
+
+    Return:
+        order: numpy array or None - Positions sorting the keys, None when keys are already sorted
+        starts: numpy array - Position where each group starts, inside the sorted keys
+        counts: numpy array - Number of positions inside each group
+    """
+    keys = np.asarray(keys)
+
+    order = None
+    if np.any(keys[1:] < keys[:-1]):
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+
+    starts = np.flatnonzero(np.diff(keys)) + 1
+    starts = np.concatenate(([0], starts)) if keys.size else starts
+    counts = np.diff(np.append(starts, keys.size))
+
+    return order, starts, counts
+
+
+def grouped_median(keys, data_arrays):
+    """Calculates the median of each data array for every group of equal keys
+
+    Param:
+        keys: numpy array - Integer key of each position, e.g. second mark
+        data_arrays: list of numpy arrays - Data to be reduced, with the same size as keys
+
+    Return:
+        first_positions: numpy array - Position of the first element of each group inside keys
+        counts: numpy array - Number of elements inside each group
+        medians: list of numpy arrays - Median of each group, one array for each data array
+    """
+    order, starts, counts = group_by_key(keys)
+
+    first_positions = starts if order is None else order[starts]
+
+    medians = list()
+    for data in data_arrays:
+        data = np.asarray(data)
+        if order is not None:
+            data = data[order]
+        medians.append(_segment_median(data, starts, counts))
+
+    return first_positions, counts, medians
+
+
+def _segment_median(data, starts, counts):
+    """Calculates the median of consecutive segments of an array
+
+    Segments of the same size are placed in the rows of a matrix, which are sorted at once,
+    so no padding is needed and memory stays the size of data.
+    NaN is sorted to the end of each row and, as in np.median, makes the median NaN.
+    """
+    medians = np.empty(counts.size, dtype=data.dtype)
+
+    for size in np.unique(counts):
+        segments = np.flatnonzero(counts == size)
+        if segments.size == counts.size:
+            # When all segments have the same size, data is just reshaped into the matrix
+            matrix = np.sort(data.reshape(counts.size, size), axis=1)
+        else:
+            matrix = np.sort(data[starts[segments, np.newaxis] + np.arange(size)], axis=1)
+
+        segment_medians = (matrix[:, (size - 1) // 2] + matrix[:, size // 2]) / 2
+        if np.issubdtype(data.dtype, np.inexact):
+            segment_medians[np.isnan(matrix[:, -1])] = np.nan
+        medians[segments] = segment_medians
+
+    return medians
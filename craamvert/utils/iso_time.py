@@ -1,5 +1,67 @@
+import numpy as np
+
+# SST time is given in hundreds of microseconds (Hus) since 0 UT
+HUS_IN_AN_HOUR = 36000000
+HUS_IN_A_MINUTE = 600000
+HUS_IN_A_SECOND = 10000
+
+
 def time(hustime):
     hours = hustime // 36000000
     minutes = (hustime % 36000000) // 600000
     secs = (hustime - (hours * 36000000 + minutes * 600000)) // 10000.0
     return '{0:=02d}'.format(hours)+':'+ '{0:=02d}'.format(minutes) +':'+'{0:=06.3f}'.format(secs)
+
+
+# -------------------------------------------------------------
+# Array functions
+# Same as the function above, but for whole numpy arrays at once
+# -------------------------------------------------------------
+
+def time_array(hustime):
+    """Returns array of HH:MM:SS.sss strings from Hus since 0 UT"""
+    hustime = np.asarray(hustime, dtype=np.int64)
+
+    hours = hustime // HUS_IN_AN_HOUR
+    minutes = (hustime % HUS_IN_AN_HOUR) // HUS_IN_A_MINUTE
+    secs = (hustime - (hours * HUS_IN_AN_HOUR + minutes * HUS_IN_A_MINUTE)) // HUS_IN_A_SECOND
+
+    # Seconds are truncated, so milliseconds are always zero, as in time()
+    return np.char.add(format_time_array(hours, minutes, secs), ".000")
+
+
+def format_time_array(hours, minutes, secs):
+    """Returns array of HH:MM:SS strings from hours, minutes and seconds arrays"""
+
+    # Strings are built from their unicode code points, one column for each character
+    # H H : M M : S S
+    characters = np.empty(np.shape(hours) + (8,), dtype=np.uint32)
+    characters[..., 0], characters[..., 1] = np.divmod(hours, 10)
+    characters[..., 3], characters[..., 4] = np.divmod(minutes, 10)
+    characters[..., 6], characters[..., 7] = np.divmod(secs, 10)
+    characters[..., [0, 1, 3, 4, 6, 7]] += ord("0")
+    characters[..., [2, 5]] = ord(":")
+
+    return characters.view("U8")[..., 0]
+
+
+def parse_time_array(time_string):
+    """Returns array of seconds since 0 UT from HH:MM:SS strings"""
+    time_string = np.asarray(time_string, dtype="U8")
+    shape = time_string.shape
+
+    # Each character is read from its unicode code point, as in format_time_array
+    # A single string is also flattened, since its characters can't be viewed otherwise
+    characters = np.ascontiguousarray(time_string.reshape(-1)).view(np.uint32)
+    characters = characters.reshape(shape + (8,)).astype(np.int64) - ord("0")
+    hours = characters[..., 0] * 10 + characters[..., 1]
+    minutes = characters[..., 3] * 10 + characters[..., 4]
+    secs = characters[..., 6] * 10 + characters[..., 7]
+
+    return hours * 3600 + minutes * 60 + secs
+
+
+def datetime64_array(date, hustime):
+    """Returns numpy datetime64 array from a YYYY-MM-DD date and Hus since 0 UT"""
+    hustime = np.asarray(hustime, dtype=np.int64)
+    return np.datetime64(date, "us") + (hustime * 100).astype("timedelta64[us]")
@@ -1,5 +1,18 @@
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from craamvert.utils import TIME_TOO_FAR_FROM_OBSERVATION_DAY_ERROR
+from craamvert.utils.iso_time import format_time_array
+
+# TRK time is given in seconds since 2001-01-01
+JULDAY_EPOCH = np.datetime64("2001-01-01T00:00:00", "s")
+SECONDS_IN_A_DAY = 86400
+MILLISECONDS_IN_A_DAY = SECONDS_IN_A_DAY * 1000
+
+# Modified Julian Date (MJD) of 2001-01-01
+JULDAY_EPOCH_MJD = 51910
+
 
 def time(jd):
     return str((datetime(2001, 1, 1) + timedelta(seconds=jd)).time())
@@ -12,3 +25,69 @@ def date(jd):
 def sec(sec):
     # return timedelta(seconds=sec).seconds * 1000
     return timedelta(seconds=sec).seconds
+
+
+# -------------------------------------------------------------
+# Array functions
+# Same as the functions above, but for whole numpy arrays at once
+# -------------------------------------------------------------
+
+def datetime64_array(jd):
+    """Returns numpy datetime64 array from seconds since 2001-01-01"""
+    return JULDAY_EPOCH + np.asarray(jd, dtype=np.int64).astype("timedelta64[s]")
+
+
+def time_array(jd):
+    """Returns array of HH:MM:SS strings from seconds since 2001-01-01"""
+    secs = sec_array(jd)
+
+    hours = secs // 3600
+    minutes = (secs % 3600) // 60
+    secs = secs % 60
+
+    return format_time_array(hours, minutes, secs)
+
+
+def date_array(jd):
+    """Returns array of YYYY-MM-DD strings from seconds since 2001-01-01"""
+    return np.datetime_as_string(datetime64_array(jd), unit="D")
+
+
+def sec_array(sec):
+    """Returns array of seconds since 0 UT from seconds since 2001-01-01"""
+    return np.mod(np.asarray(sec, dtype=np.int64), SECONDS_IN_A_DAY)
+
+
+def day_start_array(jd):
+    """Returns seconds since 2001-01-01 of 0 UT of the same day"""
+    jd = np.asarray(jd, dtype=np.int64)
+    return jd - np.mod(jd, SECONDS_IN_A_DAY)
+
+
+def mjd_array(jd):
+    """Returns Modified Julian Date (MJD) from seconds since 2001-01-01"""
+    return JULDAY_EPOCH_MJD + np.asarray(jd, dtype=np.int64) / SECONDS_IN_A_DAY
+
+
+def milliseconds_array(jd, reference):
+    """Returns array of milliseconds since reference, from seconds since 2001-01-01
+
+    When reference is 0 UT of the observation date, a whole day of data fits in int32,
+    and sessions going past 0 UT are kept as milliseconds after 86400000, up to about 24 days.
+    Records without time (0 seconds) are zero padding, and are kept as 0.
+
+    Raises:
+        ValueError: If any other time is too far from reference to fit in int32,
+                    since it would wrap around.
+    """
+    jd = np.asarray(jd, dtype=np.int64)
+    milliseconds = (jd - reference) * 1000
+    milliseconds[jd == 0] = 0
+
+    int32_limits = np.iinfo(np.int32)
+    outside_int32 = (milliseconds < int32_limits.min) | (milliseconds > int32_limits.max)
+    if np.any(outside_int32):
+        raise ValueError(TIME_TOO_FAR_FROM_OBSERVATION_DAY_ERROR.format(int(jd[outside_int32][0]),
+                                                                        date(int(reference))))
+
+    return milliseconds.astype(np.int32)
@@ -0,0 +1,28 @@
+from importlib import import_module
+
+
+class LazyModule:
+    """Module imported only when one of its attributes is first used
+
+    Heavy dependencies, such as astropy, are only needed to create and write fits files,
+    so opening, detecting or cataloging files never pays their import time.
+    """
+
+    def __init__(self, module_name):
+        # All attributes must be declared on __init__
+        self.__module_name = module_name
+        self.__module = None
+
+    def __getattr__(self, attribute_name):
+        if self.__module is None:
+            self.__module = import_module(self.__module_name)
+
+        return getattr(self.__module, attribute_name)
+
+    def __repr__(self):
+        return "LazyModule({!r}, imported={})".format(self.__module_name, self.__module is not None)
+
+
+def lazy_import(module_name):
+    """Returns module_name as a LazyModule, e.g. fits = lazy_import("astropy.io.fits")"""
+    return LazyModule(module_name)
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+def merge_positions(sorted_keys):
+    """Finds where each value of several sorted arrays goes in their merged sorted array
+
+    Only the keys are sorted together, once, so each array can be copied straight into the merged one.
+    The stable sort finds the sorted runs of each array, so k arrays are merged in about n log k steps.
+    Equal keys keep the order of the arrays, as a stable sort would.
+
+    Param:
+        sorted_keys: list of numpy arrays - Keys of each array in ascending order, e.g. time
+
+    Return:
+        positions: list of numpy arrays - Position of each key inside the merged array
+    """
+    sorted_keys = [np.asarray(keys) for keys in sorted_keys]
+    if not sorted_keys:
+        return list()
+
+    order = np.argsort(np.concatenate(sorted_keys), kind="stable")
+
+    # Position of each key is the inverse of the sort order
+    merged_positions = np.empty_like(order)
+    merged_positions[order] = np.arange(len(order))
+
+    return np.split(merged_positions, np.cumsum([len(keys) for keys in sorted_keys])[:-1])
+
+
+def merge_sorted(sorted_arrays, positions, size=None, data_type=None):
+    """Merges arrays into a new preallocated array, according to merge_positions
+
+    Param:
+        sorted_arrays: list of numpy arrays - Arrays to be merged, may be memory mapped
+        positions: list of numpy arrays - Position of each value inside the merged array
+        size: int, optional - Size of the merged array, the sum of all positions by default
+        data_type: numpy data type, optional - Type of the merged array, the type of the first array by default
+
+    Return:
+        merged: numpy array
+    """
+    if size is None:
+        size = sum(len(position) for position in positions)
+
+    if data_type is None:
+        data_type = np.asarray(sorted_arrays[0]).dtype
+
+    merged = np.empty(size, dtype=data_type)
+    for array, position in zip(sorted_arrays, positions):
+        merged[position] = array
+
+    return merged
+
+
+def drop_duplicated_positions(sorted_keys, positions):
+    """Keeps only the first of equal keys inside the merged array
+
+    Param:
+        sorted_keys: list of numpy arrays - Keys of each array in ascending order
+        positions: list of numpy arrays - Position of each key inside the merged array
+
+    Return:
+        kept: list of numpy arrays - Boolean mask of the keys kept from each array
+        positions: list of numpy arrays - Position of each kept key inside the merged array without duplicates
+        size: int - Size of the merged array without duplicates
+    """
+    merged_keys = merge_sorted(sorted_keys, positions)
+
+    first_occurrences = np.ones(len(merged_keys), dtype=bool)
+    first_occurrences[1:] = merged_keys[1:] != merged_keys[:-1]
+
+    # Each kept key moves back by the number of duplicates found before it
+    new_positions = np.cumsum(first_occurrences) - 1
+
+    kept = [first_occurrences[position] for position in positions]
+    positions = [new_positions[position[keep]] for position, keep in zip(positions, kept)]
+
+    return kept, positions, int(first_occurrences.sum())
@@ -1,7 +1,11 @@
 from setuptools import find_packages, setup
 setup(
     name="craamvert",
-    packages=find_packages(include=['craamvert']),
+    packages=find_packages(include=['craamvert', 'craamvert.*']),
+    package_data={'craamvert.instruments': ['xml-tables/*/*/*']},
+    entry_points={
+        'console_scripts': ['craamvert=craamvert.craamvert:main'],
+    },
     version='0.1.0',
     description='Convert data to fits type according to instruments available at CRAAM',
     author='Bruno Gomes Mortella, Julia V R Paiva',
@@ -0,0 +1,103 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from craamvert.batch import convert_many
+from craamvert.utils import PROMETHEUS_FORMAT
+from test.utils.rbd_test_data import a_valid_rbd_data
+from test.utils.trk_test_data import a_valid_multi_record_trk_header_data, a_valid_multi_record_trk_body_data
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temporary_directory.name)
+
+        self.paths = list()
+        for hour in range(10, 14):
+            path = self.directory / "rs1120127.{}00".format(hour)
+            a_valid_rbd_data(first_time=hour * 36000000).tofile(str(path))
+            self.paths.append(path)
+
+        path = self.directory / "SunTrack_120127_105135.TRK"
+        path.write_bytes(a_valid_multi_record_trk_header_data().tobytes() +
+                         a_valid_multi_record_trk_body_data().tobytes())
+        self.paths.append(path)
+
+        # A file with an invalid date, which can't be converted
+        path = self.directory / "rs1129999"
+        path.write_bytes(b"")
+        self.paths.append(path)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    # Here we're testing if a parallel batch creates the same files as a serial one
+    def test_convert_many(self):
+        serial_output = self.directory / "serial"
+        parallel_output = self.directory / "parallel"
+        serial_output.mkdir()
+        parallel_output.mkdir()
+
+        serial_report = convert_many(self.paths, serial_output, jobs=1)
+        parallel_report = convert_many(self.paths, parallel_output, jobs=2)
+
+        for report in (serial_report, parallel_report):
+            self.assertEqual([result.path for result in report.results], self.paths)
+            self.assertEqual(len(report.succeeded), 5)
+            self.assertEqual([result.path for result in report.failed], [self.paths[-1]])
+
+        for serial_result, parallel_result in zip(serial_report.succeeded, parallel_report.succeeded):
+            self.assertEqual(serial_result.output.name, parallel_result.output.name)
+            self.assertEqual(serial_result.output.read_bytes(), parallel_result.output.read_bytes())
+
+    # Here we're testing if stage stats of each file are kept and written as JSON lines and Prometheus textfiles
+    def test_convert_many_with_stats(self):
+        report = convert_many(self.paths[3:], self.directory, jobs=1, level=1, stats=True, trace_memory=True)
+
+        stages = [stage_stats["stage"] for stage_stats in report.results[1].stages]
+        for stage_name in ("open_file", "open_file.read", "level_1", "level_1.deinterleave", "write_fits",
+                           "write_fits.primary_hdu", "write_fits.data_hdu", "write_fits.writeto"):
+            self.assertIn(stage_name, stages)
+
+        write_fits_stats = report.results[1].stages[stages.index("write_fits")]
+        self.assertEqual(write_fits_stats["bytes_written"], report.results[1].output.stat().st_size)
+        self.assertGreater(write_fits_stats["peak_memory"], 0)
+
+        json_lines_path = self.directory / "stats.jsonl"
+        report.write_stats(json_lines_path)
+        lines = [json.loads(line) for line in json_lines_path.read_text().splitlines()]
+        self.assertEqual([line["path"] for line in lines], [str(path) for path in self.paths[3:]])
+
+        prometheus_path = self.directory / "stats.prom"
+        report.write_stats(prometheus_path, PROMETHEUS_FORMAT)
+        self.assertIn('craamvert_stage_written_bytes{{file="{}",stage="write_fits"}} {}'.format(
+            self.paths[4], write_fits_stats["bytes_written"]), prometheus_path.read_text().splitlines())
+
+        with self.assertRaises(ValueError):
+            report.write_stats(prometheus_path, "csv")
+
+    def test_convert_many_with_level_1(self):
+        report = convert_many(self.paths[4:5], self.directory, jobs=1, level=1)
+
+        self.assertEqual(len(report.succeeded), 1)
+        self.assertTrue(report.results[0].output.name.endswith("level1.fits"))
+
+    # Here we're testing if files already converted are skipped from their header, without being opened
+    def test_convert_many_skips_existing(self):
+        first_report = convert_many(self.paths[3:5], self.directory, jobs=1)
+
+        with mock.patch("craamvert.instruments.sst.sst.SST.open_file") as sst_open_file, \
+                mock.patch("craamvert.instruments.poemas.poemas.POEMAS.open_file") as poemas_open_file:
+            report = convert_many(self.paths[3:5], self.directory, jobs=1, skip_existing=True)
+
+        sst_open_file.assert_not_called()
+        poemas_open_file.assert_not_called()
+
+        self.assertTrue(all(result.skipped for result in report.results))
+        self.assertEqual([result.output for result in report.results],
+                         [result.output for result in first_report.results])
+        self.assertEqual([result.records for result in report.results],
+                         [result.records for result in first_report.results])
@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import craamvert
+from benchmarks.run import find_regressions, create_benchmarks, MINIMUM_TIME_INCREASE
+from benchmarks.synthetic import get_format_epochs, create_rbd_file, create_trk_file, SIZES
+
+
+class TestBenchmarks(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temporary_directory.name)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    # Here we're testing if synthetic files of every format epoch are opened with every record
+    def test_synthetic_files(self):
+        seconds = SIZES["minute"]
+        records_per_minute = {"Data": 1500, "Auxiliary": 60}
+
+        for sst_data_type, initial_date, description_file_name in get_format_epochs():
+            epoch_directory = self.directory / Path(description_file_name).stem
+            epoch_directory.mkdir()
+
+            sst = craamvert.open(create_rbd_file(epoch_directory, sst_data_type, initial_date, seconds))
+            self.assertEqual(sst.get_records(), records_per_minute[sst_data_type], description_file_name)
+
+        poemas = craamvert.open(create_trk_file(self.directory, seconds))
+        self.assertEqual(poemas.get_records(), seconds)
+
+    # Here we're testing if every benchmark runs and is measured
+    def test_benchmarks_run(self):
+        benchmarks = create_benchmarks(self.directory, 2)
+        self.assertEqual(len(benchmarks), len(get_format_epochs()) + 8)
+
+        for benchmark in benchmarks:
+            elapsed, peak_memory = benchmark.run(1)
+            self.assertGreater(elapsed, 0, benchmark.name)
+            self.assertGreater(peak_memory, 0, benchmark.name)
+
+    # Here we're testing if the SST table keeps at most two copies of the records in memory,
+    # the big-endian buffer and the bytes given to astropy, while it is created and written
+    def test_sst_hdu_peak_memory(self):
+        benchmarks = create_benchmarks(self.directory, SIZES["hour"])
+
+        for benchmark in benchmarks:
+            if benchmark.name in ("sst_create_hdu", "sst_write_fits"):
+                sst = benchmark.setup()[0]
+                _, peak_memory = benchmark.run(1)
+                self.assertLess(peak_memory, 2.5 * sst._sst_data.nbytes, benchmark.name)
+
+    # Here we're testing if only increases beyond the tolerance are flagged
+    def test_find_regressions(self):
+        baselines = {"fast": {"time": 1., "peak_memory": 10 ** 6},
+                     "lean": {"time": 1., "peak_memory": 10 ** 6},
+                     "noisy": {"time": 0.001, "peak_memory": 10 ** 6}}
+        results = {"fast": {"time": 2.5, "peak_memory": 10 ** 6},
+                   "lean": {"time": 1., "peak_memory": 2 * 10 ** 6},
+                   "noisy": {"time": 0.001 + MINIMUM_TIME_INCREASE / 2, "peak_memory": 10 ** 6},
+                   "new": {"time": 1., "peak_memory": 10 ** 6}}
+
+        self.assertEqual(find_regressions(results, baselines), ["fast", "lean"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from craamvert.catalog import Catalog
+from craamvert.instruments.utils import converter_registry
+from craamvert.instruments.utils.converter_registry import register_converter
+from craamvert.utils import SST_INSTRUMENT, RBD_TYPE, POEMAS_INSTRUMENT, TRK_TYPE, INSTRUMENT_TO_TYPE_MAP
+from test.utils.rbd_test_data import a_valid_rbd_data
+from test.utils.trk_test_data import a_valid_multi_record_trk_header_data, a_valid_multi_record_trk_body_data
+
+RBD_FORMAT_EPOCH = "DataFormat-2002-12-14_to_2100-01-01.xml"
+
+
+class IntegrationConverter:
+    """Converter of a file type from another package, which describes files from their name only"""
+
+    def describe(self, path, file_name, path_to_xml):
+        return dict(subtype=None, date="2012-01-27", start_time="10:51:35", end_time="11:51:35", records=3600,
+                    format_epoch="IntegrationFormat.xml")
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temporary_directory.name)
+
+        # One file per hour, on a nested directory as found on the archive
+        (self.directory / "2012" / "01").mkdir(parents=True)
+        for hour in range(12, 16):
+            path = self.directory / "2012" / "01" / "rs1120127.{}00".format(hour)
+            a_valid_rbd_data(first_time=hour * 36000000).tofile(str(path))
+
+        self.trk_path = self.directory / "SunTrack_120127_105135.TRK"
+        self.trk_path.write_bytes(a_valid_multi_record_trk_header_data().tobytes() +
+                                  a_valid_multi_record_trk_body_data().tobytes())
+
+        # Files which are not described: an empty one and one without a supported name
+        (self.directory / "rs1120128").write_bytes(b"")
+        (self.directory / "notes.txt").write_text("-")
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    # Here we're testing if files are described from their name and header, and found by time span
+    def test_scan_and_find(self):
+        with Catalog(self.directory) as catalog:
+            report = catalog.scan()
+            self.assertEqual((len(report.added), len(report.failed)), (5, 1))
+
+            entries = catalog.find(SST_INSTRUMENT, RBD_TYPE, subtype="Integration", date="2012-01-27",
+                                   start="14:00:00", end="15:00:00")
+            self.assertEqual([Path(entry.path).name for entry in entries], ["rs1120127.1400", "rs1120127.1500"])
+            self.assertEqual((entries[0].start_time, entries[0].end_time), ("14:00:00", "14:00:01"))
+            self.assertEqual((entries[0].records, entries[0].format_epoch), (50, RBD_FORMAT_EPOCH))
+
+            trk_entry, = catalog.find(POEMAS_INSTRUMENT, TRK_TYPE)
+            self.assertEqual((trk_entry.date, trk_entry.records), ("2012-01-27", 3))
+
+            self.assertEqual(list(catalog.group_by_date(SST_INSTRUMENT)), ["2012-01-27"])
+
+    # Here we're testing if only changed files are described again
+    def test_incremental_scan(self):
+        with Catalog(self.directory) as catalog:
+            catalog.scan()
+
+            changed_path = self.directory / "2012" / "01" / "rs1120127.1200"
+            a_valid_rbd_data(records=20, first_time=12 * 36000000).tofile(str(changed_path))
+            os.utime(changed_path, ns=(0, 0))
+            self.trk_path.unlink()
+
+            report = catalog.scan()
+            self.assertEqual(report.updated, [str(changed_path)])
+            self.assertEqual(report.removed, [str(self.trk_path)])
+            self.assertEqual(len(report.unchanged), 3)
+            self.assertEqual(catalog.find(date="2012-01-27", end="12:00:00")[0].records, 20)
+
+    # Here we're testing if file types registered by other packages are described by their own converter
+    def test_scan_registered_file_type(self):
+        (self.directory / "SunTrack_120127_105135.INT").write_bytes(b"-")
+
+        with patch.dict(converter_registry._converters), \
+                patch.dict(INSTRUMENT_TO_TYPE_MAP, {POEMAS_INSTRUMENT: dict(INSTRUMENT_TO_TYPE_MAP[POEMAS_INSTRUMENT])}):
+            register_converter(POEMAS_INSTRUMENT, "Integration", IntegrationConverter, identifiers=["INT$"])
+
+            with Catalog(self.directory) as catalog:
+                report = catalog.scan()
+                self.assertEqual((len(report.added), len(report.failed)), (6, 1))
+
+                entry, = catalog.find(POEMAS_INSTRUMENT, "Integration")
+                self.assertEqual((entry.start_time, entry.records), ("10:51:35", 3600))
+
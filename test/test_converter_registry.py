@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+from importlib.metadata import EntryPoint
+from pathlib import Path
+from unittest.mock import patch
+
+from craamvert.instruments.sst.sst import SST
+from craamvert.instruments.utils import converter_registry
+from craamvert.instruments.utils.converter_registry import get_converter, register_converter, \
+    CONVERTER_ENTRY_POINT_GROUP
+from craamvert.instruments.utils.file_type_detector import match_file_name
+from craamvert.utils import SST_INSTRUMENT, POEMAS_INSTRUMENT, RBD_TYPE, TRK_TYPE, INSTRUMENT_TO_TYPE_MAP
+from test.utils.rbd_test_data import a_valid_rbd_file_name, a_valid_rbd_data
+
+
+class IntegrationConverter:
+    # File name identifiers of a new file type, found by converter_registry.load_entry_points
+    identifiers = ["INT$"]
+
+
+class TestConverterRegistry(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.temporary_directory.name) / a_valid_rbd_file_name()
+        a_valid_rbd_data().tofile(str(self.path))
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    # Here we're testing if converters are imported only when used
+    def test_get_converter(self):
+        with patch.dict(converter_registry._converters):
+            register_converter(POEMAS_INSTRUMENT, TRK_TYPE, "craamvert.instruments.sst.rbd.rbd:RBD")
+            self.assertEqual(get_converter(POEMAS_INSTRUMENT, TRK_TYPE).__name__, "RBD")
+
+            with self.assertRaises(ValueError):
+                get_converter(SST_INSTRUMENT, TRK_TYPE)
+
+    # Here we're testing if opening a file runs only the converter of its type
+    def test_open_file_runs_one_converter(self):
+        with patch.dict(converter_registry._converters,
+                        {(POEMAS_INSTRUMENT, TRK_TYPE): "a.module.that.does.not.exist:TRK"}):
+            sst_object = SST.open_file(str(self.path))
+
+        self.assertEqual(sst_object.get_date(), "2012-01-27")
+        self.assertEqual(get_converter(SST_INSTRUMENT, RBD_TYPE).__name__, "RBD")
+
+    # Here we're testing if converters of new file types found on entry points add their file name identifiers
+    def test_entry_point_identifiers(self):
+        entry_point = EntryPoint(name="POEMAS.Integration", value="test.test_converter_registry:IntegrationConverter",
+                                 group=CONVERTER_ENTRY_POINT_GROUP)
+
+        with patch.dict(converter_registry._converters), \
+                patch.dict(INSTRUMENT_TO_TYPE_MAP, {POEMAS_INSTRUMENT: dict(INSTRUMENT_TO_TYPE_MAP[POEMAS_INSTRUMENT])}), \
+                patch.object(converter_registry, "_entry_points_loaded", False), \
+                patch.object(converter_registry, "entry_points", return_value=[entry_point]):
+            self.assertEqual(match_file_name("SunTrack_120127_105135.INT"), [(POEMAS_INSTRUMENT, "Integration")])
+            self.assertEqual(get_converter(POEMAS_INSTRUMENT, "Integration").__name__, "IntegrationConverter")
+
+        self.assertNotIn("Integration", INSTRUMENT_TO_TYPE_MAP[POEMAS_INSTRUMENT])
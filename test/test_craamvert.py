@@ -0,0 +1,44 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from craamvert.craamvert import main, expand_inputs
+from test.utils.rbd_test_data import a_valid_rbd_data
+
+
+class TestCommandLine(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temporary_directory.name)
+
+        self.archive = self.directory / "archive" / "2012"
+        self.archive.mkdir(parents=True)
+        for hour in range(10, 13):
+            a_valid_rbd_data(first_time=hour * 36000000).tofile(str(self.archive / "rs1120127.{}00".format(hour)))
+        (self.archive / "notes.txt").write_text("-")
+
+        self.output = self.directory / "fits"
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    # Here we're testing if glob patterns and directories keep only supported files
+    def test_expand_inputs(self):
+        pattern = str(self.directory / "archive" / "**" / "*")
+        self.assertEqual([path.name for path in expand_inputs([pattern, str(self.archive)])],
+                         ["rs1120127.1000", "rs1120127.1100", "rs1120127.1200"])
+
+    # Here we're testing if a second run skips files already converted
+    def test_convert_resumes(self):
+        arguments = ["convert", "--jobs", "1", "--out", str(self.output), str(self.directory / "archive" / "**" / "rs*")]
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(main(arguments), 0)
+        self.assertIn("3 files: 3 converted, 0 skipped, 0 failed", output.getvalue())
+        self.assertEqual(len(list(self.output.glob("*.fits"))), 3)
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(main(arguments), 0)
+        self.assertIn("3 files: 0 converted, 3 skipped, 0 failed", output.getvalue())
@@ -0,0 +1,69 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import craamvert
+from craamvert import SST, POEMAS
+from craamvert.instruments.utils.file_type_detector import detect_file_type
+from craamvert.utils import SST_INSTRUMENT, POEMAS_INSTRUMENT, RBD_TYPE, TRK_TYPE
+from test.utils.rbd_test_data import a_valid_rbd_file_name, a_valid_rbd_data
+from test.utils.trk_test_data import a_valid_trk_file_name, a_valid_multi_record_trk_header_data, \
+    a_valid_multi_record_trk_body_data
+
+
+class TestFileTypeDetector(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+
+        # A directory which looks like a RBD file name, as found on the archive
+        self.directory = Path(self.temporary_directory.name) / "rs_files"
+        self.directory.mkdir()
+
+        self.rbd_path = self.directory / a_valid_rbd_file_name()
+        a_valid_rbd_data().tofile(str(self.rbd_path))
+
+        self.trk_bytes = a_valid_multi_record_trk_header_data().tobytes() + \
+            a_valid_multi_record_trk_body_data().tobytes()
+        self.trk_path = self.directory / a_valid_trk_file_name()
+        self.trk_path.write_bytes(self.trk_bytes)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    # Here we're testing if the type is found from the file name and confirmed by the file content
+    def test_detect_file_type(self):
+        self.assertEqual(detect_file_type(self.rbd_path), (SST_INSTRUMENT, RBD_TYPE))
+        self.assertEqual(detect_file_type(str(self.trk_path)), (POEMAS_INSTRUMENT, TRK_TYPE))
+        self.assertEqual(detect_file_type(self.trk_bytes), (POEMAS_INSTRUMENT, TRK_TYPE))
+
+        # Directories are never matched, and truncated files don't pass the sniff
+        with self.assertRaises(ValueError):
+            detect_file_type(self.directory / "notes")
+
+        truncated_path = self.directory / "rs1120127.1400"
+        truncated_path.write_bytes(self.rbd_path.read_bytes()[:-1])
+        with self.assertRaises(ValueError):
+            detect_file_type(truncated_path)
+        self.assertEqual(detect_file_type(truncated_path, sniff=False), (SST_INSTRUMENT, RBD_TYPE))
+
+        with self.assertRaises(ValueError):
+            detect_file_type(self.trk_bytes[:-1])
+
+    # Here we're testing if RBD bytes without a name ask for the file name, which has their type and date
+    def test_detect_unnamed_rbd_bytes(self):
+        with self.assertRaisesRegex(ValueError, "original_file_name"):
+            detect_file_type(self.rbd_path.read_bytes())
+
+        self.assertEqual(detect_file_type(self.rbd_path.read_bytes(), a_valid_rbd_file_name()),
+                         (SST_INSTRUMENT, RBD_TYPE))
+
+    # Here we're testing if files and buffers are opened without knowing their instrument
+    def test_open(self):
+        self.assertIsInstance(craamvert.open(self.rbd_path), SST)
+
+        poemas_object = craamvert.open(self.trk_bytes)
+        self.assertIsInstance(poemas_object, POEMAS)
+        self.assertEqual(poemas_object.get_date(), "2012-01-27")
+
+        sst_object = craamvert.open(self.rbd_path.read_bytes(), original_file_name=a_valid_rbd_file_name())
+        self.assertEqual(sst_object.get_start_time(), SST.open_file(self.rbd_path).get_start_time())
@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+
+from craamvert.utils.grouped_reduction import grouped_median
+
+
+class TestGroupedReduction(unittest.TestCase):
+    # Here we're testing if groups of different sizes have the same median as np.median
+    def test_grouped_median_unequal_groups(self):
+        random = np.random.default_rng(0)
+        keys = np.repeat(np.arange(6), [1, 2, 3, 4, 7, 50])
+        data = random.normal(size=keys.size)
+
+        first_positions, counts, medians = grouped_median(keys, [data])
+
+        self.assertEqual(counts.tolist(), [1, 2, 3, 4, 7, 50])
+        self.assertEqual(first_positions.tolist(), [0, 1, 3, 6, 10, 17])
+        expected = [np.median(data[keys == key]) for key in range(6)]
+        np.testing.assert_allclose(medians[0], expected)
+
+    # Here we're testing if NaN propagates to the median of its group only, as in np.median
+    def test_grouped_median_nan(self):
+        keys = np.array([0, 0, 0, 1, 1, 2, 2, 2, 2])
+        data = np.array([1, np.nan, 3, 4, 6, 9, 7, 8, 10], dtype=np.float32)
+
+        _, _, medians = grouped_median(keys, [data])
+
+        self.assertEqual(medians[0].dtype, np.float32)
+        np.testing.assert_array_equal(medians[0], [np.nan, 5, 8.5])
+
+    # Here we're testing if unsorted keys are grouped before the median
+    def test_grouped_median_unsorted_keys(self):
+        keys = np.array([2, 0, 2, 1, 0, 2])
+        data = np.array([5, 1, 3, 7, 2, 4])
+
+        first_positions, counts, medians = grouped_median(keys, [data])
+
+        self.assertEqual(first_positions.tolist(), [1, 3, 0])
+        self.assertEqual(counts.tolist(), [2, 1, 3])
+        self.assertEqual(medians[0].tolist(), [1, 7, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT_PATH = Path(__file__).parent.parent
+
+# Cumulative import time of craamvert measured with python -X importtime, in microseconds
+# It's about 5 ms, the budget leaves room for slower machines but catches heavy imports at module load
+IMPORT_TIME_BUDGET = 150000
+
+
+def import_module_in_new_process(statement):
+    """Runs an import statement on a new python process, returns its -X importtime report and the imported modules"""
+    completed_process = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                                        statement + "; import sys; print(' '.join(sys.modules))"],
+                                       cwd=str(ROOT_PATH), capture_output=True, text=True, check=True)
+
+    return completed_process.stderr, set(completed_process.stdout.split())
+
+
+class TestImportTime(unittest.TestCase):
+    # Here we're testing if importing craamvert stays within its import time budget
+    def test_import_time_budget(self):
+        report, modules = import_module_in_new_process("import craamvert")
+
+        # import time: self [us] | cumulative | imported package
+        cumulative_times = {line.split("|")[2].strip(): int(line.split("|")[1])
+                            for line in report.splitlines() if line.startswith("import time:") and "|" in line
+                            and line.split("|")[1].strip().isdigit()}
+
+        self.assertLess(cumulative_times["craamvert"], IMPORT_TIME_BUDGET)
+        self.assertNotIn("numpy", modules)
+
+    # Here we're testing if astropy is only imported when fits files are created
+    def test_astropy_is_imported_lazily(self):
+        for statement in ["import craamvert.catalog",
+                          "import craamvert.batch",
+                          "from craamvert.instruments.sst.sst import SST",
+                          "from craamvert.instruments.poemas.poemas import POEMAS"]:
+            _, modules = import_module_in_new_process(statement)
+            self.assertNotIn("astropy", modules, statement)
+
+    # Here we're testing if converters are only imported when a file is opened
+    def test_converters_are_imported_lazily(self):
+        for statement, converter_module in [("from craamvert.instruments.sst.sst import SST",
+                                             "craamvert.instruments.sst.rbd.rbd"),
+                                            ("from craamvert.instruments.poemas.poemas import POEMAS",
+                                             "craamvert.instruments.poemas.trk.trk"),
+                                            ("import craamvert.catalog", "craamvert.instruments.sst.rbd.rbd"),
+                                            ("import craamvert.catalog", "craamvert.instruments.poemas.trk.trk")]:
+            _, modules = import_module_in_new_process(statement)
+            self.assertNotIn(converter_module, modules, statement)
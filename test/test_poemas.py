@@ -0,0 +1,175 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from astropy.io import fits
+
+from craamvert.instruments.poemas.poemas import POEMAS
+from test.utils.trk_test_data import a_valid_trk_header_data, a_valid_trk_file_name, \
+    a_valid_multi_record_trk_header_data, a_valid_multi_record_trk_body_data
+
+
+class TestPOEMAS(unittest.TestCase):
+    # Here we're testing if level 1 calculates the median of all samples inside each second mark
+    def test_level_1(self):
+        samples = [3, 5, 2]
+        times = [39095000, 39096000, 39097000]
+
+        time_data = np.repeat(times, samples)
+        data = np.arange(sum(samples), dtype=np.float32) ** 2
+
+        poemas_object = POEMAS()
+        poemas_object._poemas_header_data = a_valid_trk_header_data()
+        poemas_object._poemas_body_data = [time_data, data, data, data, data, data, data]
+
+        poemas_object.level_1()
+
+        body_data = poemas_object._poemas_body_data
+        expected_medians = [np.median(data[0:3]), np.median(data[3:8]), np.median(data[8:10])]
+
+        np.testing.assert_array_equal(body_data[0], times)
+        for field in range(1, 7):
+            np.testing.assert_array_equal(body_data[field], expected_medians)
+
+        np.testing.assert_array_equal(poemas_object.get_samples_per_second(), samples)
+        self.assertEqual(poemas_object._poemas_header_data[0]["NRS"], len(times))
+        self.assertEqual(poemas_object.get_fits_level(), "1")
+
+    # Here we're testing if a session going past 0 UT keeps counting time from 0 UT of its first day
+    def test_session_crossing_midnight(self):
+        with tempfile.TemporaryDirectory() as directory:
+            body_data = a_valid_multi_record_trk_body_data()
+            body_data["sec"] = 349401599 + np.arange(len(body_data))
+            path = Path(directory) / "SunTrack_120127_235959.TRK"
+            path.write_bytes(a_valid_multi_record_trk_header_data().tobytes() + body_data.tobytes())
+
+            poemas_object = POEMAS.open_file(str(path))
+            poemas_object.level_1()
+
+            np.testing.assert_array_equal(poemas_object._poemas_body_data[0], [86399000, 86400000, 86401000])
+            self.assertEqual(poemas_object._end_time, "00:00:01")
+
+    # Here we're testing if writing in blocks creates the same data as writing everything at once
+    def test_write_fits_in_blocks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / a_valid_trk_file_name()
+            body_data = a_valid_multi_record_trk_body_data()
+            path.write_bytes(a_valid_multi_record_trk_header_data().tobytes() + body_data.tobytes())
+
+            fits_path = POEMAS.open_file(str(path)).write_fits(name="all", output_path=directory)
+            streamed_fits_path = POEMAS.open_file(str(path)).write_fits(name="blocks", output_path=directory,
+                                                                        block_records=2)
+
+            with fits.open(fits_path) as hdu_list, fits.open(streamed_fits_path) as streamed_hdu_list:
+                self.assertEqual(hdu_list[2].header, streamed_hdu_list[2].header)
+                self.assertEqual(hdu_list[2].data.tobytes(), streamed_hdu_list[2].data.tobytes())
+                self.assertEqual(hdu_list[0].header["t_end"], streamed_hdu_list[0].header["t_end"])
+
+                # Time is kept in milliseconds since 0 UT of the observation date, and read in seconds
+                self.assertEqual(hdu_list[2].header["TFORM1"], "1J")
+                self.assertEqual(hdu_list[2].header["TSCAL1"], 0.001)
+                self.assertEqual(hdu_list[2].header["TUNIT1"], "s")
+                self.assertEqual(hdu_list[2].header["TIMEUNIT"], "s")
+                self.assertEqual(hdu_list[2].header["MJDREF"], 55953)
+                self.assertAlmostEqual(hdu_list[2].data["time"][0], 39095)
+
+                streamed_header_data = streamed_hdu_list[1].data[0]
+                self.assertEqual(streamed_header_data["NRS"], len(body_data))
+                self.assertEqual(streamed_header_data["BRTMin"], body_data["TB"].min())
+                self.assertEqual(streamed_header_data["BRTMax"], body_data["TB"].max())
+
+    # Here we're testing if files given as bytes, which are mapped read-only, are converted
+    def test_convert_from_bytes(self):
+        body_data = a_valid_multi_record_trk_body_data()
+        trk_bytes = a_valid_multi_record_trk_header_data().tobytes() + body_data.tobytes()
+
+        poemas_object = POEMAS.open_file(trk_bytes, original_file_name=a_valid_trk_file_name())
+        poemas_object.level_1()
+        self.assertEqual(poemas_object._poemas_header_data[0]["NRS"], len(np.unique(body_data["sec"])))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / a_valid_trk_file_name()
+            path.write_bytes(trk_bytes)
+
+            fits_path = POEMAS.open_file(str(path)).write_fits(name="file", output_path=directory)
+            streamed_fits_path = POEMAS.open_file(trk_bytes, original_file_name=a_valid_trk_file_name()).write_fits(
+                name="bytes", output_path=directory, block_records=2)
+
+            with fits.open(fits_path) as hdu_list, fits.open(streamed_fits_path) as streamed_hdu_list:
+                self.assertEqual(streamed_hdu_list[1].data[0]["NRS"], len(body_data))
+                self.assertEqual(hdu_list[2].data.tobytes(), streamed_hdu_list[2].data.tobytes())
+
+    # Here we're testing if quantized TB data is read back within the quantization error
+    def test_write_fits_quantized(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / a_valid_trk_file_name()
+            body_data = a_valid_multi_record_trk_body_data()
+            body_data["TB"] = body_data["TB"] * 12.345
+            path.write_bytes(a_valid_multi_record_trk_header_data().tobytes() + body_data.tobytes())
+
+            expected_body_data = POEMAS.open_file(str(path))._poemas_body_data
+            fits_path = POEMAS.open_file(str(path)).write_fits(name="all", output_path=directory,
+                                                               quantize=np.int16)
+            streamed_fits_path = POEMAS.open_file(str(path)).write_fits(name="blocks", output_path=directory,
+                                                                        block_records=2, quantize=np.int16)
+
+            with fits.open(fits_path) as hdu_list, fits.open(streamed_fits_path) as streamed_hdu_list:
+                self.assertEqual(hdu_list[2].data.tobytes(), streamed_hdu_list[2].data.tobytes())
+
+                header = hdu_list[2].header
+                for column_number in range(4, 8):
+                    self.assertEqual(header["TFORM{}".format(column_number)], "I")
+
+                    quantization_error = header["TQERR{}".format(column_number)]
+                    np.testing.assert_allclose(hdu_list[2].data.field(column_number - 1),
+                                               expected_body_data[column_number - 1],
+                                               rtol=0, atol=quantization_error * 1.001)
+
+            with self.assertRaises(ValueError):
+                POEMAS.open_file(str(path)).write_fits(name="float", output_path=directory, quantize=np.float32)
+
+    # Here we're testing if level 2 merges objects and level 1 fits files by time
+    def test_level_2(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first_path = Path(directory) / a_valid_trk_file_name()
+            first_path.write_bytes(a_valid_multi_record_trk_header_data().tobytes()
+                                   + a_valid_multi_record_trk_body_data().tobytes())
+
+            # The second file starts one second later, so two seconds are found in both files
+            second_body_data = a_valid_multi_record_trk_body_data()
+            second_body_data["sec"] += 1
+            second_body_data["TB"] += 1000
+            second_header_data = a_valid_multi_record_trk_header_data()
+            second_header_data["BRTMin"] = 100.5
+            second_header_data["BRTMax"] = 710.1
+            second_path = Path(directory) / "SunTrack_120127_105136.TRK"
+            second_path.write_bytes(second_header_data.tobytes() + second_body_data.tobytes())
+
+            second_poemas_object = POEMAS.open_file(str(second_path))
+            second_poemas_object.level_1()
+            second_fits_path = second_poemas_object.write_fits(name="second", output_path=directory)
+
+            for drop_duplicates, expected_times in ((False, [39095, 39096, 39096, 39097, 39097, 39098]),
+                                                    (True, [39095, 39096, 39097, 39098])):
+                poemas_object = POEMAS.open_file(str(first_path))
+                poemas_object.level_1()
+                first_tbl_45 = poemas_object._poemas_body_data[3].copy()
+
+                poemas_objects_list = [second_fits_path]
+                poemas_object.level_2(poemas_objects_list, drop_duplicates=drop_duplicates)
+
+                body_data = poemas_object._poemas_body_data
+                np.testing.assert_array_equal(body_data[0], np.array(expected_times) * 1000)
+                self.assertEqual(poemas_objects_list, [second_fits_path])
+                self.assertEqual(poemas_object._poemas_header_data[0]["NRS"], len(expected_times))
+                self.assertEqual(poemas_object._end_time, "10:51:38")
+                self.assertEqual(poemas_object.get_fits_level(), "2")
+
+                # BRTMin and BRTMax are taken from the headers, not from the merged data
+                self.assertAlmostEqual(poemas_object._poemas_header_data[0]["BRTMin"], 100.5, places=4)
+                self.assertAlmostEqual(poemas_object._poemas_header_data[0]["BRTMax"], 710.1, places=4)
+
+                # Duplicated seconds are kept from the first object
+                if drop_duplicates:
+                    np.testing.assert_array_equal(body_data[3][:3], first_tbl_45)
@@ -0,0 +1,64 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from craamvert.instruments.sst.rbd.rbd import RBD, get_format_epoch, group_by_format_epoch
+from test.utils.rbd_test_data import a_valid_rbd_file_name, a_valid_rbd_data, a_valid_path_to_xml, \
+    VALID_START_TIME, VALID_END_TIME
+
+
+class TestRBD(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.temporary_directory.name) / a_valid_rbd_file_name()
+        a_valid_rbd_data().tofile(str(self.path))
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_convert_from_file(self):
+        returned_rbd_object = RBD().convert_from_file(self.path, a_valid_rbd_file_name(), a_valid_path_to_xml())
+
+        self.assertEqual(returned_rbd_object.date, '2012-01-27')
+        self.assertEqual(returned_rbd_object.time, '13:00')
+        self.assertEqual(returned_rbd_object.start_time, VALID_START_TIME)
+        self.assertEqual(returned_rbd_object.end_time, VALID_END_TIME)
+
+        np.testing.assert_array_equal(returned_rbd_object.data, a_valid_rbd_data())
+
+    # Here we're testing if a memory mapped file gives the same data as a file read into memory
+    def test_convert_from_file_with_mmap(self):
+        returned_rbd_object = RBD().convert_from_file(self.path, a_valid_rbd_file_name(), a_valid_path_to_xml(),
+                                                      mmap=True)
+
+        self.assertIsInstance(returned_rbd_object.data, np.memmap)
+        self.assertEqual(returned_rbd_object.start_time, VALID_START_TIME)
+        self.assertEqual(returned_rbd_object.end_time, VALID_END_TIME)
+
+        np.testing.assert_array_equal(returned_rbd_object.data["adcval"], a_valid_rbd_data()["adcval"])
+
+    # Here we're testing if the format epoch is found for dates at the limits of each interval
+    def test_get_format_epoch(self):
+        path_to_xml = a_valid_path_to_xml()
+
+        self.assertEqual(get_format_epoch("rs1021213", path_to_xml), "DataFormat-2002-12-04_to_2002-12-13.xml")
+        self.assertEqual(get_format_epoch("rf1021214", path_to_xml), "DataFormat-2002-12-14_to_2100-01-01.xml")
+        self.assertEqual(get_format_epoch("bi1021123", path_to_xml),
+                         "AuxiliaryDataFormat-2002-09-16_to_2002-11-23.xml")
+        self.assertEqual(get_format_epoch("rs000101", path_to_xml), "DataFormat-1900-01-01_to_1999-05-01.xml")
+
+        with self.assertRaises(ValueError):
+            get_format_epoch("rs2000102", path_to_xml)
+
+    def test_group_by_format_epoch(self):
+        file_names = ["rs1120127.1300", "rs1021213", "rf1120127.1400", "bi1120127"]
+
+        groups = group_by_format_epoch(file_names, a_valid_path_to_xml())
+
+        self.assertEqual(groups, {
+            "DataFormat-2002-12-14_to_2100-01-01.xml": ["rs1120127.1300", "rf1120127.1400"],
+            "DataFormat-2002-12-04_to_2002-12-13.xml": ["rs1021213"],
+            "AuxiliaryDataFormat-2002-12-14_to_2100-01-01.xml": ["bi1120127"],
+        })
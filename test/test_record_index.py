@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from craamvert.instruments.sst.sst import SST
+from craamvert.instruments.utils.memmap_handlers import find_time_window
+from craamvert.instruments.utils.record_index import build_record_index, get_index_path, read_record_index
+from test.utils.rbd_test_data import a_valid_rbd_file_name, a_valid_rbd_data, VALID_FIRST_TIME, VALID_TIME_STEP
+
+RBD_FORMAT_EPOCH = "DataFormat-2002-12-14_to_2100-01-01.xml"
+
+
+class TestRecordIndex(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.temporary_directory.name) / a_valid_rbd_file_name()
+
+        # Zero time records are left at both ends, as found on some files
+        self.rbd_data = a_valid_rbd_data(records=100)
+        self.rbd_data["time"][:3] = 0
+        self.rbd_data["time"][95:] = 0
+        self.rbd_data.tofile(str(self.path))
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    # Here we're testing if the index finds the same records as a binary search over all records
+    def test_find_time_window(self):
+        times = self.rbd_data["time"]
+        record_index = build_record_index(self.path, times, RBD_FORMAT_EPOCH, step=7)
+
+        for start in range(VALID_FIRST_TIME - VALID_TIME_STEP, VALID_FIRST_TIME + 101 * VALID_TIME_STEP, 150):
+            end = start + 10 * VALID_TIME_STEP
+            self.assertEqual(record_index.find_time_window(times, start, end), find_time_window(times, start, end))
+            self.assertEqual(record_index.find_time_window(times, start=start), find_time_window(times, start=start))
+            self.assertEqual(record_index.find_time_window(times, end=end), find_time_window(times, end=end))
+
+    # Here we're testing if the index is written once, and built again when the file changes
+    def test_open_file_with_index(self):
+        sst_object = SST.open_file(str(self.path), index=True)
+
+        record_index = read_record_index(self.path, RBD_FORMAT_EPOCH)
+        self.assertEqual(record_index.records, 100)
+        self.assertEqual((record_index.first, record_index.last), (3, 94))
+        self.assertEqual(sst_object.get_start_time(), "13:53:20")
+        np.testing.assert_array_equal(SST.open_file(str(self.path), index=True, start="13:53:21")._sst_data,
+                                      SST.open_file(str(self.path), start="13:53:21")._sst_data)
+
+        # A different format epoch or a changed file invalidates the index
+        self.assertIsNone(read_record_index(self.path, "DataFormat-2002-12-04_to_2002-12-13.xml"))
+
+        a_valid_rbd_data(records=200).tofile(str(self.path))
+        os.utime(self.path, ns=(0, 0))
+        self.assertIsNone(read_record_index(self.path, RBD_FORMAT_EPOCH))
+
+        SST.open_file(str(self.path), index=True)
+        self.assertEqual(read_record_index(self.path, RBD_FORMAT_EPOCH).records, 200)
+        self.assertTrue(get_index_path(self.path).exists())
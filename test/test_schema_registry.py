@@ -0,0 +1,56 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from craamvert.instruments.utils import schema_registry
+from craamvert.instruments.utils.schema_registry import get_schema, set_schema_cache_directory, \
+    clear_compiled_schemas
+from test.utils.rbd_test_data import a_valid_path_to_xml, RBD_DATA_TYPE
+
+A_VALID_DESCRIPTION_FILE = "DataFormat-2002-12-14_to_2100-01-01.xml"
+
+
+class TestSchemaRegistry(unittest.TestCase):
+    def setUp(self):
+        clear_compiled_schemas()
+
+    def tearDown(self):
+        clear_compiled_schemas()
+        set_schema_cache_directory(None)
+
+    def test_get_schema(self):
+        schema = get_schema(a_valid_path_to_xml() / A_VALID_DESCRIPTION_FILE)
+
+        self.assertEqual(schema.data_type, np.dtype(RBD_DATA_TYPE))
+        self.assertEqual(schema.column_names["adcval"], [6, np.uint16, "ADCu"])
+        self.assertEqual(schema.t_forms["adcval"], "6I")
+        self.assertEqual(schema.t_forms["time"], "1J")
+
+    # Here we're testing if each xml is only parsed once per process
+    def test_get_schema_is_memoized(self):
+        with patch.object(schema_registry, "_parse_description",
+                          wraps=schema_registry._parse_description) as mock_parse_description:
+            first_schema = get_schema(a_valid_path_to_xml() / A_VALID_DESCRIPTION_FILE)
+            second_schema = get_schema(a_valid_path_to_xml() / A_VALID_DESCRIPTION_FILE)
+
+        self.assertIs(first_schema, second_schema)
+        self.assertEqual(mock_parse_description.call_count, 1)
+
+    # Here we're testing if compiled schemas are reused from disk by a new process
+    def test_get_schema_with_cache_directory(self):
+        with tempfile.TemporaryDirectory() as cache_directory:
+            set_schema_cache_directory(cache_directory)
+            first_schema = get_schema(a_valid_path_to_xml() / A_VALID_DESCRIPTION_FILE)
+
+            self.assertEqual(len(list(Path(cache_directory).iterdir())), 1)
+
+            clear_compiled_schemas()
+            with patch.object(schema_registry, "_parse_description") as mock_parse_description:
+                second_schema = get_schema(a_valid_path_to_xml() / A_VALID_DESCRIPTION_FILE)
+
+            mock_parse_description.assert_not_called()
+            self.assertEqual(first_schema.data_type, second_schema.data_type)
+            self.assertEqual(first_schema.column_names, second_schema.column_names)
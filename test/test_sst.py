@@ -0,0 +1,155 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from astropy.io import fits
+
+from craamvert.instruments.sst import SST_REDUCED_COLUMNS
+from craamvert.instruments.sst.sst import SST
+from craamvert.instruments.sst.utils.create_hdu import create_data_hdu
+from test.utils.rbd_test_data import a_valid_rbd_file_name, a_valid_rbd_data
+
+
+class TestSST(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.temporary_directory.name) / a_valid_rbd_file_name()
+
+        # Values outside the signed range check that unsigned and byte columns are kept as they are
+        self.rbd_data = a_valid_rbd_data()
+        self.rbd_data['off'] = 65535 - np.arange(len(self.rbd_data) * 6).reshape(len(self.rbd_data), 6)
+        self.rbd_data['target'] = -5
+        self.rbd_data.tofile(str(self.path))
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    # Here we're testing if records streamed in blocks are read back with the same values
+    def test_write_fits_in_blocks(self):
+        sst_object = SST.open_file(str(self.path), mmap=True)
+
+        fits_path = sst_object.write_fits(name="streamed.fits", output_path=self.temporary_directory.name,
+                                          block_records=7)
+
+        with fits.open(fits_path) as hdu_list:
+            table = hdu_list[1].data
+
+            self.assertEqual(len(table), len(self.rbd_data))
+            for column in self.rbd_data.dtype.names:
+                np.testing.assert_array_equal(table[column], self.rbd_data[column])
+
+    # Here we're testing if the table built in memory is the same as the one streamed in blocks
+    def test_write_fits(self):
+        fits_path = SST.open_file(str(self.path)).write_fits(name="in_memory.fits",
+                                                             output_path=self.temporary_directory.name)
+        streamed_fits_path = SST.open_file(str(self.path)).write_fits(name="streamed.fits",
+                                                                      output_path=self.temporary_directory.name,
+                                                                      block_records=len(self.rbd_data))
+
+        with fits.open(fits_path) as hdu_list:
+            table = hdu_list[1].data
+
+            self.assertEqual(hdu_list[1].header["TFORM2"], "6I")
+            for column in self.rbd_data.dtype.names:
+                np.testing.assert_array_equal(table[column], self.rbd_data[column])
+
+        self.assertEqual(fits_path.read_bytes(), streamed_fits_path.read_bytes())
+
+    # Here we're testing if the HDU built in memory keeps the RBD values, without being written first
+    def test_create_data_hdu(self):
+        sst_object = SST.open_file(str(self.path))
+
+        sst_hdu = create_data_hdu(sst_object._sst_column_names, sst_object._sst_data)
+
+        self.assertEqual(sst_hdu.header["TZERO2"], 32768)
+        for column in self.rbd_data.dtype.names:
+            np.testing.assert_array_equal(sst_hdu.data[column], self.rbd_data[column])
+
+    # Here we're testing if files are merged by time, with and without duplicated records
+    def test_concatenate(self):
+        # The second file starts in the middle of the first one
+        second_path = Path(self.temporary_directory.name) / "rs1120127.1400"
+        second_rbd_data = a_valid_rbd_data(first_time=self.rbd_data["time"][25])
+        second_rbd_data["recnum"] += 25
+        second_rbd_data.tofile(str(second_path))
+
+        for drop_duplicates, expected_records in ((False, 100), (True, 75)):
+            sst_objects = [str(second_path), SST.open_file(str(self.path))]
+            sst_object = SST.concatenate(sst_objects, drop_duplicates=drop_duplicates)
+
+            sst_data = sst_object._sst_data
+            self.assertEqual(len(sst_data), expected_records)
+            self.assertTrue(np.all(np.diff(sst_data["time"]) >= 0))
+            np.testing.assert_array_equal(sst_data[:25], self.rbd_data[:25])
+
+            file_names = [card.value for card in sst_object._primary_hdu.header.cards if card.keyword == "ORIGFILE"]
+            self.assertEqual(file_names, [a_valid_rbd_file_name(), "rs1120127.1400"])
+
+        # Integration and subintegration data can't be mixed
+        rf_path = Path(self.temporary_directory.name) / "rf1120127.1400"
+        self.rbd_data.tofile(str(rf_path))
+
+        with self.assertRaises(ValueError):
+            SST.concatenate([str(self.path), str(rf_path)])
+
+    # Here we're testing if several files with interleaved records are merged as a stable sort by time would
+    def test_concatenate_several_files(self):
+        rbd_data = list()
+        sst_objects = list()
+        for part in range(4):
+            part_rbd_data = a_valid_rbd_data(first_time=self.rbd_data["time"][0] + part)
+            part_rbd_data["recnum"] += part * len(part_rbd_data)
+            rbd_data.append(part_rbd_data)
+
+            path = Path(self.temporary_directory.name) / "rs1120127.{}00".format(10 + part)
+            part_rbd_data.tofile(str(path))
+            sst_objects.append(SST.open_file(str(path), mmap=True))
+
+        sst_object = SST.concatenate(sst_objects)
+
+        concatenated_rbd_data = np.concatenate(rbd_data)
+        expected_rbd_data = concatenated_rbd_data[np.argsort(concatenated_rbd_data["time"], kind="stable")]
+        np.testing.assert_array_equal(sst_object._sst_data, expected_rbd_data)
+
+    # Here we're testing if only the selected columns are kept and written
+    def test_open_file_with_columns(self):
+        for mmap in (False, True):
+            sst_object = SST.open_file(str(self.path), mmap=mmap, columns=SST_REDUCED_COLUMNS)
+
+            self.assertEqual(list(sst_object._sst_data.dtype.names), ['time', 'adcval', 'azipos', 'elepos',
+                                                                      'x_off', 'y_off', 'target', 'opmode'])
+            self.assertEqual(list(sst_object._sst_column_names), list(sst_object._sst_data.dtype.names))
+
+            fits_path = sst_object.write_fits(name="reduced-{}.fits".format(mmap),
+                                              output_path=self.temporary_directory.name)
+
+            with fits.open(fits_path) as hdu_list:
+                table = hdu_list[1].data
+
+                self.assertEqual(table.columns.names, list(sst_object._sst_data.dtype.names))
+                for column in table.columns.names:
+                    np.testing.assert_array_equal(table[column], self.rbd_data[column])
+
+        with self.assertRaises(ValueError):
+            SST.open_file(str(self.path), columns=['time', 'not_a_column'])
+
+    # Here we're testing if only records inside the time window are kept
+    def test_open_file_with_time_window(self):
+        # Records start at 13:53:20 and are 0.04 s apart, zero time records are left at the end
+        rbd_data = a_valid_rbd_data(records=100)
+        rbd_data[90:] = 0
+        rbd_data.tofile(str(self.path))
+
+        for mmap in (False, True):
+            sst_object = SST.open_file(str(self.path), mmap=mmap, start="13:53:21", end="13:53:22")
+
+            np.testing.assert_array_equal(sst_object._sst_data, rbd_data[25:75])
+            self.assertEqual(sst_object.get_start_time(), "13:53:21")
+            self.assertEqual(sst_object.get_end_time(), "13:53:22")
+
+        sst_object = SST.open_file(str(self.path), start="13:53:23")
+        np.testing.assert_array_equal(sst_object._sst_data, rbd_data[75:90])
+
+        with self.assertRaises(ValueError):
+            SST.open_file(str(self.path), start="14:00:00")
@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from craamvert.instruments.instrument import Instrument
+from craamvert.instruments.poemas.poemas import POEMAS
+from craamvert.instruments.sst.sst import SST
+from craamvert.instruments.utils.stage_profiler import stage
+from test.utils.rbd_test_data import a_valid_rbd_data, a_valid_rbd_file_name, VALID_RECORDS
+from test.utils.trk_test_data import a_valid_multi_record_trk_header_data, a_valid_multi_record_trk_body_data, \
+    a_valid_trk_file_name
+
+
+class TestStageProfiler(unittest.TestCase):
+
+    # Here we're testing if stages inside other stages are named after them, and keep their file name
+    def test_nested_stages(self):
+        with Instrument.profile_stages() as profiler:
+            with stage("outer", "file") as outer_stats:
+                with stage("inner") as inner_stats:
+                    inner_stats.records = 10
+                    inner_data = bytearray(1024 * 1024)
+                outer_stats.records = len(inner_data)
+
+        self.assertEqual([stage_stats.name for stage_stats in profiler.stages], ["outer.inner", "outer"])
+        self.assertEqual(profiler.stages[0].file_name, "file")
+        self.assertEqual(profiler.stages[0].records, 10)
+
+        # Memory allocated by the inner stage is also part of the outer stage peak
+        self.assertGreaterEqual(profiler.stages[0].peak_memory, 1024 * 1024)
+        self.assertGreaterEqual(profiler.stages[1].peak_memory, profiler.stages[0].peak_memory)
+
+    # Here we're testing if callbacks receive every stage of opening, converting and writing files
+    def test_instrument_stages(self):
+        stages = list()
+        Instrument.add_stage_callback(stages.append)
+        try:
+            SST.open_file(a_valid_rbd_data().tobytes(), original_file_name=a_valid_rbd_file_name())
+
+            with tempfile.TemporaryDirectory() as directory:
+                trk_path = Path(directory) / a_valid_trk_file_name()
+                trk_path.write_bytes(a_valid_multi_record_trk_header_data().tobytes() +
+                                     a_valid_multi_record_trk_body_data().tobytes())
+
+                poemas = POEMAS.open_file(trk_path)
+                poemas.level_1()
+        finally:
+            Instrument.remove_stage_callback(stages.append)
+
+        # Memory is not traced, unless requested
+        self.assertTrue(all(stage_stats.peak_memory is None for stage_stats in stages))
+
+        sst_stages = [stage_stats for stage_stats in stages if stage_stats.file_name == a_valid_rbd_file_name()]
+        self.assertEqual([stage_stats.name for stage_stats in sst_stages],
+                         ["open_file.schema", "open_file.read", "open_file"])
+        self.assertEqual(sst_stages[-1].records, VALID_RECORDS)
+        self.assertEqual(sst_stages[-1].bytes_read, a_valid_rbd_data().nbytes)
+
+        # TRK data is only deinterleaved when level 1 reads it
+        poemas_stage_names = [stage_stats.name for stage_stats in stages
+                              if stage_stats.file_name == a_valid_trk_file_name()]
+        self.assertEqual(poemas_stage_names[-1], "level_1")
+        self.assertIn("level_1.deinterleave", poemas_stage_names)
+        self.assertNotIn("open_file.deinterleave", poemas_stage_names)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+
+from craamvert.utils import julday, iso_time
+
+
+class TestTime(unittest.TestCase):
+    # Here we're testing if array functions return the same values as the scalar ones
+    def test_julday_array_functions(self):
+        seconds = np.array([0, 86399, 349354295, 349354295 + 400 * 86400])
+
+        self.assertEqual(list(julday.time_array(seconds)), [julday.time(int(sec)) for sec in seconds])
+        self.assertEqual(list(julday.date_array(seconds)), [julday.date(int(sec)) for sec in seconds])
+        self.assertEqual(list(julday.sec_array(seconds)), [julday.sec(int(sec)) for sec in seconds])
+
+    # Here we're testing if zero padding is kept as 0, and times after 0 UT of the next day keep counting
+    def test_julday_milliseconds_array(self):
+        reference = julday.day_start_array(349354295)
+
+        np.testing.assert_array_equal(julday.milliseconds_array([349354295, 0], reference), [39095000, 0])
+
+        # A session from 23:59:58 to 00:00:01 of the next day
+        session = reference + julday.SECONDS_IN_A_DAY + np.arange(-2, 2)
+        np.testing.assert_array_equal(julday.milliseconds_array(session, reference),
+                                      [86398000, 86399000, 86400000, 86401000])
+
+        with self.assertRaises(ValueError):
+            julday.milliseconds_array([reference + 30 * julday.SECONDS_IN_A_DAY], reference)
+
+    def test_iso_time_array_functions(self):
+        hustime = np.array([0, 5, 123456789, 863999999])
+
+        self.assertEqual(list(iso_time.time_array(hustime)), [iso_time.time(int(hus)) for hus in hustime])
+        self.assertEqual(iso_time.datetime64_array("2012-01-27", hustime)[2],
+                         np.datetime64("2012-01-27T03:25:45.678900"))
@@ -1,32 +1,127 @@
+import tempfile
 import unittest
-from unittest.mock import patch
+from pathlib import Path
+
+import numpy as np
 
 from craamvert.instruments.poemas.trk.trk import TRK
 from test.utils.trk_test_data import a_valid_trk_treated_body_column_names, a_valid_trk_header_data, \
-    a_valid_trk_body_data, a_valid_trk_file_name, a_valid_trk_treated_body_data, a_valid_path_to_xml, a_valid_path
+    a_valid_trk_body_data, a_valid_trk_file_name, a_valid_trk_treated_body_data, a_valid_path_to_xml, \
+    a_valid_multi_record_trk_header_data, a_valid_multi_record_trk_body_data, a_valid_multi_record_trk_treated_body_data
 
 
 class TestTRK(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.temporary_directory.name) / a_valid_trk_file_name()
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def write_trk_file(self, header_data, body_data):
+        with open(self.path, "wb") as trk_file:
+            trk_file.write(header_data.tobytes())
+            trk_file.write(body_data.tobytes())
+
     # Here we're testing with the data is correctly treated by TRK.__treat_trk_body_data()
-    @patch('craamvert.instruments.poemas.trk.trk.np.fromfile')
-    def test_convert_from_file(self, mock_numpy_fromfile):
-        # First we create mocked data
+    def test_convert_from_file(self):
+        # First we create a file with valid data
         file_name = a_valid_trk_file_name()
-        path = a_valid_path()
         path_to_xml = a_valid_path_to_xml()
 
-        mock_numpy_fromfile.side_effect = [a_valid_trk_header_data(), a_valid_trk_body_data()]
+        self.write_trk_file(a_valid_trk_header_data(), a_valid_trk_body_data())
 
         # Then we make the call
-        returned_trk_object = TRK().convert_from_file(path, file_name, path_to_xml)
+        returned_trk_object = TRK().convert_from_file(self.path, file_name, path_to_xml)
 
         # Now we check the results
         actual_body_data = returned_trk_object.body_data
         expected_body_data = a_valid_trk_treated_body_data()
 
-        self.assertEqual(actual_body_data, expected_body_data)
+        self.assertEqual(len(actual_body_data), len(expected_body_data))
+        for actual_column, expected_column in zip(actual_body_data, expected_body_data):
+            np.testing.assert_array_equal(actual_column, expected_column)
 
         actual_body_column_data = returned_trk_object.body_column_names
         expected_body_column_names = a_valid_trk_treated_body_column_names()
 
         self.assertEqual(actual_body_column_data, expected_body_column_names)
+
+    # Here we're testing if TB data from several records is correctly de-interleaved
+    def test_convert_from_file_with_several_records(self):
+        self.write_trk_file(a_valid_multi_record_trk_header_data(), a_valid_multi_record_trk_body_data())
+
+        returned_trk_object = TRK().convert_from_file(self.path, a_valid_trk_file_name(), a_valid_path_to_xml())
+
+        actual_body_data = returned_trk_object.body_data
+        expected_body_data = a_valid_multi_record_trk_treated_body_data()
+
+        self.assertEqual(len(actual_body_data), len(expected_body_data))
+        for actual_column, expected_column in zip(actual_body_data, expected_body_data):
+            np.testing.assert_array_equal(actual_column, expected_column)
+
+        self.assertEqual(returned_trk_object.start_time, '10:51:35')
+        self.assertEqual(returned_trk_object.end_time, '10:51:37')
+
+    # Here we're testing if a zero padding record keeps time 0, instead of a wrapped around value
+    def test_convert_from_file_with_padding_record(self):
+        header_data = a_valid_multi_record_trk_header_data()
+        header_data["NRS"] += 1
+        body_data = np.concatenate([a_valid_multi_record_trk_body_data(),
+                                    np.zeros(1, dtype=a_valid_multi_record_trk_body_data().dtype)])
+        self.write_trk_file(header_data, body_data)
+
+        returned_trk_object = TRK().convert_from_file(self.path, a_valid_trk_file_name(), a_valid_path_to_xml())
+
+        time_data = returned_trk_object.body_data[0]
+        expected_time_data = a_valid_multi_record_trk_treated_body_data()[0]
+        np.testing.assert_array_equal(time_data[:len(expected_time_data)], expected_time_data)
+        np.testing.assert_array_equal(time_data[len(expected_time_data):], 0)
+
+        self.assertEqual(returned_trk_object.start_time, '10:51:35')
+        self.assertEqual(returned_trk_object.end_time, '10:51:37')
+
+    # Here we're testing if a file is described from its header and time span, with NRS beyond the records found
+    def test_convert_from_file_header_only(self):
+        header_data = a_valid_multi_record_trk_header_data()
+        header_data["NRS"] += 10
+        self.write_trk_file(header_data, a_valid_multi_record_trk_body_data())
+
+        returned_trk_object = TRK().convert_from_file(self.path, a_valid_trk_file_name(), a_valid_path_to_xml(),
+                                                      header_only=True)
+
+        self.assertEqual(returned_trk_object.records, len(a_valid_multi_record_trk_body_data()))
+        self.assertEqual(returned_trk_object.start_time, '10:51:35')
+        self.assertEqual(returned_trk_object.end_time, '10:51:37')
+
+    # Here we're testing if bytes are read the same way as files
+    def test_convert_from_bytes(self):
+        file_content = a_valid_multi_record_trk_header_data().tobytes() + a_valid_multi_record_trk_body_data().tobytes()
+
+        returned_trk_object = TRK().convert_from_file(file_content, a_valid_trk_file_name(), a_valid_path_to_xml())
+
+        # Records are views over the original content, only the header is copied so it can be updated
+        self.assertTrue(returned_trk_object.header_data.flags.writeable)
+        self.assertFalse(returned_trk_object.body_data.records.flags.owndata)
+
+        np.testing.assert_array_equal(returned_trk_object.body_data[-1],
+                                      a_valid_multi_record_trk_treated_body_data()[-1])
+
+    # Here we're testing if only records inside the time window are kept
+    def test_convert_from_file_with_time_window(self):
+        self.write_trk_file(a_valid_multi_record_trk_header_data(), a_valid_multi_record_trk_body_data())
+
+        returned_trk_object = TRK().convert_from_file(self.path, a_valid_trk_file_name(), a_valid_path_to_xml(),
+                                                      start='10:51:36', end='10:51:40')
+
+        self.assertEqual(returned_trk_object.records, 2)
+        self.assertEqual(returned_trk_object.header_data[0]["NRS"], 2)
+        self.assertEqual(returned_trk_object.time, '10:51:36')
+        self.assertEqual(returned_trk_object.start_time, '10:51:36')
+        self.assertEqual(returned_trk_object.end_time, '10:51:37')
+
+        np.testing.assert_array_equal(returned_trk_object.body_data[3],
+                                      a_valid_multi_record_trk_treated_body_data()[3][100:])
+
+        with self.assertRaises(ValueError):
+            TRK().convert_from_file(self.path, a_valid_trk_file_name(), a_valid_path_to_xml(), end='10:51:34')
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import numpy as np
+
+# Valid data
+VALID_RECORDS = 50
+VALID_FIRST_TIME = 500000000
+VALID_TIME_STEP = 400
+VALID_START_TIME = '13:53:20'
+VALID_END_TIME = '13:53:21'
+
+# Data format from 2002-12-14 to 2100-01-01
+RBD_DATA_TYPE = [('time', np.int32),
+                 ('adcval', np.uint16, 6),
+                 ('pos_time', np.int32),
+                 ('azipos', np.int32),
+                 ('elepos', np.int32),
+                 ('pm_daz', np.uint16),
+                 ('pm_del', np.uint16),
+                 ('azierr', np.int32),
+                 ('eleerr', np.int32),
+                 ('x_off', np.uint16),
+                 ('y_off', np.uint16),
+                 ('off', np.uint16, 6),
+                 ('target', np.byte),
+                 ('opmode', np.byte),
+                 ('gps_status', np.uint16),
+                 ('recnum', np.int32)]
+
+
+def a_valid_path_to_xml():
+    main_path = str(Path(__file__).parent)[:-11]
+    return Path(main_path) / Path("craamvert/instruments/xml-tables/sst/RBD")
+
+
+def a_valid_rbd_file_name():
+    return "rs1120127.1300"
+
+
+def a_valid_rbd_data(records=VALID_RECORDS, first_time=VALID_FIRST_TIME):
+    data = np.zeros(records, dtype=RBD_DATA_TYPE)
+    data['time'] = first_time + np.arange(records) * VALID_TIME_STEP
+    data['adcval'] = np.arange(records * 6).reshape(records, 6)
+    data['azipos'] = np.arange(records) * 10
+    data['elepos'] = np.arange(records) * 20
+    data['recnum'] = np.arange(records)
+    return data
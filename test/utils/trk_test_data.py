@@ -18,28 +18,29 @@ VALID_BRT_MAX = 123.45
 # Valid body data
 VALID_SEC = 349354295
 VALID_DATE = '2012-01-27'
-VALID_CONVERTED_TIME = '10:51:35'
+# Milliseconds since 0 UT, 10:51:35
+VALID_CONVERTED_TIME = 39095000
 VALID_ELE_ANG = 12
 VALID_AZI_ANG = 12
 VALID_TB = 900
 
 
-TRK_HEADER_DATA_TYPE = [('Code', np.int32, 1),
-                        ('NRS', np.int32, 1),
-                        ('FreqNo', np.int32, 1),
-                        ('Freq1', np.float32, 1),
-                        ('Freq2', np.float32, 1),
-                        ('BRTMin', np.float32, 1),
-                        ('BRTMax', np.float32, 1)]
+TRK_HEADER_DATA_TYPE = [('Code', np.int32),
+                        ('NRS', np.int32),
+                        ('FreqNo', np.int32),
+                        ('Freq1', np.float32),
+                        ('Freq2', np.float32),
+                        ('BRTMin', np.float32),
+                        ('BRTMax', np.float32)]
 
-TRK_BODY_DATA_TYPE = [('sec', np.int32, 1),
-                      ('ele_ang', np.float32, 1),
-                      ('zi_ang', np.float32, 1),
+TRK_BODY_DATA_TYPE = [('sec', np.int32),
+                      ('ele_ang', np.float32),
+                      ('zi_ang', np.float32),
                       ('TB', np.float32, TB_ARRAY_SIZE)]
 
-TRK_TREATED_BODY_DATA_TYPE = [('sec', np.int32, 1),
-                              ('ele_ang', np.float32, 1),
-                              ('zi_ang', np.float32, 1),
+TRK_TREATED_BODY_DATA_TYPE = [('sec', np.int32),
+                              ('ele_ang', np.float32),
+                              ('zi_ang', np.float32),
                               ('TBL_45', np.float32, CONVERTED_DATA_ARRAY_SIZE),
                               ('TBR_45', np.float32, CONVERTED_DATA_ARRAY_SIZE),
                               ('TBL_90', np.float32, CONVERTED_DATA_ARRAY_SIZE),
@@ -48,7 +49,7 @@ TRK_TREATED_BODY_DATA_TYPE = [('sec', np.int32, 1),
 
 def a_valid_path_to_xml():
     main_path = str(Path(__file__).parent)[:-11]
-    return Path(main_path) / Path("craamvert/instruments/xml-tables/POEMAS/TRK")
+    return Path(main_path) / Path("craamvert/instruments/xml-tables/poemas/TRK")
 
 
 def a_valid_path():
@@ -61,7 +62,7 @@ def a_valid_trk_file_name():
 
 # sec, ele_ang, azi_ang, TB
 def a_valid_trk_treated_body_column_names():
-    return OrderedDict([('sec', [1, str, 'none']),
+    return OrderedDict([('time', [1, np.int32, 'ms']),
                         ('ele_ang', [1, np.float32, 'none']),
                         ('zi_ang', [1, np.float32, 'none']),
                         ('TBL_45', [1, np.float32, 'none']),
@@ -83,10 +84,41 @@ def a_valid_trk_body_data():
     return np.array([(VALID_SEC, VALID_ELE_ANG, VALID_AZI_ANG, tb)], dtype=TRK_BODY_DATA_TYPE)
 
 
-# sec, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
+# time, ele_ang, azi_ang, TBL_45, TBR_45, TBL_90, TBR_90
 def a_valid_trk_treated_body_data():
-    sec = [VALID_CONVERTED_TIME] * CONVERTED_DATA_ARRAY_SIZE
+    time = [VALID_CONVERTED_TIME] * CONVERTED_DATA_ARRAY_SIZE
     ele_ang = [VALID_ELE_ANG] * CONVERTED_DATA_ARRAY_SIZE
     azi_ang = [VALID_AZI_ANG] * CONVERTED_DATA_ARRAY_SIZE
     tbl_45 = tbr_45 = tbl_90 = tbr_90 = [VALID_TB] * CONVERTED_DATA_ARRAY_SIZE
-    return [sec, ele_ang, azi_ang, tbl_45, tbr_45, tbl_90, tbr_90]
+    return [time, ele_ang, azi_ang, tbl_45, tbr_45, tbl_90, tbr_90]
+
+
+# Several records with distinct TB values, to check that TB categories are correctly separated
+VALID_RECORDS = 3
+VALID_SECS = [VALID_SEC, VALID_SEC + 1, VALID_SEC + 2]
+VALID_CONVERTED_TIMES = [39095000, 39096000, 39097000]
+
+
+def a_valid_multi_record_trk_header_data():
+    return np.array([(VALID_CODE, VALID_RECORDS, VALID_FREQ_NO, VALID_FREQ_1, VALID_FREQ_2, VALID_BRT_MIN,
+                      VALID_BRT_MAX)], TRK_HEADER_DATA_TYPE)
+
+
+def a_valid_multi_record_trk_body_data():
+    records = list()
+    for record, sec in enumerate(VALID_SECS):
+        tb = np.arange(TB_ARRAY_SIZE) + record * TB_ARRAY_SIZE
+        records.append((sec, VALID_ELE_ANG + record, VALID_AZI_ANG + record, tb))
+    return np.array(records, dtype=TRK_BODY_DATA_TYPE)
+
+
+def a_valid_multi_record_trk_treated_body_data():
+    body_data = [[], [], [], [], [], [], []]
+    for record, time in enumerate(VALID_CONVERTED_TIMES):
+        body_data[0].extend([time] * CONVERTED_DATA_ARRAY_SIZE)
+        body_data[1].extend([VALID_ELE_ANG + record] * CONVERTED_DATA_ARRAY_SIZE)
+        body_data[2].extend([VALID_AZI_ANG + record] * CONVERTED_DATA_ARRAY_SIZE)
+        tb = list(range(record * TB_ARRAY_SIZE, (record + 1) * TB_ARRAY_SIZE))
+        for tb_category in range(0, 4):
+            body_data[3 + tb_category].extend(tb[tb_category::4])
+    return body_data